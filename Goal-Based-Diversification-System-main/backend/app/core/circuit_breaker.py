@@ -0,0 +1,156 @@
+"""
+Upstream Circuit Breaker
+========================
+One breaker per upstream host, fed by every request the fetch scheduler
+makes. Outcomes are kept in a rolling time window; a call fails when it
+raises (timeouts, connection errors), returns 5xx, or takes longer than
+``BREAKER_SLOW_CALL_SECONDS``.
+
+    closed     calls pass; opens once the window holds at least
+               BREAKER_MIN_CALLS and the failure rate reaches
+               BREAKER_FAILURE_RATE
+    open       calls fail at once with CircuitOpenError for
+               BREAKER_OPEN_SECONDS
+    half_open  a single probe call is let through; success closes the
+               breaker, failure opens it again. Only the call holding the
+               probe token from ``check`` can change the state; calls that
+               were already in flight just add to the window
+
+While a breaker is open, no connection, token or event-loop time is spent
+on the upstream; callers fall back to cached data.
+"""
+
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(Exception):
+    """The upstream's breaker is open; the call was not attempted"""
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = 60.0,
+        min_calls: int = 10,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 5.0,
+        open_seconds: float = 30.0,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self._window: Deque[Tuple[float, bool, float]] = deque()  # (time, failed, latency)
+        self._probe: Optional[int] = None  # token of the outstanding half-open probe
+        self._probes = 0
+        self.counters = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0}
+        self.last_error: Optional[str] = None
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._window and self._window[0][0] < cutoff:
+            self._window.popleft()
+
+    def check(self) -> Optional[int]:
+        """
+        Admit a call or raise ``CircuitOpenError``. Returns the probe token
+        when the call is the half-open probe (pass it to ``record`` or
+        ``abandon``), otherwise None.
+        """
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+            self.state = HALF_OPEN
+        if self.state == CLOSED:
+            return None
+        if self.state == HALF_OPEN and self._probe is None:
+            self._probes += 1
+            self._probe = self._probes
+            return self._probe
+        self.counters["rejected"] += 1
+        raise CircuitOpenError(f"Circuit open for {self.name}")
+
+    def record(self, ok: bool, latency: float, error: Optional[str] = None, probe: Optional[int] = None) -> None:
+        """Outcome of an admitted call; slow successes count as failures"""
+        now = time.monotonic()
+        failed = not ok or latency > self.slow_call_seconds
+        self.counters["calls"] += 1
+        if failed:
+            self.counters["failures"] += 1
+            self.last_error = error or ("slow call" if ok else "failed")
+
+        self._window.append((now, failed, latency))
+        self._prune(now)
+        if probe is not None and probe == self._probe:
+            self._probe = None
+            if failed:
+                self._open(now)
+            else:
+                self.state = CLOSED
+                self._window.clear()
+        elif self.state == CLOSED and len(self._window) >= self.min_calls:
+            failures = sum(1 for _, f, _ in self._window if f)
+            if failures / len(self._window) >= self.failure_rate:
+                self._open(now)
+
+    def abandon(self, probe: Optional[int] = None) -> None:
+        """An admitted call was cancelled before it finished; frees the probe it held"""
+        if probe is not None and probe == self._probe:
+            self._probe = None
+
+    def _open(self, now: float) -> None:
+        self.state = OPEN
+        self.opened_at = now
+        self.counters["opened"] += 1
+        print(f"⚠ Circuit opened for {self.name} ({self.last_error})")
+
+    def info(self) -> dict:
+        now = time.monotonic()
+        self._prune(now)
+        latencies = np.array([lat for _, _, lat in self._window]) * 1000.0
+        failures = sum(1 for _, f, _ in self._window if f)
+        return {
+            "state": self.state,
+            "window_calls": len(self._window),
+            "window_failures": failures,
+            "failure_rate": failures / len(self._window) if self._window else 0.0,
+            "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else None,
+            "p95_ms": float(np.percentile(latencies, 95)) if len(latencies) else None,
+            "retry_in_s": (
+                max(0.0, self.open_seconds - (now - self.opened_at)) if self.state == OPEN else None
+            ),
+            "last_error": self.last_error,
+            **self.counters,
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(host: str) -> CircuitBreaker:
+    breaker = _breakers.get(host)
+    if breaker is None:
+        breaker = _breakers[host] = CircuitBreaker(
+            host,
+            window_seconds=settings.breaker_window_seconds,
+            min_calls=settings.breaker_min_calls,
+            failure_rate=settings.breaker_failure_rate,
+            slow_call_seconds=settings.breaker_slow_call_seconds,
+            open_seconds=settings.breaker_open_seconds,
+        )
+    return breaker
+
+
+def circuit_breakers_info() -> Dict[str, dict]:
+    return {host: breaker.info() for host, breaker in _breakers.items()}
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field, field_validator
-from typing import List
+from typing import List, Literal
 
 class Settings(BaseSettings):
     app_env: str = Field(default="development", alias="APP_ENV")
@@ -12,6 +12,98 @@ class Settings(BaseSettings):
 
     gemini_api_key: str = Field(default="", alias="GEMINI_API_KEY")
 
+    # Hybrid scorer pickle or exported artifact directory (relative paths
+    # resolve inside app/services)
+    scorer_path: str = Field(default="hybrid_scorer.pkl", alias="SCORER_PATH")
+    scorer_reload_interval: float = Field(default=30.0, alias="SCORER_RELOAD_INTERVAL")
+
+    # Monte Carlo simulation (0 workers = min(4, CPU count); 1 = in-process)
+    simulation_workers: int = Field(default=0, alias="SIMULATION_WORKERS")
+    simulation_parallel_threshold: int = Field(default=50_000, alias="SIMULATION_PARALLEL_THRESHOLD")
+
+    # Local daily price history and return/covariance estimator
+    price_history_dir: str = Field(default="data/prices", alias="PRICE_HISTORY_DIR")
+    price_sync_interval_hours: float = Field(default=0.0, alias="PRICE_SYNC_INTERVAL_HOURS")
+    estimator_ewma_lambda: float = Field(default=0.97, alias="ESTIMATOR_EWMA_LAMBDA")
+    estimator_shrinkage: float = Field(default=0.2, alias="ESTIMATOR_SHRINKAGE")
+    estimator_min_return_obs: int = Field(default=756, alias="ESTIMATOR_MIN_RETURN_OBS")
+    estimator_return_floor: float = Field(default=0.02, alias="ESTIMATOR_RETURN_FLOOR")
+    estimator_return_cap: float = Field(default=0.25, alias="ESTIMATOR_RETURN_CAP")
+
+    # Tactical split inside sleeves: "scores" (hybrid-score proportional) or
+    # "optimizer" (mean-variance with hybrid scores as return views)
+    tactical_mode: Literal["scores", "optimizer"] = Field(default="scores", alias="TACTICAL_MODE")
+    tactical_min_weight: float = Field(default=0.1, alias="TACTICAL_MIN_WEIGHT")
+    tactical_max_weight: float = Field(default=0.7, alias="TACTICAL_MAX_WEIGHT")
+    tactical_view_confidence: float = Field(default=0.25, alias="TACTICAL_VIEW_CONFIDENCE")
+
+    # Rankings: "scorer" (as exported from the notebook) or "factors"
+    # (recomputed from local price history, blended with the model's view)
+    rankings_source: Literal["scorer", "factors"] = Field(default="scorer", alias="RANKINGS_SOURCE")
+    factor_model_weight: float = Field(default=0.5, alias="FACTOR_MODEL_WEIGHT")
+
+    # Scheduled rebalancing of stored portfolios (0 = only via POST /rebalance/run)
+    rebalance_interval_hours: float = Field(default=0.0, alias="REBALANCE_INTERVAL_HOURS")
+    rebalance_band: float = Field(default=0.05, alias="REBALANCE_BAND")
+    rebalance_min_trade: float = Field(default=0.0, alias="REBALANCE_MIN_TRADE")
+
+    # Shared outbound HTTP client (market data). HTTP_HOST_TIMEOUTS overrides
+    # the read/write timeout per host: "host=seconds,host=seconds"
+    yahoo_base_url: str = Field(default="https://query1.finance.yahoo.com", alias="YAHOO_BASE_URL")
+    http_max_connections: int = Field(default=20, alias="HTTP_MAX_CONNECTIONS")
+    http_max_keepalive_connections: int = Field(default=10, alias="HTTP_MAX_KEEPALIVE_CONNECTIONS")
+    http_keepalive_expiry: float = Field(default=30.0, alias="HTTP_KEEPALIVE_EXPIRY")
+    http_client_http2: bool = Field(default=False, alias="HTTP_CLIENT_HTTP2")
+    http_connect_timeout: float = Field(default=5.0, alias="HTTP_CONNECT_TIMEOUT")
+    http_read_timeout: float = Field(default=15.0, alias="HTTP_READ_TIMEOUT")
+    http_pool_timeout: float = Field(default=10.0, alias="HTTP_POOL_TIMEOUT")
+    http_host_timeouts: str = Field(default="", alias="HTTP_HOST_TIMEOUTS")
+
+    # Upstream quote requests: token bucket (requests/s, burst), in-flight
+    # cap and jittered exponential backoff on HTTP 429
+    market_rate_limit: float = Field(default=20.0, alias="MARKET_RATE_LIMIT")
+    market_rate_burst: float = Field(default=20.0, alias="MARKET_RATE_BURST")
+    market_fetch_concurrency: int = Field(default=16, alias="MARKET_FETCH_CONCURRENCY")
+    market_max_retries: int = Field(default=3, alias="MARKET_MAX_RETRIES")
+    market_backoff_base: float = Field(default=0.5, alias="MARKET_BACKOFF_BASE")
+    market_backoff_max: float = Field(default=8.0, alias="MARKET_BACKOFF_MAX")
+    # Lower-priority share of that budget for bulk jobs (screener refresh)
+    market_background_rate_limit: float = Field(default=5.0, alias="MARKET_BACKGROUND_RATE_LIMIT")
+    market_background_concurrency: int = Field(default=4, alias="MARKET_BACKGROUND_CONCURRENCY")
+
+    # Quote cache (seconds): TTL while the market is live / closed, how long
+    # an expired quote may still be served during its refresh, and how long
+    # an unknown symbol is remembered
+    quote_ttl_open: float = Field(default=15.0, alias="QUOTE_TTL_OPEN")
+    quote_ttl_closed: float = Field(default=300.0, alias="QUOTE_TTL_CLOSED")
+    quote_stale_grace: float = Field(default=600.0, alias="QUOTE_STALE_GRACE")
+    quote_negative_ttl: float = Field(default=600.0, alias="QUOTE_NEGATIVE_TTL")
+    quote_cache_size: int = Field(default=5000, alias="QUOTE_CACHE_SIZE")
+
+    # Background quote poller behind /api/market/stream (seconds, 0 = off)
+    market_poll_interval: float = Field(default=15.0, alias="MARKET_POLL_INTERVAL")
+
+    # Bundled symbol list for autocomplete and NSE/BSE resolution (relative
+    # paths resolve inside app/services); read-only seed for the merged master
+    symbol_master_path: str = Field(default="symbol_master.csv", alias="SYMBOL_MASTER_PATH")
+    # Where the master merged with NSE's equity list is written
+    symbol_master_data_dir: str = Field(default="data/symbols", alias="SYMBOL_MASTER_DATA_DIR")
+    # Download NSE's equity list and merge it into the master at startup
+    symbol_master_auto_update: bool = Field(default=False, alias="SYMBOL_MASTER_AUTO_UPDATE")
+
+    # Full-universe screener snapshot refresh (minutes, 0 = only via
+    # POST /api/market/screener/refresh)
+    screener_refresh_minutes: float = Field(default=15.0, alias="SCREENER_REFRESH_MINUTES")
+
+    # Per-host circuit breaker for upstream market data: opens when at
+    # least BREAKER_MIN_CALLS calls in the rolling window fail (errors, 5xx
+    # or slower than BREAKER_SLOW_CALL_SECONDS) at BREAKER_FAILURE_RATE
+    breaker_window_seconds: float = Field(default=60.0, alias="BREAKER_WINDOW_SECONDS")
+    breaker_min_calls: int = Field(default=10, alias="BREAKER_MIN_CALLS")
+    breaker_failure_rate: float = Field(default=0.5, alias="BREAKER_FAILURE_RATE")
+    breaker_slow_call_seconds: float = Field(default=5.0, alias="BREAKER_SLOW_CALL_SECONDS")
+    breaker_open_seconds: float = Field(default=30.0, alias="BREAKER_OPEN_SECONDS")
+
     cors_origins: str = Field(default="http://localhost:5173", alias="CORS_ORIGINS")
 
     @field_validator('cors_origins')
@@ -0,0 +1,202 @@
+"""
+Market Data Fetch Scheduler
+===========================
+Upstream requests go through one scheduler, which
+
+* admits at most ``MARKET_RATE_LIMIT`` requests per second on average
+  (token bucket with ``MARKET_RATE_BURST`` capacity), shared by all callers,
+* keeps at most ``MARKET_FETCH_CONCURRENCY`` requests in flight,
+* retries 429 responses after a jittered exponential backoff (or the
+  server's ``Retry-After``, which also pauses the bucket for everyone), and
+* fails fast while the upstream host's circuit breaker is open.
+
+Bulk jobs (the screener refresh) fetch with ``background=True``: they are
+further limited to ``MARKET_BACKGROUND_RATE_LIMIT`` requests per second and
+``MARKET_BACKGROUND_CONCURRENCY`` in flight, and only one of them waits in
+the shared bucket at a time, so a user request queues behind at most one
+background request instead of the whole job.
+
+Callers can fan out freely with ``asyncio.gather``, with no fixed sleeps.
+"""
+
+import asyncio
+import random
+import time
+from typing import Dict, Optional
+
+import httpx
+
+from app.core.circuit_breaker import get_circuit_breaker
+from app.core.config import settings
+from app.core.http_client import get_http_client
+
+
+class TokenBucket:
+    """Async token bucket; waiters are served in arrival order"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.capacity = max(1.0, burst)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        """Take one token; returns the seconds spent waiting for it"""
+        start = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now >= self._updated:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        return now - start
+                    wait = (1.0 - self._tokens) / self.rate
+                else:
+                    wait = self._updated - now  # paused
+                await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for ``seconds`` (the upstream asked us to back off)"""
+        self._tokens = 0.0
+        self._updated = max(self._updated, time.monotonic() + seconds)
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return max(0.0, float(response.headers["Retry-After"]))
+    except (KeyError, ValueError):
+        return None
+
+
+class FetchScheduler:
+    """Rate-limited, bounded-concurrency GETs with 429 backoff"""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        concurrency: int,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        background_rate: float = 5.0,
+        background_concurrency: int = 4,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.bucket = TokenBucket(rate, burst)
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.background_bucket = TokenBucket(min(background_rate, rate), 1.0)
+        self.background_semaphore = asyncio.Semaphore(max(1, min(background_concurrency, concurrency)))
+        self._background_turn = asyncio.Lock()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._client = client
+        self.stats = {
+            "requests": 0, "background_requests": 0, "throttled": 0, "retries": 0,
+            "rate_wait_s": 0.0, "backoff_s": 0.0,
+        }
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for retry ``attempt`` (0-based)"""
+        return random.uniform(0.0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def _acquire(self, background: bool) -> None:
+        if not background:
+            self.stats["rate_wait_s"] += await self.bucket.acquire()
+            return
+        await self.background_bucket.acquire()
+        async with self._background_turn:
+            await self.bucket.acquire()
+
+    async def _send(
+        self, client: httpx.AsyncClient, breaker, url: str, params, headers, background: bool = False
+    ) -> httpx.Response:
+        """One attempt: breaker check, token, concurrency slot, then the request"""
+        probe = breaker.check()
+        recorded = False
+        try:
+            if background:
+                await self.background_semaphore.acquire()
+            try:
+                await self._acquire(background)
+                async with self.semaphore:
+                    self.stats["requests"] += 1
+                    self.stats["background_requests"] += background
+                    start = time.monotonic()
+                    try:
+                        response = await client.get(url, params=params, headers=headers)
+                    except Exception as e:
+                        recorded = True
+                        breaker.record(False, time.monotonic() - start, f"{type(e).__name__}: {e}", probe)
+                        raise
+            finally:
+                if background:
+                    self.background_semaphore.release()
+            recorded = True
+            ok = response.status_code < 500
+            breaker.record(ok, time.monotonic() - start, None if ok else f"HTTP {response.status_code}", probe)
+            return response
+        finally:
+            if not recorded:
+                breaker.abandon(probe)
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        background: bool = False,
+    ) -> httpx.Response:
+        """
+        GET through the breaker and limiter; the last 429 is returned once
+        retries run out. Raises ``CircuitOpenError`` while the host's
+        breaker is open. ``background`` requests use the low-priority lane.
+        """
+        client = self._client or get_http_client()
+        breaker = get_circuit_breaker(httpx.URL(url).host)
+        attempt = 0
+        while True:
+            response = await self._send(client, breaker, url, params, headers, background)
+            if response.status_code != 429 or attempt >= self.max_retries:
+                return response
+
+            self.stats["throttled"] += 1
+            self.stats["retries"] += 1
+            retry_after = _retry_after(response)
+            if retry_after is not None:
+                self.bucket.pause(retry_after)
+                delay = retry_after + self.backoff(0)
+            else:
+                delay = self.backoff(attempt)
+            self.stats["backoff_s"] += delay
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+_scheduler: Optional[FetchScheduler] = None
+
+
+def get_fetch_scheduler() -> FetchScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = FetchScheduler(
+            rate=settings.market_rate_limit,
+            burst=settings.market_rate_burst,
+            concurrency=settings.market_fetch_concurrency,
+            max_retries=settings.market_max_retries,
+            backoff_base=settings.market_backoff_base,
+            backoff_max=settings.market_backoff_max,
+            background_rate=settings.market_background_rate_limit,
+            background_concurrency=settings.market_background_concurrency,
+        )
+    return _scheduler
+
+
+def close_fetch_scheduler() -> None:
+    """Drop the scheduler (its locks belong to the closing event loop)"""
+    global _scheduler
+    _scheduler = None
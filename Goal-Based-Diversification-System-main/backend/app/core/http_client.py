@@ -0,0 +1,239 @@
+"""
+Shared HTTP Client
+==================
+One pooled ``httpx.AsyncClient`` for outbound market-data requests, created
+in the app lifespan. Connections are kept alive between requests, so a
+quote costs one round trip instead of a TCP + TLS handshake plus a fresh
+connection pool every time.
+
+The client's transport counts requests, new connections and TLS handshakes
+(from httpcore's ``trace`` extension), and applies per-host timeouts from
+``HTTP_HOST_TIMEOUTS``. ``GET /health/http`` reports these together with
+the current pool state.
+"""
+
+import importlib.util
+import time
+from typing import Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+
+def parse_host_timeouts(value: str) -> Dict[str, float]:
+    """``"host=seconds,host=seconds"`` -> {host: seconds}"""
+    timeouts = {}
+    for item in value.split(","):
+        host, sep, seconds = item.strip().partition("=")
+        if sep and host.strip():
+            timeouts[host.strip().lower()] = float(seconds)
+    return timeouts
+
+
+class HttpClientMetrics:
+    """Counters for one client; handshake times are in milliseconds"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+        self.connect_ms = 0.0
+        self.tls_ms = 0.0
+        self.request_ms = 0.0
+        self.status_counts: Dict[int, int] = {}
+
+    def tracer(self):
+        """httpcore ``trace`` callback recording this request's handshakes"""
+        started: Dict[str, float] = {}
+
+        async def trace(event_name: str, info: dict) -> None:
+            step, _, phase = event_name.rpartition(".")
+            if phase == "started":
+                started[step] = time.perf_counter()
+            elif phase == "complete" and step in started:
+                elapsed = (time.perf_counter() - started.pop(step)) * 1000.0
+                if step == "connection.connect_tcp":
+                    self.connections_opened += 1
+                    self.connect_ms += elapsed
+                elif step == "connection.start_tls":
+                    self.tls_handshakes += 1
+                    self.tls_ms += elapsed
+
+        return trace
+
+    def snapshot(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "connections_opened": self.connections_opened,
+            "connection_reuse_ratio": (
+                1.0 - self.connections_opened / self.requests if self.requests else 0.0
+            ),
+            "tls_handshakes": self.tls_handshakes,
+            "avg_connect_ms": self.connect_ms / self.connections_opened if self.connections_opened else 0.0,
+            "avg_tls_ms": self.tls_ms / self.tls_handshakes if self.tls_handshakes else 0.0,
+            "avg_request_ms": self.request_ms / self.requests if self.requests else 0.0,
+            "status_counts": dict(self.status_counts),
+        }
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Wraps an ``AsyncHTTPTransport`` with metrics and per-host timeouts"""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncHTTPTransport,
+        metrics: HttpClientMetrics,
+        host_timeouts: Optional[Dict[str, float]] = None,
+        http2: bool = False,
+    ):
+        self._transport = transport
+        self.metrics = metrics
+        self.host_timeouts = host_timeouts or {}
+        self.http2 = http2
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        metrics = self.metrics
+        host_timeout = self.host_timeouts.get(request.url.host)
+        if host_timeout is not None:
+            timeout = dict(request.extensions.get("timeout", {}))
+            timeout.update(read=host_timeout, write=host_timeout)
+            request.extensions["timeout"] = timeout
+        request.extensions["trace"] = metrics.tracer()
+
+        metrics.requests += 1
+        metrics.in_flight += 1
+        metrics.peak_in_flight = max(metrics.peak_in_flight, metrics.in_flight)
+        start = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            metrics.errors += 1
+            raise
+        finally:
+            metrics.in_flight -= 1
+            metrics.request_ms += (time.perf_counter() - start) * 1000.0
+        metrics.status_counts[response.status_code] = metrics.status_counts.get(response.status_code, 0) + 1
+        return response
+
+    def pool_stats(self) -> dict:
+        """Connections currently held by the pool (httpcore internals, best effort)"""
+        pool = getattr(self._transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        idle = sum(1 for c in connections if c.is_idle())
+        return {"connections": len(connections), "idle": idle, "active": len(connections) - idle}
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def create_http_transport(
+    metrics: Optional[HttpClientMetrics] = None,
+    verify=True,
+    http2: Optional[bool] = None,
+) -> InstrumentedTransport:
+    """
+    Pooled, instrumented transport configured from settings.
+
+    Parameters:
+    -----------
+    metrics : HttpClientMetrics, optional
+        Counters to record into (a new set by default)
+    verify : bool or ssl.SSLContext
+        TLS verification, as for ``httpx.AsyncClient``
+    http2 : bool, optional
+        Override ``HTTP_CLIENT_HTTP2``; ignored with a warning when the
+        ``h2`` package (``httpx[http2]``) is not installed
+    """
+    http2 = settings.http_client_http2 if http2 is None else http2
+    if http2 and not http2_available():
+        print("⚠ HTTP/2 requested but the h2 package is not installed; using HTTP/1.1")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry,
+    )
+    return InstrumentedTransport(
+        httpx.AsyncHTTPTransport(verify=verify, http2=http2, limits=limits),
+        metrics or HttpClientMetrics(),
+        parse_host_timeouts(settings.http_host_timeouts),
+        http2=http2,
+    )
+
+
+def create_http_client(
+    metrics: Optional[HttpClientMetrics] = None,
+    verify=True,
+    http2: Optional[bool] = None,
+    transport: Optional[InstrumentedTransport] = None,
+) -> httpx.AsyncClient:
+    """
+    Pooled client configured from settings, over ``transport`` or a new
+    ``create_http_transport(metrics, verify, http2)``
+    """
+    if transport is None:
+        transport = create_http_transport(metrics, verify, http2)
+    timeout = httpx.Timeout(
+        settings.http_read_timeout,
+        connect=settings.http_connect_timeout,
+        pool=settings.http_pool_timeout,
+    )
+    return httpx.AsyncClient(transport=transport, timeout=timeout, follow_redirects=True)
+
+
+_client: Optional[httpx.AsyncClient] = None
+# The shared client's transport, kept for its metrics and pool state
+_transport: Optional[InstrumentedTransport] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    if _client is None:
+        raise RuntimeError("HTTP client not initialized")
+    return _client
+
+
+def get_http_metrics() -> dict:
+    """Request/handshake counters and pool state of the shared client"""
+    transport = _transport
+    if _client is None or transport is None:
+        return {"initialized": False}
+    return {
+        "initialized": True,
+        "http2": transport.http2,
+        **transport.metrics.snapshot(),
+        "pool": transport.pool_stats(),
+        "limits": {
+            "max_connections": settings.http_max_connections,
+            "max_keepalive_connections": settings.http_max_keepalive_connections,
+            "keepalive_expiry": settings.http_keepalive_expiry,
+        },
+    }
+
+
+async def init_http_client() -> httpx.AsyncClient:
+    global _client, _transport
+    if _client is None:
+        _transport = create_http_transport()
+        _client = create_http_client(transport=_transport)
+        print(f"✓ Shared HTTP client ready (max {settings.http_max_connections} connections)")
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client, _transport
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _transport = None
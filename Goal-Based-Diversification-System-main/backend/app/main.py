@@ -1,20 +1,127 @@
+import asyncio
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from app.core.cors import add_cors
-from app.db.mongo import connect_to_mongo, close_mongo_connection
+from app.core.http_client import init_http_client, close_http_client, get_http_client
+from app.core.fetch_scheduler import close_fetch_scheduler
+from app.services.market_quotes import close_quote_cache
+from app.services.market_stream import start_market_poller, stop_market_poller
+from app.services.screener import get_screener, reload_screener
+from app.services.symbol_master import reload_symbol_master, update_symbol_master
+from app.db.mongo import connect_to_mongo, close_mongo_connection, get_db
+from app.services.scorer_registry import init_scorer_registry, close_scorer_registry
+from app.services.estimator import init_return_estimator, close_return_estimator
+from app.services.factors import init_factor_engine, close_factor_engine
+from app.services.simulation import shutdown_simulation_pool
+from app.services.rebalance import run_rebalance
+from app.services.scorer_registry import get_scorer_registry
+from app.services.rankings_history import get_rankings_history
+from app.core.config import settings
 from app.routers import health as health_router
 from app.routers import user_inputs as inputs_router
 from app.routers import auth as auth_router
 from app.routers import market_data as market_router
 from app.routers import financial as financial_router
+from app.routers import rankings as rankings_router
+from app.routers import rebalance as rebalance_router
+
+RANKINGS_RECORD_SECONDS = 5.0
+
+
+async def _periodic_price_sync(interval_seconds: float) -> None:
+    while True:
+        try:
+            await market_router.sync_history_universe()
+        except Exception as e:
+            print(f"⚠ Price history sync failed: {e}")
+        await asyncio.sleep(interval_seconds)
+
+
+async def _periodic_rebalance(interval_seconds: float) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            summary = await run_rebalance(
+                await get_db(),
+                get_scorer_registry().allocator,
+                band=settings.rebalance_band,
+                min_trade=settings.rebalance_min_trade,
+            )
+            print(f"✓ Rebalanced {summary['portfolios']} portfolios ({summary['orders']} orders)")
+        except Exception as e:
+            print(f"⚠ Scheduled rebalance failed: {e}")
+
+
+async def _record_rankings_activations(interval_seconds: float) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await get_rankings_history().record_activations(await get_db(), get_scorer_registry())
+        except Exception as e:
+            print(f"⚠ Recording rankings activations failed: {e}")
+
+
+async def _update_symbol_master() -> None:
+    try:
+        added = await update_symbol_master(get_http_client())
+        reload_symbol_master()
+        reload_screener()
+        print(f"✓ Symbol master updated from NSE ({added} symbols added)")
+    except Exception as e:
+        print(f"⚠ Symbol master update failed: {e}")
+
+
+async def _periodic_screener_refresh(interval_seconds: float, update_master: bool = False) -> None:
+    if update_master:
+        await _update_symbol_master()
+    while True:
+        try:
+            quoted = await get_screener().refresh()
+            print(f"✓ Screener refreshed ({quoted} symbols quoted)")
+        except Exception as e:
+            print(f"⚠ Screener refresh failed: {e}")
+        await asyncio.sleep(interval_seconds)
+
 
 def create_app() -> FastAPI:
     @asynccontextmanager
     async def lifespan(app: FastAPI):
         await connect_to_mongo()
+        await init_http_client()
+        registry = await init_scorer_registry()
+        await asyncio.to_thread(init_return_estimator, registry.allocator.asset_mapping)
+        if settings.rankings_source == "factors":
+            await asyncio.to_thread(init_factor_engine, registry.allocator.asset_mapping)
+        tasks = [asyncio.create_task(_record_rankings_activations(RANKINGS_RECORD_SECONDS))]
+        if settings.price_sync_interval_hours > 0:
+            tasks.append(asyncio.create_task(_periodic_price_sync(settings.price_sync_interval_hours * 3600)))
+        if settings.rebalance_interval_hours > 0:
+            tasks.append(asyncio.create_task(_periodic_rebalance(settings.rebalance_interval_hours * 3600)))
+        if settings.screener_refresh_minutes > 0:
+            tasks.append(asyncio.create_task(_periodic_screener_refresh(
+                settings.screener_refresh_minutes * 60, settings.symbol_master_auto_update
+            )))
+        elif settings.symbol_master_auto_update:
+            tasks.append(asyncio.create_task(_update_symbol_master()))
+        if settings.market_poll_interval > 0:
+            start_market_poller(market_router.streamed_symbols(), settings.market_poll_interval)
         try:
             yield
         finally:
+            stop_market_poller()
+            for task in tasks:
+                task.cancel()
+            try:
+                await get_rankings_history().record_activations(await get_db(), get_scorer_registry())
+            except Exception as e:
+                print(f"⚠ Recording rankings activations failed: {e}")
+            shutdown_simulation_pool()
+            close_factor_engine()
+            close_return_estimator()
+            await close_scorer_registry()
+            close_quote_cache()
+            close_fetch_scheduler()
+            await close_http_client()
             await close_mongo_connection()
 
     app = FastAPI(title="Goal-Based Hybrid Portfolio Allocation API", version="1.0.0", lifespan=lifespan)
@@ -24,6 +131,8 @@ def create_app() -> FastAPI:
     app.include_router(inputs_router.router)
     app.include_router(market_router.router)
     app.include_router(financial_router.router)
+    app.include_router(rankings_router.router)
+    app.include_router(rebalance_router.router)
     # ML dataset router removed
     return app
 
@@ -1,7 +1,34 @@
 from fastapi import APIRouter
+from app.core.http_client import get_http_metrics
+from app.core.fetch_scheduler import get_fetch_scheduler
+from app.core.circuit_breaker import circuit_breakers_info
+from app.services.market_quotes import get_quote_cache
+from app.services.market_stream import get_market_poller
+from app.services.scorer_registry import get_scorer_registry
 
 router = APIRouter(prefix="/health", tags=["health"])
 
 @router.get("")
 async def health():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@router.get("/scorer")
+async def scorer_health():
+    """Active hybrid scorer version and when it was loaded"""
+    return get_scorer_registry().info()
+
+@router.get("/http")
+async def http_client_health():
+    """Shared HTTP client (requests, handshakes, pool usage) and fetch scheduler counters"""
+    return {**get_http_metrics(), "scheduler": get_fetch_scheduler().stats}
+
+@router.get("/quotes")
+async def quote_cache_health():
+    """Quote cache counters and the background poller's state"""
+    poller = get_market_poller()
+    return {**get_quote_cache().info(), "poller": poller.info() if poller else None}
+
+@router.get("/upstreams")
+async def upstream_health():
+    """Circuit breaker state, rolling failure rate and latency per upstream host"""
+    return circuit_breakers_info()
@@ -2,13 +2,30 @@
 NSE/BSE Market Data API Router
 Fetches live market prices for Indian stock exchanges
 """
-from fastapi import APIRouter, HTTPException
-import httpx
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from typing import List, Dict, Any, Optional
 import asyncio
+import json
+import time
+
+import numpy as np
+
+from app.services.market_quotes import get_quote_cache, upstream_available
+from app.services.market_stream import get_market_poller
+from app.services.symbol_master import EXCHANGE_SUFFIXES, get_symbol_master
+from app.services.screener import get_screener
+from app.core.config import settings
+from app.services.chart_history import INTERVALS, RANGES, chart_etag, chart_series
+from app.services.price_store import get_price_store, sync_price_history
+from app.services.estimator import refresh_return_estimator
+from app.services.factors import refresh_factor_engine
+from app.services.scorer_registry import get_scorer_registry
 
 router = APIRouter(prefix="/api/market", tags=["market"])
 
+STREAM_KEEPALIVE_SECONDS = 15.0
+
 # Popular indices and stocks
 INDICES = {
     "NIFTY 50": "^NSEI",
@@ -32,76 +49,26 @@ POPULAR_STOCKS = {
 
 
 async def fetch_stock_data(symbol: str, name: str) -> Dict[str, Any]:
-    """Fetch stock data from Yahoo Finance via API"""
+    """Quote for ``symbol`` labelled ``name`` (served from the quote cache), or None"""
     try:
-        url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
-        params = {"interval": "1d", "range": "1d"}
-        
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Accept": "application/json",
-            "Accept-Language": "en-US,en;q=0.9"
-        }
-        
-        # Add small delay to avoid rate limiting
-        await asyncio.sleep(0.2)
-        
-        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-            response = await client.get(url, params=params, headers=headers)
-            
-        if response.status_code != 200:
-            print(f"Error fetching {symbol}: HTTP {response.status_code}")
-            return None
-            
-        data = response.json()
-        
-        if "chart" not in data or "result" not in data["chart"]:
-            print(f"Error fetching {symbol}: Invalid response structure")
-            return None
-        
-        if not data["chart"]["result"] or len(data["chart"]["result"]) == 0:
-            print(f"Error fetching {symbol}: No results in response")
-            return None
-            
-        result = data["chart"]["result"][0]
-        meta = result.get("meta", {})
-        
-        current_price = meta.get("regularMarketPrice", 0)
-        previous_close = meta.get("previousClose", 0)
-        
-        if current_price and previous_close:
-            change = current_price - previous_close
-            change_percent = (change / previous_close) * 100
-        else:
-            change = 0
-            change_percent = 0
-        
-        return {
-            "name": name,
-            "symbol": symbol,
-            "price": round(current_price, 2) if current_price else 0,
-            "change": round(change, 2),
-            "changePercent": round(change_percent, 2),
-            "previousClose": round(previous_close, 2) if previous_close else 0,
-            "marketState": meta.get("marketState", "CLOSED")
-        }
-    except Exception as e:
-        print(f"Error fetching {symbol}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        quote = await get_quote_cache().get(symbol)
+    except Exception:
+        return None
+    if quote is None:
         return None
+    return {"name": name, **quote}
+
+
+async def fetch_many(symbols: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Fetch {name: symbol} concurrently; failed symbols are left out, order is kept"""
+    results = await asyncio.gather(*(fetch_stock_data(symbol, name) for name, symbol in symbols.items()))
+    return [r for r in results if r is not None]
 
 
 @router.get("/indices")
 async def get_market_indices():
     """Get live prices for major Indian indices"""
-    # Fetch indices one by one with delays to avoid rate limiting
-    indices_data = []
-    for name, symbol in INDICES.items():
-        result = await fetch_stock_data(symbol, name)
-        if result is not None:
-            indices_data.append(result)
-        await asyncio.sleep(0.3)  # 300ms delay between requests
+    indices_data = await fetch_many(INDICES)
     
     if not indices_data:
         raise HTTPException(status_code=503, detail="Unable to fetch market data. Please try again later.")
@@ -112,13 +79,7 @@ async def get_market_indices():
 @router.get("/stocks")
 async def get_popular_stocks():
     """Get live prices for popular stocks"""
-    # Fetch stocks one by one with delays to avoid rate limiting
-    stocks_data = []
-    for name, symbol in POPULAR_STOCKS.items():
-        result = await fetch_stock_data(symbol, name)
-        if result is not None:
-            stocks_data.append(result)
-        await asyncio.sleep(0.3)  # 300ms delay between requests
+    stocks_data = await fetch_many(POPULAR_STOCKS)
     
     if not stocks_data:
         raise HTTPException(status_code=503, detail="Unable to fetch stock data. Please try again later.")
@@ -142,22 +103,233 @@ async def get_all_market_data():
     }
 
 
+def streamed_symbols() -> Dict[str, str]:
+    """{symbol: name} kept fresh by the background poller"""
+    return {symbol: name for name, symbol in {**INDICES, **POPULAR_STOCKS}.items()}
+
+
+def _sse(event: str, data: Dict[str, Any], event_id: int) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+@router.get("/stream")
+async def stream_market_data(request: Request):
+    """
+    Server-sent events from the background poller: one ``snapshot`` event
+    with every quote, then ``quotes`` events carrying only changed quotes
+    """
+    poller = get_market_poller()
+    if poller is None:
+        raise HTTPException(status_code=503, detail="Market stream is disabled (MARKET_POLL_INTERVAL=0)")
+    subscription = poller.subscribe()
+
+    async def events():
+        try:
+            yield _sse("snapshot", {"quotes": poller.snapshot()}, poller.version)
+            while not await request.is_disconnected():
+                changed = await subscription.next(timeout=STREAM_KEEPALIVE_SECONDS)
+                if changed:
+                    yield _sse("quotes", {"quotes": changed}, poller.version)
+                else:
+                    yield ": keep-alive\n\n"
+        finally:
+            poller.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def first_quote(candidates: List[str], name: str) -> Optional[Dict[str, Any]]:
+    """Query every candidate symbol concurrently; the first valid quote wins"""
+    tasks = [asyncio.ensure_future(fetch_stock_data(c, name)) for c in candidates]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            if result is not None:
+                return result
+        return None
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+@router.get("/symbols/autocomplete")
+async def autocomplete_symbols(q: str = Query(..., min_length=1, max_length=40), limit: int = Query(10, ge=1, le=50)):
+    """Symbols whose ticker or company name starts with ``q`` (local symbol master, no network)"""
+    return {"results": [l.to_dict() for l in get_symbol_master().complete(q, limit)]}
+
+
+@router.get("/screener")
+async def screen_market(
+    sector: Optional[List[str]] = Query(None),
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_change: Optional[float] = None,
+    max_change: Optional[float] = None,
+    min_volume: Optional[int] = None,
+    sort: str = Query("changePercent", pattern="^(changePercent|change|price|volume)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(20, ge=1, le=500),
+):
+    """Filter and rank the NSE universe snapshot (no upstream calls)"""
+    return get_screener().query(
+        sectors=sector,
+        min_price=min_price,
+        max_price=max_price,
+        min_change=min_change,
+        max_change=max_change,
+        min_volume=min_volume,
+        sort=sort,
+        descending=order == "desc",
+        limit=limit,
+    )
+
+
+@router.get("/movers")
+async def market_movers(limit: int = Query(5, ge=1, le=50)):
+    """Top gainers/losers and sector movers from the screener snapshot"""
+    return get_screener().movers(limit)
+
+
+@router.post("/screener/refresh")
+async def refresh_screener():
+    """Refetch the whole screener universe now"""
+    screener = get_screener()
+    quoted = await screener.refresh()
+    return {"symbols": len(screener.snapshot.symbols), "quoted": quoted, "as_of": screener.snapshot.as_of}
+
+
 @router.get("/search/{symbol}")
 async def search_stock(symbol: str):
     """Search for a specific stock by symbol"""
-    # Try NSE first
-    nse_symbol = f"{symbol.upper()}.NS"
-    result = await fetch_stock_data(nse_symbol, symbol.upper())
-    
-    if result:
-        return result
-    
-    # Try BSE if NSE fails
-    bse_symbol = f"{symbol.upper()}.BO"
-    result = await fetch_stock_data(bse_symbol, symbol.upper())
+    # Known symbols go straight to their exchange; unknown ones query NSE and BSE at once
+    master = get_symbol_master()
+    base, candidates = master.resolve(symbol)
+    listing = master.lookup(base)
+    result = await first_quote(candidates, listing.name if listing else base)
     
     if result:
         return result
+    if not upstream_available():
+        raise HTTPException(status_code=503, detail="Market data provider unavailable. Please try again later.")
     
     raise HTTPException(status_code=404, detail=f"Stock {symbol} not found")
 
+
+def price_history_symbols() -> List[str]:
+    """Symbols kept in the local price history store, including on-demand backfills"""
+    asset_tickers = get_scorer_registry().allocator.asset_mapping.values()
+    symbols = list(asset_tickers) + list(INDICES.values()) + list(POPULAR_STOCKS.values())
+    return list(dict.fromkeys(symbols + get_price_store().tickers()))
+
+
+async def sync_history_universe() -> Dict[str, int]:
+    """Append new daily bars for the whole universe and refresh estimates and rankings"""
+    written = await sync_price_history(get_price_store(), price_history_symbols())
+    if any(written.values()):
+        await asyncio.to_thread(refresh_return_estimator)
+        await asyncio.to_thread(refresh_factor_engine)
+    return written
+
+
+@router.post("/history/sync")
+async def sync_price_history_endpoint():
+    """Append any new daily bars to the local price history store"""
+    written = await sync_history_universe()
+    return {"bars_written": written, "total": sum(written.values())}
+
+
+_history_updates: Dict[str, asyncio.Task] = {}
+# Symbol -> monotonic time until which a fruitless update is not retried
+_history_retry_at: Dict[str, float] = {}
+
+
+def backfillable(symbol: str) -> bool:
+    """Whether ``symbol`` may be downloaded on demand: a tracked symbol or a symbol-master listing"""
+    tracked = (INDICES.values(), POPULAR_STOCKS.values(), get_scorer_registry().allocator.asset_mapping.values())
+    if any(symbol in symbols for symbols in tracked):
+        return True
+    for suffix, exchange in EXCHANGE_SUFFIXES.items():
+        if symbol.endswith(suffix):
+            listing = get_symbol_master().lookup(symbol[: -len(suffix)])
+            return listing is not None and exchange in listing.exchanges
+    return False
+
+
+def last_session() -> np.datetime64:
+    """Most recent weekday before today (exchange holidays are not known)"""
+    return np.busday_offset(np.datetime64("today", "D") - 1, 0, roll="backward")
+
+
+async def _update_history(symbol: str) -> int:
+    """
+    Backfill a symbol the store does not have yet, or top it up with the
+    bars since its last stored date (single-flight). Failures and updates
+    that add nothing are remembered for ``QUOTE_NEGATIVE_TTL`` seconds,
+    during which the symbol is not retried.
+    """
+    if time.monotonic() < _history_retry_at.get(symbol, 0.0):
+        return 0
+    task = _history_updates.get(symbol)
+    if task is None:
+        async def update() -> int:
+            # Shares the store's per-ticker writer with the periodic sync
+            written = (await sync_price_history(get_price_store(), [symbol]))[symbol]
+            if written == 0:
+                _history_retry_at[symbol] = time.monotonic() + settings.quote_negative_ttl
+            else:
+                _history_retry_at.pop(symbol, None)
+            return written
+
+        task = asyncio.ensure_future(update())
+        _history_updates[symbol] = task
+        task.add_done_callback(lambda _: _history_updates.pop(symbol, None))
+    return await asyncio.shield(task)
+
+
+def history_symbol(symbol: str) -> str:
+    """Store key for ``symbol``: index names and bare tickers map to Yahoo symbols"""
+    symbol = symbol.strip()
+    if symbol.upper() in INDICES:
+        return INDICES[symbol.upper()]
+    if symbol.startswith("^") or "." in symbol:
+        return symbol.upper()
+    return get_symbol_master().resolve(symbol)[1][0]
+
+
+@router.get("/history/{symbol}")
+async def get_price_history(
+    symbol: str,
+    request: Request,
+    range: str = Query("1y", pattern="^(" + "|".join(RANGES) + ")$"),
+    interval: str = Query("1d", pattern="^(" + "|".join(INTERVALS) + ")$"),
+    points: int = Query(500, ge=3, le=5000),
+):
+    """
+    Daily closes from the local price store, downsampled with LTTB to at
+    most ``points`` rows. Indices and symbol-master listings are backfilled
+    from upstream on first use and topped up when older than the last
+    session; responses carry an ETag so unchanged ranges return 304.
+    """
+    store = get_price_store()
+    key = history_symbol(symbol)
+    last = store.last_date(key)
+    if last is None and not backfillable(key):
+        raise HTTPException(status_code=404, detail=f"No price history for {symbol}")
+    if (last is None or last < last_session()) and backfillable(key):
+        # A failed top-up still serves the stored history
+        await _update_history(key)
+    etag = chart_etag(store, key, range, interval, points)
+    if etag is None:
+        raise HTTPException(status_code=404, detail=f"No price history for {symbol}")
+
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=60"}
+    if etag in (t.strip() for t in request.headers.get("if-none-match", "").split(",")):
+        return Response(status_code=304, headers=headers)
+
+    series = await asyncio.to_thread(chart_series, store, key, range, interval, points)
+    body = {"symbol": key, "range": range, "interval": interval, "points": len(series["columns"]["date"]), **series}
+    return JSONResponse(body, headers=headers)
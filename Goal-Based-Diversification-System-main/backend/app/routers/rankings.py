@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime, timezone
+from typing import Any
+
+from app.db.mongo import get_db
+from app.schemas.user_input import RankingsSnapshotModel
+from app.services.rankings_history import get_rankings_history
+from app.services.scorer_registry import get_scorer_registry
+
+router = APIRouter(prefix="/rankings", tags=["rankings"])
+
+
+def _not_found(detail: str) -> HTTPException:
+    return HTTPException(status_code=404, detail=detail)
+
+
+@router.get("/current", response_model=RankingsSnapshotModel)
+async def get_current_rankings(db=Depends(get_db)) -> Any:
+    """Rankings currently used for allocations (persisted as a snapshot)"""
+    history = get_rankings_history()
+    version = await history.record_active(db, get_scorer_registry().snapshot)
+    if version is None:
+        raise _not_found("No rankings loaded; allocations are rule-based only")
+    return (await history.get(db, version)).to_dict()
+
+
+@router.get("", response_model=RankingsSnapshotModel)
+async def get_rankings_as_of(
+    as_of: datetime = Query(description="Point in time (ISO 8601); naive values are UTC"),
+    db=Depends(get_db),
+) -> Any:
+    """Rankings snapshot that was active at ``as_of``"""
+    if as_of.tzinfo is None:
+        as_of = as_of.replace(tzinfo=timezone.utc)
+    history = get_rankings_history()
+    # Activations are queued in memory until the recorder writes them
+    await history.record_activations(db, get_scorer_registry())
+    snapshot = await history.as_of(db, as_of)
+    if snapshot is None:
+        raise _not_found(f"No rankings snapshot active at {as_of.isoformat()}")
+    return snapshot.to_dict()
+
+
+@router.get("/{version}", response_model=RankingsSnapshotModel)
+async def get_rankings_version(version: str, db=Depends(get_db)) -> Any:
+    """Rankings snapshot by version (content hash)"""
+    snapshot = await get_rankings_history().get(db, version)
+    if snapshot is None:
+        raise _not_found(f"Rankings version {version} not found")
+    return snapshot.to_dict()
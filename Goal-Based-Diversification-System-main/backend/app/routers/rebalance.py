@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Any
+import asyncio
+
+import numpy as np
+
+from app.db.mongo import get_db
+from app.schemas.rebalance import (
+    RebalancePlanRequest,
+    RebalancePlanResult,
+    RebalanceRunRequest,
+    RebalanceRunResult,
+)
+from app.services.allocation import ASSET_CLASSES
+from app.services.rebalance import plan_trades, run_rebalance, target_weights
+from app.services.scorer_registry import get_scorer_registry
+
+router = APIRouter(prefix="/rebalance", tags=["rebalance"])
+
+
+@router.post("/plan", response_model=RebalancePlanResult)
+async def plan_portfolios(payload: RebalancePlanRequest) -> Any:
+    """Vectorized trade lists for the given portfolios (nothing is stored)"""
+    unknown = set(payload.holdings) - set(ASSET_CLASSES)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown asset classes: {sorted(unknown)}")
+    n = len(payload.horizon)
+    holdings = np.column_stack([
+        np.asarray(payload.holdings.get(a, np.zeros(n)), dtype=np.float64) for a in ASSET_CLASSES
+    ])
+    targets = target_weights(get_scorer_registry().allocator, payload.horizon, payload.risk_profile)
+    plan, trades = await asyncio.to_thread(
+        plan_trades, holdings, targets, payload.pending_sip, payload.band, payload.min_trade
+    )
+    return RebalancePlanResult(
+        count=n,
+        rebalanced=plan.rebalanced.tolist(),
+        drift=plan.drift.tolist(),
+        turnover=np.abs(trades).sum(axis=1).tolist(),
+        trades={a: trades[:, i].tolist() for i, a in enumerate(ASSET_CLASSES)},
+    )
+
+
+@router.post("/run", response_model=RebalanceRunResult)
+async def run_portfolio_rebalance(payload: RebalanceRunRequest, db=Depends(get_db)) -> Any:
+    """Rebalance every stored portfolio now and write its orders"""
+    return await run_rebalance(
+        db,
+        get_scorer_registry().allocator,
+        band=payload.band,
+        min_trade=payload.min_trade,
+    )
@@ -1,21 +1,49 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from datetime import datetime, timezone
-from typing import Any
+from typing import Annotated, Any, List, Literal
 from bson import ObjectId
+from pydantic import Field
+import asyncio
+import json
 
 from app.db.mongo import get_db
 from app.schemas.user_input import (
     UserInputCreate,
+    UserInputBatchCreate,
+    UserInputBatchResult,
     UserInputModel,
     UserInputResult,
+    SimulationRequest,
+    SimulationResult,
+    SIPSurfaceResult,
+    BacktestRequest,
+    BacktestResult,
+    RankingsSnapshotModel,
+    GlidePathRequest,
+    GlidePathResult,
     AllocationModel,
     SIPResult,
     Breakdown,
     EquityBreakdown,
     AltsBreakdown,
 )
-from app.services.allocation import PortfolioAllocationSystem
-from app.services.sip import estimate_portfolio_return, calculate_monthly_sip
+from app.services.scorer_registry import get_scorer_registry
+from app.services.rankings_history import get_rankings_history
+from app.services.sip import calculate_monthly_sip, sip_surface, return_basis
+from app.services.estimator import bounded_sleeve_statistics, get_return_estimate
+from app.services.allocation_table import HORIZONS
+from app.services.allocation import RISK_PROFILES
+from app.services.backtest import backtest_allocation_grid, json_columns
+from app.services.glide_path import glide_path_schedule, glide_path_sip
+from app.services.price_store import get_price_store
+from app.services.simulation import (
+    DEFAULT_ANNUAL_RETURNS,
+    SIM_ASSETS,
+    simulate_goal_success,
+    default_simulation_workers,
+)
+from app.core.config import settings
 from app.llm.portfolio_summarizer import generate_portfolio_summary
 
 router = APIRouter(prefix="/inputs", tags=["inputs"])
@@ -23,23 +51,22 @@ router = APIRouter(prefix="/inputs", tags=["inputs"])
 
 @router.post("", response_model=UserInputResult)
 async def create_user_input(payload: UserInputCreate, db=Depends(get_db)) -> Any:
+    # One snapshot for the whole request, so the stored rankings version is
+    # exactly the one the allocation below was computed with
+    snapshot = get_scorer_registry().snapshot
+    rankings_version = await get_rankings_history().record_active(db, snapshot)
     doc = {
         "target_corpus": payload.target_corpus,
         "horizon": payload.horizon,
         "risk_profile": payload.risk_profile,
         "timestamp": datetime.now(timezone.utc),
+        "rankings_version": rankings_version,
     }
     result = await db["user_inputs"].insert_one(doc)
 
-    allocator = PortfolioAllocationSystem()
-    strategic_alloc = allocator.rule_based_allocation(payload.horizon, payload.risk_profile)
-    allocation_dict = {
-        "equity": strategic_alloc.get("equity", 0.0),
-        "debt": strategic_alloc.get("debt", 0.0),
-        # Map gold + silver to legacy 'alts' for UI compatibility
-        "alts": strategic_alloc.get("gold", 0.0) + strategic_alloc.get("silver", 0.0),
-    }
-    expected_return = estimate_portfolio_return(allocation_dict)
+    entry = snapshot.table.get(payload.horizon, payload.risk_profile)
+    allocation_dict = dict(entry.allocation)
+    expected_return = entry.expected_return
     monthly_sip = calculate_monthly_sip(payload.target_corpus, payload.horizon, expected_return)
 
     user_input = UserInputModel(
@@ -48,14 +75,14 @@ async def create_user_input(payload: UserInputCreate, db=Depends(get_db)) -> Any
         horizon=payload.horizon,
         risk_profile=payload.risk_profile,
         timestamp=doc["timestamp"],
+        rankings_version=rankings_version,
     )
     allocation = AllocationModel(**allocation_dict)
     sip = SIPResult(expected_return_annual=expected_return, monthly_sip=monthly_sip)
 
     # Hybrid tactical breakdowns
-    equity_bd_dict = allocator.get_equity_breakdown(strategic_alloc.get("equity", 0.0))
-    alts_total = strategic_alloc.get("gold", 0.0) + strategic_alloc.get("silver", 0.0)
-    alts_bd_dict = allocator.get_alternatives_breakdown(alts_total)
+    equity_bd_dict = entry.equity_breakdown
+    alts_bd_dict = entry.alts_breakdown
 
     equity_bd = EquityBreakdown(
         large_cap=equity_bd_dict.get("Large Cap", 0.0),
@@ -70,7 +97,7 @@ async def create_user_input(payload: UserInputCreate, db=Depends(get_db)) -> Any
 
     notes = {
         "allocation_basis": "Hybrid system: Rule-based strategic (Equity/Debt/Gold/Silver) with ML+factor tactical layer; UI shows Gold+Silver as Alts.",
-        "return_basis": "Fallback default annual returns used until data-driven estimates are enabled.",
+        "return_basis": return_basis(),
     }
     
     # Generate AI summary before building portfolio table
@@ -83,23 +110,8 @@ async def create_user_input(payload: UserInputCreate, db=Depends(get_db)) -> Any
         portfolio_table=[]  # Will be populated below
     )
 
-    # Build portfolio table
-    portfolio_df = allocator.construct_portfolio(
-        payload.horizon,
-        payload.risk_profile,
-        payload.target_corpus,
-        monthly_sip
-    )
-    # Prepare for API serialization (list of dicts, 'Allocation (%)', Asset Class, Category, Monthly SIP)
-    portfolio_table = []
-    for row in portfolio_df.to_dict(orient="records"):
-        # Only expose keys we want
-        portfolio_table.append({
-            "asset_class": row["Category"],
-            "sub_category": row["Asset Class"],
-            "allocation": row["Allocation (%)"],
-            "monthly_sip": row["Monthly Amount (₹)"] or 0,
-        })
+    # Build portfolio table (list of dicts: asset_class, sub_category, allocation %, monthly_sip)
+    portfolio_table = entry.portfolio_table(monthly_sip)
 
     # Generate final AI summary with complete portfolio table
     ai_summary = generate_portfolio_summary(
@@ -137,10 +149,215 @@ async def get_user_inputs(db=Depends(get_db)) -> Any:
                 target_corpus=doc["target_corpus"],
                 horizon=doc["horizon"],
                 risk_profile=doc["risk_profile"],
-                timestamp=doc["timestamp"]
+                timestamp=doc["timestamp"],
+                rankings_version=doc.get("rankings_version"),
             )
         )
     
     return results
 
 
+@router.get("/{input_id}/rankings", response_model=RankingsSnapshotModel)
+async def get_user_input_rankings(input_id: str, db=Depends(get_db)) -> Any:
+    """Rankings snapshot a stored goal was computed with"""
+    if not ObjectId.is_valid(input_id):
+        raise HTTPException(status_code=404, detail="User input not found")
+    doc = await db["user_inputs"].find_one({"_id": ObjectId(input_id)}, {"rankings_version": 1})
+    if doc is None:
+        raise HTTPException(status_code=404, detail="User input not found")
+    version = doc.get("rankings_version")
+    if version is None:
+        raise HTTPException(status_code=404, detail="No rankings version recorded for this input")
+    snapshot = await get_rankings_history().get(db, version)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"Rankings version {version} not found")
+    return snapshot.to_dict()
+
+
+@router.post("/batch", response_model=UserInputBatchResult)
+async def create_user_inputs_batch(
+    payload: UserInputBatchCreate,
+    format: Literal["columnar", "ndjson"] = Query(default="columnar"),
+    db=Depends(get_db),
+) -> Any:
+    """Create many goals at once; allocations and SIPs are computed vectorized"""
+    snapshot = get_scorer_registry().snapshot
+    rankings_version = await get_rankings_history().record_active(db, snapshot)
+    allocator = snapshot.allocator
+    batch = allocator.construct_portfolio_batch(
+        payload.horizon,
+        payload.risk_profile,
+        payload.target_corpus,
+    )
+
+    timestamp = datetime.now(timezone.utc)
+    docs = [
+        {
+            "target_corpus": corpus,
+            "horizon": horizon,
+            "risk_profile": risk_profile,
+            "timestamp": timestamp,
+            "rankings_version": rankings_version,
+        }
+        for corpus, horizon, risk_profile in zip(payload.target_corpus, payload.horizon, payload.risk_profile)
+    ]
+    result = await db["user_inputs"].insert_many(docs, ordered=False)
+    ids = [str(_id) for _id in result.inserted_ids]
+
+    columns = {
+        "target_corpus": payload.target_corpus,
+        "horizon": payload.horizon,
+        "risk_profile": payload.risk_profile,
+        "expected_return_annual": batch["expected_return"].tolist(),
+        "monthly_sip": batch["monthly_sip"].tolist(),
+        "equity": batch["equity"].tolist(),
+        "debt": batch["debt"].tolist(),
+        "alts": batch["alts"].tolist(),
+        "large_cap": batch["Large Cap"].tolist(),
+        "mid_cap": batch["Mid Cap"].tolist(),
+        "small_cap": batch["Small Cap"].tolist(),
+        "debt_fund": batch["Debt"].tolist(),
+        "gold": batch["Gold"].tolist(),
+        "silver": batch["Silver"].tolist(),
+    }
+
+    if format == "ndjson":
+        names = list(columns)
+
+        def rows():
+            for i, row in enumerate(zip(*columns.values())):
+                yield json.dumps({"id": ids[i], **dict(zip(names, row))}) + "\n"
+
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+    return UserInputBatchResult(count=len(ids), ids=ids, rankings_version=rankings_version, columns=columns)
+
+
+@router.post("/simulate", response_model=SimulationResult)
+async def simulate_user_input(payload: SimulationRequest) -> Any:
+    """Monte Carlo probability of reaching the target corpus with the goal's SIP"""
+    entry = get_scorer_registry().table.get(payload.horizon, payload.risk_profile)
+    monthly_sip = payload.monthly_sip or calculate_monthly_sip(
+        payload.target_corpus, payload.horizon, entry.expected_return
+    )
+    workers = settings.simulation_workers or default_simulation_workers()
+
+    # Use data-driven sleeve statistics when available, else simulation
+    # defaults; returns get the same bounds as the SIP quotes
+    estimate = get_return_estimate()
+    assumptions = {}
+    if estimate is not None:
+        returns, volatility, correlation = bounded_sleeve_statistics(
+            estimate, SIM_ASSETS, DEFAULT_ANNUAL_RETURNS
+        )
+        assumptions = {
+            "annual_returns": returns,
+            "annual_volatility": volatility,
+            "correlation": correlation,
+        }
+
+    outcome = await asyncio.to_thread(
+        simulate_goal_success,
+        entry.strategic,
+        monthly_sip,
+        payload.horizon,
+        payload.target_corpus,
+        n_paths=payload.n_paths,
+        seed=payload.seed,
+        workers=workers,
+        parallel_threshold=settings.simulation_parallel_threshold,
+        **assumptions,
+    )
+
+    return SimulationResult(
+        target_corpus=payload.target_corpus,
+        horizon=payload.horizon,
+        risk_profile=payload.risk_profile,
+        monthly_sip=monthly_sip,
+        n_paths=outcome.n_paths,
+        seed=payload.seed,
+        success_probability=outcome.success_probability,
+        mean_corpus=outcome.mean_corpus,
+        percentiles=outcome.percentiles,
+    )
+
+
+@router.get("/sip-surface", response_model=SIPSurfaceResult)
+async def get_sip_surface(
+    target_corpus: int = Query(gt=0),
+    return_shifts: List[Annotated[float, Field(ge=-0.5, le=0.5, allow_inf_nan=False)]] = Query(
+        default=[-0.02, -0.01, 0.0, 0.01, 0.02],
+        min_length=1,
+        max_length=50,
+        description="Return assumptions as shifts to each profile's expected annual return",
+    ),
+) -> Any:
+    """Read-only SIP grid over every horizon, risk profile and return assumption"""
+    table = get_scorer_registry().table
+    surface = sip_surface(target_corpus, table.expected_return_grid, return_shifts)
+    return SIPSurfaceResult(
+        target_corpus=target_corpus,
+        horizons=list(HORIZONS),
+        risk_profiles=list(RISK_PROFILES),
+        return_shifts=return_shifts,
+        expected_return_annual=surface["expected_return"].tolist(),
+        monthly_sip=surface["monthly_sip"].tolist(),
+        total_invested=surface["total_invested"].tolist(),
+        wealth_multiple=surface["wealth_multiple"].tolist(),
+    )
+
+
+@router.post("/backtest", response_model=BacktestResult)
+async def backtest_allocations(payload: BacktestRequest) -> Any:
+    """Replay the SIP for every horizon x risk profile bucket over local price history"""
+    columns = await asyncio.to_thread(
+        backtest_allocation_grid,
+        get_scorer_registry().allocator,
+        get_price_store(),
+        payload.target_corpus,
+        rebalance=payload.rebalance,
+        drift_band=payload.drift_band,
+        start=payload.start,
+        end=payload.end,
+    )
+    if columns is None:
+        raise HTTPException(status_code=503, detail="Not enough local price history to run a backtest. Sync price history and try again.")
+
+    return BacktestResult(
+        target_corpus=payload.target_corpus,
+        rebalance=payload.rebalance,
+        drift_band=payload.drift_band,
+        count=len(columns["horizon"]),
+        columns=json_columns(columns),
+    )
+
+
+@router.post("/glide-path", response_model=GlidePathResult)
+async def project_glide_path(payload: GlidePathRequest) -> Any:
+    """Monthly allocation, contribution and corpus as the goal de-risks toward maturity"""
+    allocator = get_scorer_registry().allocator
+    monthly_sip = payload.monthly_sip or glide_path_sip(
+        allocator,
+        payload.target_corpus,
+        payload.horizon,
+        payload.risk_profile,
+        payload.annual_step_up,
+    )
+    columns = glide_path_schedule(
+        allocator,
+        payload.horizon,
+        payload.risk_profile,
+        monthly_sip,
+        payload.annual_step_up,
+    )
+    return GlidePathResult(
+        target_corpus=payload.target_corpus,
+        horizon=payload.horizon,
+        risk_profile=payload.risk_profile,
+        monthly_sip=monthly_sip,
+        annual_step_up=payload.annual_step_up,
+        projected_corpus=float(columns["corpus"][-1]),
+        total_invested=float(columns["total_invested"][-1]),
+        months=len(columns["month"]),
+        columns=json_columns(columns),
+    )
@@ -0,0 +1,50 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Annotated, Dict, List, Optional
+from datetime import datetime
+
+from app.schemas.user_input import RiskProfile
+
+Amount = Annotated[float, Field(ge=0, allow_inf_nan=False)]
+
+
+class RebalancePlanRequest(BaseModel):
+    """Columnar portfolios: the i-th entries of each list form one portfolio"""
+    horizon: List[Annotated[int, Field(ge=1, le=30)]] = Field(min_length=1, max_length=500_000)
+    risk_profile: List[RiskProfile]
+    holdings: Dict[str, List[Amount]] = Field(description="Current value per asset class, keyed by asset class name")
+    pending_sip: Optional[List[Amount]] = Field(default=None, description="New cash to invest per portfolio")
+    band: float = Field(default=0.05, ge=0, le=1)
+    min_trade: float = Field(default=0.0, ge=0, description="Drop trades smaller than this amount (buys are scaled down to stay funded)")
+
+    @model_validator(mode="after")
+    def check_lengths(self):
+        n = len(self.horizon)
+        columns = [self.risk_profile, *self.holdings.values()]
+        if self.pending_sip is not None:
+            columns.append(self.pending_sip)
+        if any(len(c) != n for c in columns):
+            raise ValueError("All columns must have the same length")
+        return self
+
+
+class RebalancePlanResult(BaseModel):
+    """Columnar trades (positive = buy) plus per-portfolio drift"""
+    count: int
+    rebalanced: List[bool]
+    drift: List[float]
+    turnover: List[float]
+    trades: Dict[str, List[float]]
+
+
+class RebalanceRunRequest(BaseModel):
+    band: float = Field(default=0.05, ge=0, le=1)
+    min_trade: float = Field(default=0.0, ge=0, description="Drop trades smaller than this amount (buys are scaled down to stay funded)")
+
+
+class RebalanceRunResult(BaseModel):
+    run_id: str
+    run_at: datetime
+    portfolios: int
+    orders: int
+    rebalanced: int
+    turnover: float
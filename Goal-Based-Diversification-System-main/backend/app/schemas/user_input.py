@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Literal, Optional, Dict
-from datetime import datetime
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+from typing import Annotated, Literal, Optional, Dict, List
+from datetime import date, datetime
 
 
 RiskProfile = Literal["Conservative", "Moderate", "Aggressive"]
@@ -12,12 +12,26 @@ class UserInputCreate(BaseModel):
     risk_profile: RiskProfile
 
 
+class UserInputBatchCreate(BaseModel):
+    """Columnar batch of goals: the i-th entries of each list form one goal"""
+    target_corpus: List[Annotated[int, Field(gt=0)]] = Field(min_length=1, max_length=100_000)
+    horizon: List[Annotated[int, Field(ge=1, le=30)]]
+    risk_profile: List[RiskProfile]
+
+    @model_validator(mode="after")
+    def check_lengths(self):
+        if not (len(self.target_corpus) == len(self.horizon) == len(self.risk_profile)):
+            raise ValueError("target_corpus, horizon and risk_profile must have the same length")
+        return self
+
+
 class UserInputModel(BaseModel):
     id: str = Field(..., description="MongoDB document id as string")
     target_corpus: int
     horizon: int
     risk_profile: RiskProfile
     timestamp: datetime
+    rankings_version: Optional[str] = Field(default=None, description="Rankings snapshot used for the allocation")
 
 
 class AllocationModel(BaseModel):
@@ -47,12 +61,109 @@ class Breakdown(BaseModel):
     alts: AltsBreakdown
 
 
+class PortfolioTableRow(BaseModel):
+    asset_class: str = Field(description="Category: Equity, Debt or Alternatives")
+    sub_category: str = Field(description="Asset class, e.g. Large Cap or Gold")
+    allocation: float = Field(description="Allocation in percent")
+    monthly_sip: float = 0
+
+
 class UserInputResult(BaseModel):
     user_input: UserInputModel
     allocation: AllocationModel
     sip: SIPResult
     notes: Optional[Dict[str, str]] = None
     breakdown: Optional[Breakdown] = None
-    portfolio_table: Optional[list] = None
+    portfolio_table: Optional[List[PortfolioTableRow]] = None
+
+
+class UserInputBatchResult(BaseModel):
+    """Columnar batch result; every list in ``columns`` is aligned with ``ids``"""
+    count: int
+    ids: List[str]
+    rankings_version: Optional[str] = None
+    columns: Dict[str, list]
+
+
+class SimulationRequest(BaseModel):
+    target_corpus: int = Field(gt=0)
+    horizon: int = Field(ge=1, le=30)
+    risk_profile: RiskProfile
+    monthly_sip: Optional[int] = Field(default=None, gt=0, description="Defaults to the deterministic SIP for the goal")
+    n_paths: int = Field(default=10_000, ge=1_000, le=100_000)
+    seed: Optional[int] = Field(default=None, ge=0)
+
+
+class SimulationResult(BaseModel):
+    target_corpus: int
+    horizon: int
+    risk_profile: RiskProfile
+    monthly_sip: int
+    n_paths: int
+    seed: Optional[int] = None
+    success_probability: float = Field(description="Share of paths reaching target_corpus, 0-1")
+    mean_corpus: float
+    percentiles: Dict[str, float] = Field(description="Final corpus percentiles, keyed p5 ... p95")
+
+
+class SIPSurfaceResult(BaseModel):
+    """Arrays are indexed [horizon][risk_profile][return_shift] in the listed orders"""
+    target_corpus: int
+    horizons: List[int]
+    risk_profiles: List[RiskProfile]
+    return_shifts: List[float]
+    expected_return_annual: List[List[List[float]]]
+    monthly_sip: List[List[List[int]]]
+    total_invested: List[List[List[int]]]
+    wealth_multiple: List[List[List[float]]]
+
+
+class BacktestRequest(BaseModel):
+    target_corpus: int = Field(gt=0)
+    rebalance: Literal["monthly", "quarterly", "semiannual", "annual", "none"] = "annual"
+    drift_band: float = Field(default=0.05, ge=0, le=1, description="Rebalance only when a weight drifts beyond this, e.g. 0.05 for 5 points")
+    start: Optional[date] = Field(default=None, description="Earliest price date to use")
+    end: Optional[date] = Field(default=None, description="Latest price date to use")
+
+
+class BacktestResult(BaseModel):
+    """Columnar per-bucket results (one entry per horizon x risk profile); null where history is too short"""
+    target_corpus: int
+    rebalance: str
+    drift_band: float
+    count: int
+    columns: Dict[str, list]
+
+
+class RankingRecord(BaseModel):
+    asset_class: str
+    hybrid_score: float
+    rank: int
+
 
+class RankingsSnapshotModel(BaseModel):
+    version: str = Field(description="SHA-256 of the rankings content")
+    source: str
+    activated_at: datetime
+    rankings: List[RankingRecord]
 
+
+class GlidePathRequest(BaseModel):
+    target_corpus: int = Field(gt=0)
+    horizon: int = Field(ge=1, le=30)
+    risk_profile: RiskProfile
+    monthly_sip: Optional[int] = Field(default=None, gt=0, description="First-year SIP; defaults to the SIP that reaches the target on the glide path")
+    annual_step_up: float = Field(default=0.0, ge=0, le=0.5, description="Yearly SIP increase, e.g. 0.1 for 10%")
+
+
+class GlidePathResult(BaseModel):
+    """Monthly schedule; every list in ``columns`` has one entry per month"""
+    target_corpus: int
+    horizon: int
+    risk_profile: RiskProfile
+    monthly_sip: int
+    annual_step_up: float
+    projected_corpus: float
+    total_invested: float
+    months: int
+    columns: Dict[str, list]
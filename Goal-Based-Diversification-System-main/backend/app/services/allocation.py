@@ -12,6 +12,15 @@ import pandas as pd
 import numpy as np
 import joblib
 from pathlib import Path
+from app.services.portfolio import PortfolioResult, PortfolioRow
+from app.services.rankings import RankingsIndex
+from app.services.scorer_artifact import (
+    METADATA_FILE,
+    artifact_version_dir,
+    is_scorer_artifact,
+    load_scorer_artifact,
+)
+from app.services.sip import estimate_portfolio_return, calculate_monthly_sip_batch
 try:
     import cloudpickle  # type: ignore
 except Exception:  # pragma: no cover
@@ -19,6 +28,103 @@ except Exception:  # pragma: no cover
 
 # Type definitions
 RiskProfile = Literal["Conservative", "Moderate", "Aggressive"]
+RISK_PROFILES = ("Conservative", "Moderate", "Aggressive")
+
+# Asset classes in the fixed column order used by array-based (batch) paths
+ASSET_CLASSES = ('Large Cap', 'Mid Cap', 'Small Cap', 'Debt', 'Gold', 'Silver')
+TIME_BUCKETS = ("lt3", "3to7", ">7")
+
+# Strategic allocation grid: time bucket -> risk profile -> asset class weights
+ALLOCATION_GRID = {
+    "lt3": {
+        "Conservative": {"equity": 0.15, "debt": 0.75, "gold": 0.05, "silver": 0.05},
+        "Moderate":     {"equity": 0.25, "debt": 0.65, "gold": 0.05, "silver": 0.05},
+        "Aggressive":   {"equity": 0.35, "debt": 0.55, "gold": 0.05, "silver": 0.05},
+    },
+    "3to7": {
+        "Conservative": {"equity": 0.40, "debt": 0.50, "gold": 0.05, "silver": 0.05},
+        "Moderate":     {"equity": 0.55, "debt": 0.35, "gold": 0.05, "silver": 0.05},
+        "Aggressive":   {"equity": 0.65, "debt": 0.25, "gold": 0.05, "silver": 0.05},
+    },
+    ">7": {
+        "Conservative": {"equity": 0.60, "debt": 0.30, "gold": 0.05, "silver": 0.05},
+        "Moderate":     {"equity": 0.75, "debt": 0.15, "gold": 0.05, "silver": 0.05},
+        "Aggressive":   {"equity": 0.85, "debt": 0.05, "gold": 0.05, "silver": 0.05},
+    },
+}
+
+
+def horizon_bucket(horizon_years: int) -> str:
+    """Map an investment horizon (years) to its strategic time bucket"""
+    if horizon_years < 3:
+        return "lt3"
+    elif 3 <= horizon_years <= 7:
+        return "3to7"
+    return ">7"
+
+
+def horizon_bucket_index(horizon_years: np.ndarray) -> np.ndarray:
+    """Vectorized ``horizon_bucket``: index into ``TIME_BUCKETS`` per horizon"""
+    h = np.asarray(horizon_years)
+    return np.where(h < 3, 0, np.where(h <= 7, 1, 2))
+
+
+def risk_profile_index(risk_profiles) -> np.ndarray:
+    """Index into ``RISK_PROFILES`` for each risk profile label"""
+    lookup = {name: i for i, name in enumerate(RISK_PROFILES)}
+    try:
+        return np.fromiter((lookup[rp] for rp in risk_profiles), dtype=np.intp)
+    except KeyError as e:
+        raise ValueError(f"Unknown risk profile: {e.args[0]}")
+
+
+def resolve_scorer_path(scorer_path: str) -> Path:
+    """Resolve a scorer path; relative paths are taken next to this file (services dir)"""
+    sp = Path(scorer_path)
+    if not sp.is_absolute():
+        sp = Path(__file__).parent / sp
+    return sp
+
+
+def scorer_source(scorer_path: str) -> Path:
+    """
+    Path actually loaded for ``scorer_path``: an exported artifact directory
+    when one exists (``scorer_path`` itself, or ``hybrid_scorer/`` next to
+    ``hybrid_scorer.pkl``), else the pickle
+    """
+    sp = Path(scorer_path)
+    if sp.is_dir():
+        return sp
+    artifact = sp.with_suffix('')
+    if artifact != sp and is_scorer_artifact(str(artifact)):
+        return artifact
+    return sp
+
+
+def scorer_watch_file(scorer_path: str) -> Path:
+    """File whose changes mean the scorer must be reloaded"""
+    source = scorer_source(scorer_path)
+    return artifact_version_dir(str(source)) / METADATA_FILE if source.is_dir() else source
+
+
+def load_pickled_scorer(scorer_path: str):
+    """Unpickle the hybrid scorer object stored at ``scorer_path``"""
+    # Prefer cloudpickle if available (handles notebook-defined classes)
+    if cloudpickle is not None:
+        with open(scorer_path, 'rb') as f:
+            return cloudpickle.load(f)
+    return joblib.load(scorer_path)
+
+
+def load_scorer(scorer_path: str):
+    """
+    Load the hybrid scorer: the exported artifact when present (memory-mapped
+    rankings, no unpickling), else the legacy pickle
+    """
+    source = scorer_source(scorer_path)
+    if source.is_dir():
+        return load_scorer_artifact(str(source))
+    return load_pickled_scorer(str(source))
 
 
 class PortfolioAllocationSystem:
@@ -26,7 +132,13 @@ class PortfolioAllocationSystem:
     Complete portfolio allocation system combining rule-based and ML approaches
     """
     
-    def __init__(self, scorer_path: str = 'hybrid_scorer.pkl'):
+    def __init__(
+        self,
+        scorer_path: str = 'hybrid_scorer.pkl',
+        scorer=None,
+        autoload: bool = True,
+        tactical_optimizer=None
+    ):
         """
         Initialize the allocation system
         
@@ -34,15 +146,21 @@ class PortfolioAllocationSystem:
         -----------
         scorer_path : str
             Path to the trained hybrid scorer object
+        scorer : object, optional
+            Already-loaded hybrid scorer (e.g. from the scorer registry).
+            When given, the pickle at ``scorer_path`` is not read.
+        autoload : bool
+            Load the scorer from ``scorer_path`` when no ``scorer`` is given
+        tactical_optimizer : TacticalOptimizer, optional
+            Mean-variance optimizer for the within-sleeve split; when it has
+            no risk model yet, score-proportional weights are used
         """
-        # Resolve scorer path: if relative, resolve next to this file (services dir)
-        base_dir = Path(__file__).parent
-        sp = Path(scorer_path)
-        if not sp.is_absolute():
-            sp = base_dir / sp
-        self.scorer_path = str(sp)
+        self.scorer_path = str(resolve_scorer_path(scorer_path))
         self.scorer = None
-        self.current_rankings = None
+        self.rankings_index = None
+        self._rankings_frame = None
+        self._allocation_arrays = None
+        self.tactical_optimizer = tactical_optimizer
         
         # Asset class to ticker mapping
         self.asset_mapping = {
@@ -54,25 +172,54 @@ class PortfolioAllocationSystem:
             'Silver': 'SILVERBEES.NS'
         }
         
-        # Load scorer if available
-        self._load_scorer()
+        if scorer is not None:
+            self._use_scorer(scorer)
+        elif autoload:
+            # Load scorer if available
+            self._load_scorer()
+    
+    def _use_scorer(self, scorer):
+        """Attach an already-loaded scorer and pick up its rankings"""
+        self.scorer = scorer
+        if isinstance(getattr(scorer, 'rankings_index', None), RankingsIndex):
+            # Scorer artifacts come with a prebuilt index
+            self.set_rankings_index(scorer.rankings_index)
+        elif hasattr(scorer, 'ranked_df') and scorer.ranked_df is not None:
+            self.current_rankings = scorer.ranked_df
+    
+    @property
+    def current_rankings(self) -> pd.DataFrame:
+        """Rankings as a ``ranked_df``-style DataFrame (export format only)"""
+        if self._rankings_frame is None and self.rankings_index is not None:
+            self._rankings_frame = self.rankings_index.to_frame()
+        return self._rankings_frame
+    
+    @current_rankings.setter
+    def current_rankings(self, ranked_df: pd.DataFrame):
+        self.set_rankings_index(
+            RankingsIndex.from_frame(ranked_df) if ranked_df is not None else None
+        )
+        self._rankings_frame = ranked_df
+    
+    def refresh_expected_returns(self):
+        """Drop cached arrays that embed ``estimate_portfolio_return`` results"""
+        self._allocation_arrays = None
+    
+    def set_rankings_index(self, index: RankingsIndex):
+        """Swap in a new rankings version; lookups below read only the index"""
+        self.rankings_index = index
+        self._rankings_frame = None
+        self._allocation_arrays = None
     
     def _load_scorer(self):
         """Load the hybrid scorer"""
         try:
-            if Path(self.scorer_path).exists():
-                # Prefer cloudpickle if available (handles notebook-defined classes)
-                if cloudpickle is not None:
-                    with open(self.scorer_path, 'rb') as f:
-                        self.scorer = cloudpickle.load(f)
-                else:
-                    self.scorer = joblib.load(self.scorer_path)
-                print(f"✓ Loaded hybrid scorer from {self.scorer_path}")
-                
-                # Get current rankings
-                if hasattr(self.scorer, 'ranked_df') and self.scorer.ranked_df is not None:
-                    self.current_rankings = self.scorer.ranked_df
-                    print(f"✓ Current rankings loaded ({len(self.current_rankings)} assets)")
+            source = scorer_source(self.scorer_path)
+            if source.exists():
+                self._use_scorer(load_scorer(self.scorer_path))
+                print(f"✓ Loaded hybrid scorer from {source}")
+                if self.rankings_index is not None:
+                    print(f"✓ Current rankings loaded ({len(self.rankings_index)} assets)")
             else:
                 print(f"⚠ Scorer file not found at {self.scorer_path}")
                 print("  → Will use rule-based allocation only")
@@ -99,38 +246,13 @@ class PortfolioAllocationSystem:
         --------
         Dict mapping asset classes to allocation percentages
         """
-        # Determine time bucket
-        if horizon_years < 3:
-            bucket = "lt3"
-        elif 3 <= horizon_years <= 7:
-            bucket = "3to7"
-        else:
-            bucket = ">7"
-        
-        # Allocation grid
-        grid = {
-            "lt3": {
-                "Conservative": {"equity": 0.15, "debt": 0.75, "gold": 0.05, "silver": 0.05},
-                "Moderate":     {"equity": 0.25, "debt": 0.65, "gold": 0.05, "silver": 0.05},
-                "Aggressive":   {"equity": 0.35, "debt": 0.55, "gold": 0.05, "silver": 0.05},
-            },
-            "3to7": {
-                "Conservative": {"equity": 0.40, "debt": 0.50, "gold": 0.05, "silver": 0.05},
-                "Moderate":     {"equity": 0.55, "debt": 0.35, "gold": 0.05, "silver": 0.05},
-                "Aggressive":   {"equity": 0.65, "debt": 0.25, "gold": 0.05, "silver": 0.05},
-            },
-            ">7": {
-                "Conservative": {"equity": 0.60, "debt": 0.30, "gold": 0.05, "silver": 0.05},
-                "Moderate":     {"equity": 0.75, "debt": 0.15, "gold": 0.05, "silver": 0.05},
-                "Aggressive":   {"equity": 0.85, "debt": 0.05, "gold": 0.05, "silver": 0.05},
-            },
-        }
-        
-        return grid[bucket][risk_profile]
+        return ALLOCATION_GRID[horizon_bucket(horizon_years)][risk_profile]
     
     def get_equity_breakdown(
         self, 
-        total_equity_allocation: float
+        total_equity_allocation: float,
+        risk_profile: RiskProfile = None,
+        warn: bool = True
     ) -> Dict[str, float]:
         """
         Break down equity allocation into Large/Mid/Small Cap based on ML rankings
@@ -139,49 +261,50 @@ class PortfolioAllocationSystem:
         -----------
         total_equity_allocation : float
             Total equity allocation (e.g., 0.85 for 85%)
+        risk_profile : RiskProfile, optional
+            Selects the efficient-frontier point when a tactical optimizer
+            is configured
+        warn : bool
+            Print a warning when falling back to the default split (callers
+            building a whole grid warn once via ``warn_missing_rankings``)
         
         Returns:
         --------
         Dict with allocations for Large Cap, Mid Cap, Small Cap
         """
-        if self.current_rankings is None:
+        if self.rankings_index is None:
             # Fallback: Equal weight or default split
-            print("⚠ No rankings available, using default equity split")
+            if warn:
+                print("⚠ No rankings available, using default equity split")
             return {
                 'Large Cap': total_equity_allocation * 0.50,  # 50% large
                 'Mid Cap': total_equity_allocation * 0.30,    # 30% mid
                 'Small Cap': total_equity_allocation * 0.20   # 20% small
             }
         
-        # Get equity sub-categories from rankings
+        # Use hybrid scores of the ranked equity sub-categories for
+        # proportional allocation: higher score = higher allocation
         equity_assets = ['Large Cap', 'Mid Cap', 'Small Cap']
-        equity_rankings = self.current_rankings[
-            self.current_rankings['asset_class'].isin(equity_assets)
-        ].copy()
+        weights = self._sleeve_weights(equity_assets, risk_profile)
         
-        if len(equity_rankings) == 0:
-            print("⚠ No equity rankings found, using default split")
+        if len(weights) == 0:
+            if warn:
+                print("⚠ No equity rankings found, using default split")
             return {
                 'Large Cap': total_equity_allocation * 0.50,
                 'Mid Cap': total_equity_allocation * 0.30,
                 'Small Cap': total_equity_allocation * 0.20
             }
         
-        # Use hybrid scores for proportional allocation
-        # Higher score = higher allocation
-        equity_rankings['weight'] = (
-            equity_rankings['hybrid_score'] / equity_rankings['hybrid_score'].sum()
-        )
-        
-        allocation = {}
-        for _, row in equity_rankings.iterrows():
-            allocation[row['asset_class']] = total_equity_allocation * row['weight']
-        
-        return allocation
+        return {
+            asset_class: total_equity_allocation * weight
+            for asset_class, weight in weights.items()
+        }
     
     def get_alternatives_breakdown(
         self,
-        total_alt_allocation: float
+        total_alt_allocation: float,
+        risk_profile: RiskProfile = None
     ) -> Dict[str, float]:
         """
         Break down alternatives (gold/silver) based on rankings
@@ -190,40 +313,50 @@ class PortfolioAllocationSystem:
         -----------
         total_alt_allocation : float
             Total alternatives allocation
+        risk_profile : RiskProfile, optional
+            Selects the efficient-frontier point when a tactical optimizer
+            is configured
         
         Returns:
         --------
         Dict with allocations for Gold and Silver
         """
-        if self.current_rankings is None:
+        if self.rankings_index is None:
             # Default: Equal split
             return {
                 'Gold': total_alt_allocation * 0.5,
                 'Silver': total_alt_allocation * 0.5
             }
         
-        # Get alternatives from rankings
+        # Proportional allocation based on scores of the ranked alternatives
         alt_assets = ['Gold', 'Silver']
-        alt_rankings = self.current_rankings[
-            self.current_rankings['asset_class'].isin(alt_assets)
-        ].copy()
+        weights = self._sleeve_weights(alt_assets, risk_profile)
         
-        if len(alt_rankings) < 2:
+        if len(weights) < 2:
             return {
                 'Gold': total_alt_allocation * 0.5,
                 'Silver': total_alt_allocation * 0.5
             }
         
-        # Proportional allocation based on scores
-        alt_rankings['weight'] = (
-            alt_rankings['hybrid_score'] / alt_rankings['hybrid_score'].sum()
-        )
-        
-        allocation = {}
-        for _, row in alt_rankings.iterrows():
-            allocation[row['asset_class']] = total_alt_allocation * row['weight']
-        
-        return allocation
+        return {
+            asset_class: total_alt_allocation * weight
+            for asset_class, weight in weights.items()
+        }
+    
+    def warn_missing_rankings(self) -> None:
+        """Print the default equity split warning once for a whole grid"""
+        if self.rankings_index is None:
+            print("⚠ No rankings available, using default equity split")
+        elif not self.rankings_index.score_weights(['Large Cap', 'Mid Cap', 'Small Cap']):
+            print("⚠ No equity rankings found, using default split")
+    
+    def _sleeve_weights(self, assets: List[str], risk_profile: RiskProfile = None) -> Dict[str, float]:
+        """Within-sleeve weights: optimizer frontier lookup, else score-proportional"""
+        if self.tactical_optimizer is not None and risk_profile is not None:
+            weights = self.tactical_optimizer.sleeve_weights(assets, self.rankings_index, risk_profile)
+            if weights is not None:
+                return weights
+        return self.rankings_index.score_weights(assets)
     
     def construct_portfolio(
         self,
@@ -231,7 +364,7 @@ class PortfolioAllocationSystem:
         risk_profile: RiskProfile,
         target_corpus: float,
         monthly_sip: float = None
-    ) -> pd.DataFrame:
+    ) -> PortfolioResult:
         """
         Construct complete portfolio with tactical allocation
         
@@ -248,7 +381,8 @@ class PortfolioAllocationSystem:
         
         Returns:
         --------
-        DataFrame with complete portfolio breakdown
+        PortfolioResult with complete portfolio breakdown
+        (call ``.to_frame()`` for a DataFrame)
         """
         print(f"\n{'='*80}")
         print(f"CONSTRUCTING PORTFOLIO")
@@ -268,7 +402,7 @@ class PortfolioAllocationSystem:
         print(f"Silver: {strategic['silver']*100:.1f}%")
         
         # Step 2: Break down equity using rankings
-        equity_breakdown = self.get_equity_breakdown(strategic['equity'])
+        equity_breakdown = self.get_equity_breakdown(strategic['equity'], risk_profile)
         
         print(f"\n--- TACTICAL EQUITY BREAKDOWN (Hybrid ML + Factors) ---")
         for asset_class, allocation in equity_breakdown.items():
@@ -276,90 +410,179 @@ class PortfolioAllocationSystem:
         
         # Step 3: Break down alternatives
         total_alt = strategic['gold'] + strategic['silver']
-        alt_breakdown = self.get_alternatives_breakdown(total_alt)
+        alt_breakdown = self.get_alternatives_breakdown(total_alt, risk_profile)
         
         print(f"\n--- ALTERNATIVES BREAKDOWN ---")
         for asset_class, allocation in alt_breakdown.items():
             print(f"{asset_class}: {allocation*100:.2f}%")
         
         # Step 4: Construct final portfolio
+        return PortfolioResult(self.build_portfolio_rows(
+            strategic, equity_breakdown, alt_breakdown, monthly_sip
+        ))
+    
+    def build_portfolio_rows(
+        self,
+        strategic: Dict[str, float],
+        equity_breakdown: Dict[str, float],
+        alt_breakdown: Dict[str, float],
+        monthly_sip: float = None
+    ) -> List[PortfolioRow]:
+        """
+        Build portfolio table rows (sorted by allocation, largest first)
+        
+        Parameters:
+        -----------
+        strategic : Dict[str, float]
+            Strategic allocation from ``rule_based_allocation``
+        equity_breakdown : Dict[str, float]
+            Tactical equity split from ``get_equity_breakdown``
+        alt_breakdown : Dict[str, float]
+            Tactical alternatives split from ``get_alternatives_breakdown``
+        monthly_sip : float, optional
+            Monthly SIP amount (for display)
+        
+        Returns:
+        --------
+        List of PortfolioRow
+        """
         portfolio_data = []
         
         # Add equity components
         for asset_class, allocation in equity_breakdown.items():
-            ticker = self.asset_mapping.get(asset_class, 'N/A')
-            rank = self._get_rank(asset_class)
-            score = self._get_score(asset_class)
-            
-            portfolio_data.append({
-                'Asset Class': asset_class,
-                'Category': 'Equity',
-                'Ticker': ticker,
-                'Allocation (%)': allocation * 100,
-                'Monthly Amount (₹)': monthly_sip * allocation if monthly_sip else None,
-                'Rank': rank,
-                'Score': score
-            })
+            portfolio_data.append(self._portfolio_row(asset_class, 'Equity', allocation, monthly_sip))
         
         # Add debt
-        debt_ticker = self.asset_mapping.get('Debt', 'N/A')
-        debt_rank = self._get_rank('Debt')
-        debt_score = self._get_score('Debt')
-        
-        portfolio_data.append({
-            'Asset Class': 'Debt',
-            'Category': 'Debt',
-            'Ticker': debt_ticker,
-            'Allocation (%)': strategic['debt'] * 100,
-            'Monthly Amount (₹)': monthly_sip * strategic['debt'] if monthly_sip else None,
-            'Rank': debt_rank,
-            'Score': debt_score
-        })
+        portfolio_data.append(self._portfolio_row('Debt', 'Debt', strategic['debt'], monthly_sip))
         
         # Add alternatives
         for asset_class, allocation in alt_breakdown.items():
-            ticker = self.asset_mapping.get(asset_class, 'N/A')
-            rank = self._get_rank(asset_class)
-            score = self._get_score(asset_class)
-            
-            portfolio_data.append({
-                'Asset Class': asset_class,
-                'Category': 'Alternatives',
-                'Ticker': ticker,
-                'Allocation (%)': allocation * 100,
-                'Monthly Amount (₹)': monthly_sip * allocation if monthly_sip else None,
-                'Rank': rank,
-                'Score': score
-            })
-        
-        portfolio_df = pd.DataFrame(portfolio_data)
+            portfolio_data.append(self._portfolio_row(asset_class, 'Alternatives', allocation, monthly_sip))
         
         # Sort by allocation
-        portfolio_df = portfolio_df.sort_values('Allocation (%)', ascending=False)
+        portfolio_data.sort(key=lambda row: row.allocation, reverse=True)
+        
+        return portfolio_data
+    
+    def _portfolio_row(
+        self,
+        asset_class: str,
+        category: str,
+        allocation: float,
+        monthly_sip: float = None
+    ) -> PortfolioRow:
+        """Single portfolio table row"""
+        return PortfolioRow(
+            asset_class=asset_class,
+            category=category,
+            ticker=self.asset_mapping.get(asset_class, 'N/A'),
+            allocation=allocation,
+            monthly_amount=monthly_sip * allocation if monthly_sip else None,
+            rank=self._get_rank(asset_class),
+            score=self._get_score(asset_class)
+        )
+    
+    def allocation_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Per (time bucket, risk profile) weights and expected returns as arrays
         
-        return portfolio_df
+        Returns:
+        --------
+        weights : np.ndarray
+            Shape (3 buckets, 3 risk profiles, 6 asset classes) in
+            ``ASSET_CLASSES`` order
+        strategic : np.ndarray
+            Shape (3 buckets, 3 risk profiles, 3) UI split: equity, debt, alts
+        expected_returns : np.ndarray
+            Shape (3 buckets, 3 risk profiles) annual expected return
+        """
+        if self._allocation_arrays is None:
+            weights = np.zeros((len(TIME_BUCKETS), len(RISK_PROFILES), len(ASSET_CLASSES)))
+            strategic_split = np.zeros((len(TIME_BUCKETS), len(RISK_PROFILES), 3))
+            expected = np.zeros((len(TIME_BUCKETS), len(RISK_PROFILES)))
+            self.warn_missing_rankings()
+            for b, bucket in enumerate(TIME_BUCKETS):
+                for r, risk_profile in enumerate(RISK_PROFILES):
+                    strategic = ALLOCATION_GRID[bucket][risk_profile]
+                    alts_total = strategic['gold'] + strategic['silver']
+                    split = {
+                        **self.get_equity_breakdown(strategic['equity'], risk_profile, warn=False),
+                        'Debt': strategic['debt'],
+                        **self.get_alternatives_breakdown(alts_total, risk_profile),
+                    }
+                    weights[b, r] = [split.get(a, 0.0) for a in ASSET_CLASSES]
+                    strategic_split[b, r] = [strategic['equity'], strategic['debt'], alts_total]
+                    expected[b, r] = estimate_portfolio_return({
+                        'equity': strategic['equity'],
+                        'debt': strategic['debt'],
+                        'alts': alts_total,
+                    })
+            self._allocation_arrays = (weights, strategic_split, expected)
+        return self._allocation_arrays
+    
+    def construct_portfolio_batch(
+        self,
+        horizon_years,
+        risk_profiles,
+        target_corpus
+    ) -> Dict[str, np.ndarray]:
+        """
+        Vectorized portfolio construction for many goals at once
+        
+        Parameters:
+        -----------
+        horizon_years : array-like of int
+            Investment horizon per goal
+        risk_profiles : sequence of RiskProfile
+            Risk profile per goal
+        target_corpus : array-like of float
+            Target amount per goal
+        
+        Returns:
+        --------
+        Dict of equal-length columns: inputs, expected_return, monthly_sip,
+        equity/debt/alts and per-asset-class weights (fractions)
+        """
+        horizons = np.asarray(horizon_years, dtype=np.int64)
+        corpus = np.asarray(target_corpus, dtype=np.float64)
+        risk_idx = risk_profile_index(risk_profiles)
+        if not (len(horizons) == len(corpus) == len(risk_idx)):
+            raise ValueError("horizon_years, risk_profiles and target_corpus must have the same length")
+        
+        weights, strategic, expected = self.allocation_arrays()
+        bucket_idx = horizon_bucket_index(horizons)
+        w = weights[bucket_idx, risk_idx]
+        split = strategic[bucket_idx, risk_idx]
+        expected_return = expected[bucket_idx, risk_idx]
+        monthly_sip = calculate_monthly_sip_batch(corpus, horizons, expected_return)
+        
+        columns = {
+            'target_corpus': corpus,
+            'horizon': horizons,
+            'risk_profile': np.asarray(RISK_PROFILES)[risk_idx],
+            'expected_return': expected_return,
+            'monthly_sip': monthly_sip,
+            'equity': split[:, 0],
+            'debt': split[:, 1],
+            'alts': split[:, 2],
+        }
+        for i, asset_class in enumerate(ASSET_CLASSES):
+            columns[asset_class] = w[:, i]
+        return columns
     
     def _get_rank(self, asset_class: str) -> int:
         """Get rank for an asset class"""
-        if self.current_rankings is None:
+        if self.rankings_index is None:
             return None
-        
-        row = self.current_rankings[self.current_rankings['asset_class'] == asset_class]
-        if len(row) > 0:
-            return int(row.iloc[0]['rank'])
-        return None
+        return self.rankings_index.rank(asset_class)
     
     def _get_score(self, asset_class: str) -> float:
         """Get hybrid score for an asset class"""
-        if self.current_rankings is None:
+        if self.rankings_index is None:
             return None
-        
-        row = self.current_rankings[self.current_rankings['asset_class'] == asset_class]
-        if len(row) > 0:
-            return float(row.iloc[0]['hybrid_score'])
-        return None
+        return self.rankings_index.score(asset_class)
     
-    def display_portfolio(self, portfolio_df: pd.DataFrame):
+    def display_portfolio(self, portfolio: PortfolioResult):
         """Display portfolio in formatted table"""
         print(f"\n{'='*80}")
         print("FINAL PORTFOLIO")
@@ -367,24 +590,25 @@ class PortfolioAllocationSystem:
         
         # Group by category
         for category in ['Equity', 'Debt', 'Alternatives']:
-            cat_df = portfolio_df[portfolio_df['Category'] == category]
-            if len(cat_df) == 0:
+            cat_rows = [row for row in portfolio if row.category == category]
+            if len(cat_rows) == 0:
                 continue
             
             print(f"\n--- {category.upper()} ---")
             print(f"{'-'*80}")
             
-            for _, row in cat_df.iterrows():
-                rank_str = f"(Rank #{row['Rank']})" if pd.notna(row['Rank']) else ""
-                score_str = f"Score: {row['Score']:.1f}" if pd.notna(row['Score']) else ""
-                amount_str = f"₹{row['Monthly Amount (₹)']:,.0f}" if pd.notna(row['Monthly Amount (₹)']) else "N/A"
+            for row in cat_rows:
+                rank_str = f"(Rank #{row.rank})" if row.rank is not None else ""
+                score_str = f"Score: {row.score:.1f}" if row.score is not None else ""
+                amount_str = f"₹{row.monthly_amount:,.0f}" if row.monthly_amount is not None else "N/A"
                 
-                print(f"{row['Asset Class']:<15} {row['Allocation (%)']:>6.2f}%  "
+                print(f"{row.asset_class:<15} {row.allocation_pct:>6.2f}%  "
                       f"{amount_str:>12}  {rank_str:<12} {score_str}")
         
         print(f"\n{'-'*80}")
-        total_alloc = portfolio_df['Allocation (%)'].sum()
-        total_amount = portfolio_df['Monthly Amount (₹)'].sum() if pd.notna(portfolio_df['Monthly Amount (₹)']).any() else None
+        total_alloc = portfolio.total_allocation * 100
+        amounts = [row.monthly_amount for row in portfolio if row.monthly_amount is not None]
+        total_amount = sum(amounts) if amounts else None
         
         print(f"{'TOTAL':<15} {total_alloc:>6.2f}%  ", end="")
         if total_amount:
@@ -393,16 +617,18 @@ class PortfolioAllocationSystem:
             print()
         print(f"{'='*80}\n")
     
-    def get_portfolio_summary(self, portfolio_df: pd.DataFrame) -> Dict:
+    def get_portfolio_summary(self, portfolio: PortfolioResult) -> Dict:
         """Get summary statistics for the portfolio"""
+        totals = portfolio.category_totals
+        top = portfolio.rows[0]
         summary = {
-            'total_allocation': portfolio_df['Allocation (%)'].sum(),
-            'num_assets': len(portfolio_df),
-            'equity_allocation': portfolio_df[portfolio_df['Category'] == 'Equity']['Allocation (%)'].sum(),
-            'debt_allocation': portfolio_df[portfolio_df['Category'] == 'Debt']['Allocation (%)'].sum(),
-            'alternatives_allocation': portfolio_df[portfolio_df['Category'] == 'Alternatives']['Allocation (%)'].sum(),
-            'top_holding': portfolio_df.iloc[0]['Asset Class'],
-            'top_holding_allocation': portfolio_df.iloc[0]['Allocation (%)']
+            'total_allocation': portfolio.total_allocation * 100,
+            'num_assets': len(portfolio),
+            'equity_allocation': totals['Equity'] * 100,
+            'debt_allocation': totals['Debt'] * 100,
+            'alternatives_allocation': totals['Alternatives'] * 100,
+            'top_holding': top.asset_class,
+            'top_holding_allocation': top.allocation_pct
         }
         
         return summary
@@ -447,8 +673,8 @@ def example_usage():
     allocator.display_portfolio(portfolio2)
     
     # Save portfolios
-    portfolio1.to_csv('portfolio_conservative.csv', index=False)
-    portfolio2.to_csv('portfolio_aggressive.csv', index=False)
+    portfolio1.to_frame().to_csv('portfolio_conservative.csv', index=False)
+    portfolio2.to_frame().to_csv('portfolio_aggressive.csv', index=False)
     
     print("\n✓ Portfolios saved to CSV files")
 
@@ -0,0 +1,112 @@
+"""
+Precomputed Allocation Table
+============================
+Strategic split, tactical breakdowns, expected return and per-asset
+rank/score depend only on (horizon, risk profile) and the current rankings,
+so they are compiled once per rankings version for every
+horizon (1-30) x risk profile combination. Requests only scale the stored
+row by their SIP amount.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.services.allocation import (
+    ALLOCATION_GRID,
+    RISK_PROFILES,
+    PortfolioAllocationSystem,
+    horizon_bucket,
+)
+from app.services.portfolio import PortfolioResult
+from app.services.sip import estimate_portfolio_return
+
+HORIZONS = range(1, 31)
+
+
+@dataclass(frozen=True)
+class AllocationEntry:
+    """Compiled allocation for one (horizon, risk profile) combination"""
+    horizon: int
+    risk_profile: str
+    strategic: Dict[str, float]
+    allocation: Dict[str, float]
+    equity_breakdown: Dict[str, float]
+    alts_breakdown: Dict[str, float]
+    expected_return: float
+    portfolio: PortfolioResult
+
+    def portfolio_table(self, monthly_sip: float = None) -> List[Dict]:
+        """API portfolio table scaled to the given monthly SIP"""
+        return self.portfolio.to_records(monthly_sip or 0)
+
+
+class AllocationTable:
+    """Lookup table of ``AllocationEntry`` keyed by (horizon, risk profile)"""
+
+    def __init__(self, entries: Dict[Tuple[int, str], AllocationEntry]):
+        self._entries = entries
+        # (horizon 1..30, risk profile) expected annual returns, for vectorized paths
+        self.expected_return_grid = np.array([
+            [entries[(h, rp)].expected_return for rp in RISK_PROFILES]
+            for h in HORIZONS
+        ])
+        self.expected_return_grid.setflags(write=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, horizon: int, risk_profile: str) -> AllocationEntry:
+        try:
+            return self._entries[(horizon, risk_profile)]
+        except KeyError:
+            raise KeyError(f"No allocation compiled for horizon={horizon}, risk_profile={risk_profile}")
+
+    @classmethod
+    def build(cls, allocator: PortfolioAllocationSystem) -> "AllocationTable":
+        """Compile every horizon x risk profile entry from the allocator's rankings"""
+        # Horizons in the same time bucket share a strategic split, so only
+        # compute one entry per (bucket, risk profile) and reuse it.
+        per_bucket = {}
+        allocator.warn_missing_rankings()
+        for bucket, profiles in ALLOCATION_GRID.items():
+            for risk_profile in RISK_PROFILES:
+                strategic = dict(profiles[risk_profile])
+                alts_total = strategic["gold"] + strategic["silver"]
+                allocation = {
+                    "equity": strategic["equity"],
+                    "debt": strategic["debt"],
+                    # Map gold + silver to legacy 'alts' for UI compatibility
+                    "alts": alts_total,
+                }
+                equity_bd = allocator.get_equity_breakdown(strategic["equity"], risk_profile, warn=False)
+                alts_bd = allocator.get_alternatives_breakdown(alts_total, risk_profile)
+                portfolio = PortfolioResult(
+                    allocator.build_portfolio_rows(strategic, equity_bd, alts_bd)
+                )
+                per_bucket[(bucket, risk_profile)] = (
+                    strategic,
+                    allocation,
+                    equity_bd,
+                    alts_bd,
+                    estimate_portfolio_return(allocation),
+                    portfolio,
+                )
+
+        entries = {}
+        for horizon in HORIZONS:
+            bucket = horizon_bucket(horizon)
+            for risk_profile in RISK_PROFILES:
+                strategic, allocation, equity_bd, alts_bd, expected, portfolio = per_bucket[(bucket, risk_profile)]
+                entries[(horizon, risk_profile)] = AllocationEntry(
+                    horizon=horizon,
+                    risk_profile=risk_profile,
+                    strategic=strategic,
+                    allocation=allocation,
+                    equity_breakdown=equity_bd,
+                    alts_breakdown=alts_bd,
+                    expected_return=expected,
+                    portfolio=portfolio,
+                )
+        return cls(entries)
@@ -0,0 +1,241 @@
+"""
+Historical SIP Backtest
+=======================
+Replays a monthly SIP into the portfolio ``construct_portfolio`` builds for
+every horizon (1-30) x risk profile bucket over month-end closes from the
+local price history store.
+
+All buckets are simulated together: holdings are a (buckets, asset classes)
+matrix stepped once per month of the return matrix, so the 90 buckets cost
+one pass over history. Each bucket invests for its own horizon, ending at
+the last available month (shorter when history does not reach back far
+enough). Contributions are made at month end at the target weights;
+rebalancing happens on the chosen calendar only when some asset class has
+drifted beyond the band.
+
+Tactical weights come from the current rankings, so results carry
+look-ahead bias for the tactical layer and are illustrative only.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.allocation import (
+    ASSET_CLASSES,
+    RISK_PROFILES,
+    PortfolioAllocationSystem,
+    horizon_bucket_index,
+)
+from app.services.allocation_table import HORIZONS
+from app.services.price_store import PriceStore
+from app.services.sip import calculate_monthly_sip_batch
+
+# Months between rebalancing checks (0 = never rebalance)
+REBALANCE_MONTHS = {
+    "monthly": 1,
+    "quarterly": 3,
+    "semiannual": 6,
+    "annual": 12,
+    "none": 0,
+}
+
+
+@dataclass(frozen=True)
+class BacktestOutcome:
+    """
+    Per-bucket results; every array has one entry per bucket. ``cagr`` is
+    NaN for a bucket with no monthly return yet and ``volatility`` for one
+    with fewer than two.
+    """
+    months: np.ndarray
+    total_invested: np.ndarray
+    final_corpus: np.ndarray
+    cagr: np.ndarray
+    volatility: np.ndarray
+    max_drawdown: np.ndarray
+    rebalances: np.ndarray
+
+
+def monthly_returns(
+    store: PriceStore,
+    tickers: Sequence[str],
+    start=None,
+    end=None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Month-end simple returns for ``tickers``: (months, returns) where
+    ``months`` is ``datetime64[M]`` (T,) and ``returns`` is (T, N). Each
+    return is labelled with the month it ends in.
+    """
+    dates, closes = store.matrix(tickers, start, end, how="ffill")
+    # Forward fill across exchange holidays, but never past a ticker's last bar
+    last_dates = [store.last_date(t) for t in tickers]
+    if any(d is None for d in last_dates):
+        return np.empty(0, dtype="datetime64[M]"), np.empty((0, len(tickers)))
+    valid = np.all(np.isfinite(closes), axis=1) & (dates <= min(last_dates))
+    dates, closes = dates[valid], closes[valid]
+    if len(dates) < 2:
+        return np.empty(0, dtype="datetime64[M]"), np.empty((0, len(tickers)))
+
+    months = dates.astype("datetime64[M]")
+    month_end = np.append(months[1:] != months[:-1], True)
+    months, closes = months[month_end], closes[month_end]
+    return months[1:], closes[1:] / closes[:-1] - 1.0
+
+
+def backtest_sip(
+    returns: np.ndarray,
+    weights: np.ndarray,
+    monthly_sip: np.ndarray,
+    months: np.ndarray,
+    rebalance_every: int = 12,
+    drift_band: float = 0.05,
+) -> BacktestOutcome:
+    """
+    Simulate SIPs for many buckets over one return matrix.
+
+    Parameters:
+    -----------
+    returns : np.ndarray
+        Monthly simple returns, shape (T, N)
+    weights : np.ndarray
+        Target weights per bucket, shape (B, N)
+    monthly_sip : np.ndarray
+        Contribution per bucket, shape (B,)
+    months : np.ndarray
+        Investment months per bucket, shape (B,); the window ends at the last
+        row of ``returns`` and is clipped to the available history
+    rebalance_every : int
+        Months between rebalancing checks (0 = never rebalance)
+    drift_band : float
+        Rebalance at a check only if some weight is off target by more than
+        this (absolute, 0.05 = 5 percentage points); 0 always rebalances
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    sip = np.asarray(monthly_sip, dtype=np.float64)
+    n_months = len(returns)
+    months = np.minimum(np.asarray(months, dtype=np.int64), n_months)
+    start = n_months - months
+    n_buckets = len(weights)
+
+    holdings = np.zeros((n_buckets, weights.shape[1]))
+    # Time-weighted monthly portfolio returns (NaN before a bucket is invested)
+    period_returns = np.full((n_months, n_buckets), np.nan)
+    rebalances = np.zeros(n_buckets, dtype=np.int64)
+    contribution = sip[:, None] * weights
+
+    for t in range(n_months):
+        value_before = holdings.sum(axis=1)
+        holdings *= 1.0 + returns[t]
+        invested = value_before > 0
+        period_returns[t, invested] = holdings[invested].sum(axis=1) / value_before[invested] - 1.0
+
+        active = t >= start
+        holdings[active] += contribution[active]
+
+        if rebalance_every:
+            due = active & ((t - start + 1) % rebalance_every == 0)
+            if due.any():
+                total = holdings.sum(axis=1)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    drift = np.abs(holdings / total[:, None] - weights).max(axis=1)
+                rebalance = due & (total > 0) & (drift > drift_band)
+                holdings[rebalance] = total[rebalance, None] * weights[rebalance]
+                rebalances += rebalance
+
+    log_growth = np.log1p(period_returns)
+    n_returns = np.sum(np.isfinite(log_growth), axis=0)
+    log_growth = np.nan_to_num(log_growth)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cagr = np.expm1(log_growth.sum(axis=0) * 12.0 / n_returns)
+    volatility = np.full(n_buckets, np.nan)
+    enough = n_returns > 1
+    volatility[enough] = np.nanstd(period_returns[:, enough], axis=0, ddof=1) * np.sqrt(12.0)
+
+    # Drawdowns of the time-weighted wealth index (flat before investing)
+    wealth = np.exp(np.cumsum(log_growth, axis=0))
+    drawdown = wealth / np.maximum.accumulate(wealth, axis=0) - 1.0
+
+    return BacktestOutcome(
+        months=months,
+        total_invested=sip * months,
+        final_corpus=holdings.sum(axis=1),
+        cagr=cagr,
+        volatility=volatility,
+        max_drawdown=drawdown.min(axis=0) if n_months else np.zeros(n_buckets),
+        rebalances=rebalances,
+    )
+
+
+def backtest_allocation_grid(
+    allocator: PortfolioAllocationSystem,
+    store: PriceStore,
+    target_corpus: float,
+    horizons: Sequence[int] = HORIZONS,
+    rebalance: str = "annual",
+    drift_band: float = 0.05,
+    start=None,
+    end=None,
+) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Backtest every horizon x risk profile bucket for ``target_corpus``.
+
+    Returns columns aligned per bucket (horizon-major, risk profiles in
+    ``RISK_PROFILES`` order), or None when the store has under two months of
+    aligned history for the allocator's tickers.
+    """
+    tickers = [allocator.asset_mapping[a] for a in ASSET_CLASSES]
+    month_labels, returns = monthly_returns(store, tickers, start, end)
+    if len(returns) < 2:
+        return None
+
+    horizon_values = np.asarray(horizons, dtype=np.int64)
+    horizons = np.repeat(horizon_values, len(RISK_PROFILES))
+    risk_idx = np.tile(np.arange(len(RISK_PROFILES)), len(horizon_values))
+    weights, _, expected = allocator.allocation_arrays()
+    bucket_idx = horizon_bucket_index(horizons)
+    expected_return = expected[bucket_idx, risk_idx]
+    monthly_sip = calculate_monthly_sip_batch(target_corpus, horizons, expected_return)
+
+    outcome = backtest_sip(
+        returns,
+        weights[bucket_idx, risk_idx],
+        monthly_sip,
+        horizons * 12,
+        rebalance_every=REBALANCE_MONTHS[rebalance],
+        drift_band=drift_band,
+    )
+    first_month = month_labels[len(month_labels) - outcome.months]
+    return {
+        "horizon": horizons,
+        "risk_profile": np.asarray(RISK_PROFILES)[risk_idx],
+        "start_month": first_month.astype(str),
+        "end_month": np.full(len(horizons), str(month_labels[-1])),
+        "months": outcome.months,
+        "complete": outcome.months == horizons * 12,
+        "expected_return": expected_return,
+        "monthly_sip": monthly_sip,
+        "total_invested": outcome.total_invested,
+        "final_corpus": outcome.final_corpus,
+        "goal_met": outcome.final_corpus >= target_corpus,
+        "cagr": outcome.cagr,
+        "volatility": outcome.volatility,
+        "max_drawdown": outcome.max_drawdown,
+        "rebalances": outcome.rebalances,
+    }
+
+
+def json_columns(columns: Dict[str, np.ndarray]) -> Dict[str, list]:
+    """Columns as JSON-safe lists: NaN and infinite floats become None"""
+    out = {}
+    for name, values in columns.items():
+        values = np.asarray(values)
+        if values.dtype.kind == "f":
+            finite = np.isfinite(values)
+            out[name] = [v if ok else None for v, ok in zip(values.tolist(), finite.tolist())]
+        else:
+            out[name] = values.tolist()
+    return out
@@ -0,0 +1,112 @@
+"""
+Chart History
+=============
+Price history for charts, served from the local price store: a range
+slice, optional weekly/monthly resampling (last close of each period), then
+Largest-Triangle-Three-Buckets downsampling to the client's point budget.
+
+LTTB keeps the first and last points and, for every bucket in between,
+the point forming the largest triangle with the previously kept point and
+the average of the next bucket, which preserves peaks and troughs that
+plain striding would drop.
+"""
+
+import hashlib
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+RANGE_DAYS = {
+    "1m": 30, "3m": 91, "6m": 182, "1y": 365, "2y": 730, "3y": 1095,
+    "5y": 1826, "10y": 3652, "20y": 7305,
+}
+RANGES = tuple(RANGE_DAYS) + ("ytd", "max")
+INTERVALS = ("1d", "1wk", "1mo")
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the ``threshold`` points LTTB keeps from (x, y)"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Buckets for the n - 2 interior points; bucket b covers [edges[b], edges[b + 1])
+    edges = np.floor(np.arange(threshold - 1) * (n - 2) / (threshold - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    # Averages of each "next" bucket come from prefix sums; the last one is the final point
+    cx = np.concatenate(([0.0], np.cumsum(x)))
+    cy = np.concatenate(([0.0], np.cumsum(y)))
+    counts = edges[1:] - edges[:-1]
+    avg_x = np.append((cx[edges[1:]] - cx[edges[:-1]]) / counts, x[-1])[1:]
+    avg_y = np.append((cy[edges[1:]] - cy[edges[:-1]]) / counts, y[-1])[1:]
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    bounds, avg_x, avg_y = edges.tolist(), avg_x.tolist(), avg_y.tolist()
+    for b in range(threshold - 2):
+        lo, hi = bounds[b], bounds[b + 1]
+        ax, ay = float(x[a]), float(y[a])
+        # Twice the triangle area; the constant factor does not change the argmax
+        area = np.abs((ax - avg_x[b]) * (y[lo:hi] - ay) - (avg_y[b] - ay) * (ax - x[lo:hi]))
+        a = lo + int(area.argmax())
+        selected[b + 1] = a
+    return selected
+
+
+def resample_last(dates: np.ndarray, closes: np.ndarray, interval: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Last bar of every week ("1wk") or month ("1mo"); daily data is returned as is"""
+    if interval == "1d" or len(dates) == 0:
+        return dates, closes
+    days = dates.astype("datetime64[D]").astype(np.int64)
+    if interval == "1wk":
+        period = (days + 3) // 7  # weeks starting on Monday
+    else:
+        period = dates.astype("datetime64[M]").astype(np.int64)
+    last = np.flatnonzero(np.append(period[1:] != period[:-1], True))
+    return dates[last], closes[last]
+
+
+def range_start(range_: str, last: np.datetime64) -> Optional[np.datetime64]:
+    """First date of ``range_`` ending at ``last`` (None = all history)"""
+    if range_ == "max":
+        return None
+    if range_ == "ytd":
+        return last.astype("datetime64[Y]").astype("datetime64[D]")
+    return last - np.timedelta64(RANGE_DAYS[range_], "D")
+
+
+def chart_series(store, symbol: str, range_: str, interval: str, points: int) -> Optional[Dict]:
+    """
+    Chart payload for ``symbol`` from ``store``, or None without history.
+
+    Returns ``{source_points, columns: {date, close}}`` where dates are ISO
+    strings and at most ``points`` rows are kept.
+    """
+    last = store.last_date(symbol)
+    if last is None:
+        return None
+    dates, closes = store.read(symbol, start=range_start(range_, last))
+    dates, closes = resample_last(dates, closes, interval)
+    keep = lttb(dates.astype(np.int64), closes, points)
+    return {
+        "source_points": int(len(dates)),
+        "columns": {
+            "date": np.datetime_as_string(dates[keep], unit="D").tolist(),
+            "close": np.round(closes[keep], 4).tolist(),
+        },
+    }
+
+
+def chart_etag(store, symbol: str, range_: str, interval: str, points: int) -> Optional[str]:
+    """
+    Validator for a chart response: changes whenever the stored series
+    grows or is rewritten, so unchanged ranges can be answered with 304
+    """
+    last = store.last_date(symbol)
+    if last is None:
+        return None
+    key = f"{symbol}|{range_}|{interval}|{points}|{store.count(symbol)}|{last}|{store.basis(symbol)}"
+    return '"' + hashlib.sha1(key.encode()).hexdigest()[:20] + '"'
@@ -0,0 +1,340 @@
+"""
+Data-Driven Return & Covariance Estimator
+=========================================
+Estimates annualized returns, volatilities and a shrunk EWMA covariance
+matrix for the tickers behind each asset class from the local price
+history store, and publishes sleeve-level (equity / debt / alts) returns to
+``estimate_portfolio_return``.
+
+The estimator keeps running state (mean log return, EWMA second moments) so a
+new daily bar is folded in with ``update`` in O(N^2) instead of refitting
+the whole history. ``fit`` is the vectorized equivalent of calling
+``update`` once per bar.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services import sip
+from app.services.optimizer import get_tactical_optimizer
+from app.services.price_store import get_price_store
+from app.services.scorer_registry import get_scorer_registry
+
+TRADING_DAYS = 252
+TRADING_DAYS_PER_MONTH = TRADING_DAYS / 12
+
+# Strategic sleeves as equal-weight groups of asset classes
+SLEEVES = {
+    "equity": ("Large Cap", "Mid Cap", "Small Cap"),
+    "debt": ("Debt",),
+    "gold": ("Gold",),
+    "silver": ("Silver",),
+}
+
+
+@dataclass(frozen=True)
+class ReturnEstimate:
+    """
+    Annualized estimates per asset class. Returns are nominal annual rates
+    compounded monthly (the convention of ``calculate_monthly_sip``).
+    """
+    version: int
+    as_of: Optional[str]
+    asset_classes: Tuple[str, ...]
+    tickers: Tuple[str, ...]
+    n_obs: int
+    annual_returns: np.ndarray
+    annual_volatility: np.ndarray
+    covariance: np.ndarray
+
+    @property
+    def correlation(self) -> np.ndarray:
+        vol = np.sqrt(np.diag(self.covariance))
+        return self.covariance / np.outer(vol, vol)
+
+    def sleeve_statistics(self, sleeves: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns, volatilities and correlation for equal-weight sleeves"""
+        index = {a: i for i, a in enumerate(self.asset_classes)}
+        agg = np.zeros((len(sleeves), len(self.asset_classes)))
+        for s, sleeve in enumerate(sleeves):
+            members = SLEEVES[sleeve]
+            for asset_class in members:
+                agg[s, index[asset_class]] = 1.0 / len(members)
+        returns = agg @ self.annual_returns
+        cov = agg @ self.covariance @ agg.T
+        vol = np.sqrt(np.diag(cov))
+        return returns, vol, cov / np.outer(vol, vol)
+
+    def sleeve_returns(self) -> Dict[str, float]:
+        """Sleeve returns in the ``estimate_portfolio_return`` keys (equity/debt/alts)"""
+        index = {a: i for i, a in enumerate(self.asset_classes)}
+
+        def mean_of(assets):
+            return float(np.mean([self.annual_returns[index[a]] for a in assets]))
+
+        return {
+            "equity": mean_of(SLEEVES["equity"]),
+            "debt": mean_of(SLEEVES["debt"]),
+            "alts": mean_of(SLEEVES["gold"] + SLEEVES["silver"]),
+        }
+
+
+class ReturnEstimator:
+    """
+    Incremental estimator over aligned daily closes for a fixed ticker set.
+
+    Parameters:
+    -----------
+    asset_classes, tickers : Sequence[str]
+        Asset classes and their tickers, in matching order
+    ewma_lambda : float
+        Daily decay of the EWMA covariance (RiskMetrics-style, zero mean)
+    shrinkage : float
+        Weight of the constant-correlation target in the covariance
+    min_obs : int
+        Daily returns required before estimates are published
+    """
+
+    def __init__(
+        self,
+        asset_classes: Sequence[str],
+        tickers: Sequence[str],
+        ewma_lambda: float = 0.97,
+        shrinkage: float = 0.2,
+        min_obs: int = TRADING_DAYS,
+    ):
+        self.asset_classes = tuple(asset_classes)
+        self.tickers = tuple(tickers)
+        self.ewma_lambda = ewma_lambda
+        self.shrinkage = shrinkage
+        self.min_obs = min_obs
+        self.version = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        n = len(self.tickers)
+        self.last_date: Optional[np.datetime64] = None
+        self.last_prices: Optional[np.ndarray] = None
+        self.n_obs = 0
+        self._sum_log = np.zeros(n)
+        self._ewma_moment = np.zeros((n, n))
+        self._ewma_weight = 0.0
+
+    def fit(self, dates: np.ndarray, prices: np.ndarray) -> None:
+        """Fit from scratch on aligned closes: ``dates`` (T,), ``prices`` (T, N)"""
+        self._reset()
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        prices = np.asarray(prices, dtype=np.float64)
+        valid = np.all(np.isfinite(prices) & (prices > 0), axis=1)
+        dates, prices = dates[valid], prices[valid]
+        if len(prices) == 0:
+            return
+
+        log_returns = np.diff(np.log(prices), axis=0)
+        lam = self.ewma_lambda
+        t = len(log_returns)
+        if t:
+            decay = (1 - lam) * lam ** np.arange(t - 1, -1, -1)
+            self._ewma_moment = (log_returns * decay[:, None]).T @ log_returns
+            self._ewma_weight = float(decay.sum())
+            self._sum_log = log_returns.sum(axis=0)
+            self.n_obs = t
+        self.last_date = dates[-1]
+        self.last_prices = prices[-1].copy()
+        self.version += 1
+
+    def update(self, date, prices_row: Sequence[float]) -> bool:
+        """Fold in one new daily bar; returns False if it is not newer or invalid"""
+        date = np.datetime64(date, "D")
+        row = np.asarray(prices_row, dtype=np.float64)
+        if not np.all(np.isfinite(row) & (row > 0)):
+            return False
+        if self.last_date is not None and date <= self.last_date:
+            return False
+        if self.last_prices is not None:
+            r = np.log(row / self.last_prices)
+            lam = self.ewma_lambda
+            self._ewma_moment = lam * self._ewma_moment + (1 - lam) * np.outer(r, r)
+            self._ewma_weight = lam * self._ewma_weight + (1 - lam)
+            self._sum_log += r
+            self.n_obs += 1
+        self.last_date = date
+        self.last_prices = row
+        self.version += 1
+        return True
+
+    def update_many(self, dates: np.ndarray, prices: np.ndarray) -> int:
+        """Fold in every bar newer than the last seen date; returns bars applied"""
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        start = 0 if self.last_date is None else int(np.searchsorted(dates, self.last_date, side="right"))
+        applied = 0
+        for date, row in zip(dates[start:], np.asarray(prices)[start:]):
+            applied += self.update(date, row)
+        return applied
+
+    def estimate(self) -> Optional[ReturnEstimate]:
+        """Current estimate, or None until ``min_obs`` returns have been seen"""
+        if self.n_obs < max(self.min_obs, 2) or self._ewma_weight <= 0:
+            return None
+        daily_cov = self._ewma_moment / self._ewma_weight
+        vol = np.sqrt(np.diag(daily_cov))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = daily_cov / np.outer(vol, vol)
+        n = len(vol)
+        off_diag = corr[~np.eye(n, dtype=bool)]
+        mean_corr = float(np.nanmean(off_diag)) if off_diag.size else 0.0
+        target = mean_corr * np.outer(vol, vol)
+        np.fill_diagonal(target, vol ** 2)
+        cov = ((1 - self.shrinkage) * daily_cov + self.shrinkage * target) * TRADING_DAYS
+
+        mean_log = self._sum_log / self.n_obs
+        annual_returns = 12 * np.expm1(mean_log * TRADING_DAYS_PER_MONTH)
+        return ReturnEstimate(
+            version=self.version,
+            as_of=str(self.last_date) if self.last_date is not None else None,
+            asset_classes=self.asset_classes,
+            tickers=self.tickers,
+            n_obs=self.n_obs,
+            annual_returns=annual_returns,
+            annual_volatility=np.sqrt(np.diag(cov)),
+            covariance=cov,
+        )
+
+
+_estimator: Optional[ReturnEstimator] = None
+_estimate: Optional[ReturnEstimate] = None
+# Price store basis of each ticker at the last fit; a change means re-based history
+_basis: Optional[Tuple] = None
+
+
+def get_return_estimator() -> Optional[ReturnEstimator]:
+    return _estimator
+
+
+def get_return_estimate() -> Optional[ReturnEstimate]:
+    """Latest published estimate (None while default returns are in use)"""
+    return _estimate
+
+
+def _bounded_return(value: float) -> Optional[float]:
+    """``value`` clamped to [ESTIMATOR_RETURN_FLOOR, ESTIMATOR_RETURN_CAP]; None if not positive"""
+    if not np.isfinite(value) or value <= 0:
+        return None
+    return min(max(value, settings.estimator_return_floor), settings.estimator_return_cap)
+
+
+def bounded_sleeve_returns(estimate: ReturnEstimate) -> Optional[Dict[str, float]]:
+    """
+    Sleeve returns safe to quote SIPs from: a sleeve keeps its default
+    return (is left out) when the history is shorter than
+    ``ESTIMATOR_MIN_RETURN_OBS`` or its estimate is not positive, and is
+    otherwise clamped to [ESTIMATOR_RETURN_FLOOR, ESTIMATOR_RETURN_CAP].
+    None when no sleeve qualifies.
+    """
+    if estimate.n_obs < settings.estimator_min_return_obs:
+        return None
+    bounded = {}
+    for sleeve, value in estimate.sleeve_returns().items():
+        value = _bounded_return(value)
+        if value is not None:
+            bounded[sleeve] = value
+    return bounded or None
+
+
+def bounded_sleeve_statistics(
+    estimate: ReturnEstimate,
+    sleeves: Sequence[str],
+    default_returns: Sequence[float],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    ``sleeve_statistics`` with returns bounded like ``bounded_sleeve_returns``:
+    a sleeve falls back to its entry in ``default_returns`` when the history
+    is too short or its estimate is not positive.
+    """
+    returns, volatility, correlation = estimate.sleeve_statistics(sleeves)
+    bounded = np.asarray(default_returns, dtype=np.float64).copy()
+    if estimate.n_obs >= settings.estimator_min_return_obs:
+        for i, value in enumerate(returns):
+            value = _bounded_return(float(value))
+            if value is not None:
+                bounded[i] = value
+    return bounded, volatility, correlation
+
+
+def publish_estimate() -> Optional[ReturnEstimate]:
+    """Push the estimator's current estimate to the SIP math and allocation table"""
+    global _estimate
+    if _estimator is None:
+        return None
+    estimate = _estimator.estimate()
+    if estimate is None or (_estimate is not None and _estimate.version == estimate.version):
+        return _estimate
+    _estimate = estimate
+    sip.set_sleeve_returns(bounded_sleeve_returns(estimate), as_of=estimate.as_of)
+    print(f"✓ Return estimates updated ({estimate.n_obs} daily returns, as of {estimate.as_of})")
+
+    optimizer = get_tactical_optimizer()
+    if optimizer is not None:
+        optimizer.set_risk_model(
+            estimate.asset_classes, estimate.annual_returns, estimate.covariance, estimate.version
+        )
+
+    # Expected returns (and optimizer weights) are baked into the
+    # precompiled allocation table
+    try:
+        get_scorer_registry().refresh_table()
+    except RuntimeError:
+        pass
+    return estimate
+
+
+def init_return_estimator(asset_mapping: Dict[str, str]) -> ReturnEstimator:
+    """Create the estimator for ``asset_mapping`` and fit it from local history"""
+    global _estimator, _basis
+    asset_classes = tuple(SLEEVES["equity"] + SLEEVES["debt"] + SLEEVES["gold"] + SLEEVES["silver"])
+    tickers = tuple(asset_mapping[a] for a in asset_classes)
+    _estimator = ReturnEstimator(
+        asset_classes,
+        tickers,
+        ewma_lambda=settings.estimator_ewma_lambda,
+        shrinkage=settings.estimator_shrinkage,
+    )
+    store = get_price_store()
+    _basis = tuple(store.basis(t) for t in tickers)
+    dates, prices = store.matrix(tickers)
+    _estimator.fit(dates, prices)
+    if publish_estimate() is None:
+        print("⚠ Not enough local price history for return estimates")
+        print("  → Using default annual returns")
+    return _estimator
+
+
+def refresh_return_estimator() -> Optional[ReturnEstimate]:
+    """
+    Fold bars appended to the price store since the last update into the
+    estimate; refit from scratch when a ticker's history was rewritten
+    """
+    global _basis
+    if _estimator is None:
+        return None
+    store = get_price_store()
+    basis = tuple(store.basis(t) for t in _estimator.tickers)
+    if basis != _basis:
+        _basis = basis
+        _estimator.fit(*store.matrix(_estimator.tickers))
+        return publish_estimate()
+    dates, prices = store.matrix(_estimator.tickers, start=_estimator.last_date)
+    if _estimator.update_many(dates, prices):
+        return publish_estimate()
+    return _estimate
+
+
+def close_return_estimator() -> None:
+    global _estimator, _estimate, _basis
+    _estimator = None
+    _estimate = None
+    _basis = None
+    sip.set_sleeve_returns(None)
@@ -0,0 +1,347 @@
+"""
+Multi-Factor Scoring Engine
+===========================
+Recomputes the tactical rankings in-process from the local price history.
+Per asset class it tracks four factors over rolling daily windows:
+
+- momentum:   log return over the last ``MOMENTUM_WINDOW`` sessions
+- volatility: annualized std of daily log returns (lower is better)
+- drawdown:   close vs the rolling ``DRAWDOWN_WINDOW`` high (closer is better)
+- trend:      fast / slow simple moving average - 1
+
+``compute_factors`` evaluates every window over a whole price matrix with
+NumPy. ``FactorEngine`` keeps running window state (ring buffer of closes,
+running sums, monotonic max queues), so one new daily bar is folded in
+without recomputing the windows.
+
+Factors are standardized across asset classes and blended with the model's
+view (XGBoost predictions when the model's features are these factors,
+else the scorer's own hybrid scores) into a ``ranked_df``-equivalent
+``RankingsIndex``.
+"""
+
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.price_store import get_price_store
+from app.services.rankings import RankingsIndex, RankRecord
+from app.services.scorer_registry import get_scorer_registry
+
+MOMENTUM_WINDOW = 252
+VOLATILITY_WINDOW = 63
+DRAWDOWN_WINDOW = 252
+TREND_FAST = 50
+TREND_SLOW = 200
+FACTORS = ("momentum", "volatility", "drawdown", "trend")
+
+# Sign and weight of each standardized factor in the factor composite
+FACTOR_WEIGHTS = {
+    "momentum": 0.35,
+    "volatility": -0.20,
+    "drawdown": 0.20,
+    "trend": 0.25,
+}
+
+# Closes kept in the ring buffer: enough for the longest look-back
+BUFFER = max(MOMENTUM_WINDOW, VOLATILITY_WINDOW, DRAWDOWN_WINDOW, TREND_SLOW) + 1
+
+
+def _rolling_sum(x: np.ndarray, window: int) -> np.ndarray:
+    """Trailing ``window``-row sums; NaN for the first ``window - 1`` rows"""
+    out = np.full(x.shape, np.nan)
+    if len(x) >= window:
+        c = np.cumsum(np.vstack([np.zeros((1,) + x.shape[1:]), x]), axis=0)
+        out[window - 1:] = c[window:] - c[:-window]
+    return out
+
+
+def compute_factors(prices: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Every factor for every date of a (T, N) close matrix, as (T, N) arrays
+    (NaN until the factor's window is full).
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    log_p = np.log(prices)
+    t = len(prices)
+
+    momentum = np.full(prices.shape, np.nan)
+    momentum[MOMENTUM_WINDOW:] = log_p[MOMENTUM_WINDOW:] - log_p[:-MOMENTUM_WINDOW]
+
+    returns = np.vstack([np.full((1, prices.shape[1]), np.nan), np.diff(log_p, axis=0)])
+    s1 = _rolling_sum(np.nan_to_num(returns), VOLATILITY_WINDOW)
+    s2 = _rolling_sum(np.nan_to_num(returns) ** 2, VOLATILITY_WINDOW)
+    n = VOLATILITY_WINDOW
+    variance = np.maximum(s2 - s1 ** 2 / n, 0.0) / (n - 1)
+    volatility = np.sqrt(variance * 252)
+    volatility[:VOLATILITY_WINDOW] = np.nan
+
+    drawdown = np.full(prices.shape, np.nan)
+    if t >= DRAWDOWN_WINDOW:
+        windows = np.lib.stride_tricks.sliding_window_view(prices, DRAWDOWN_WINDOW, axis=0)
+        drawdown[DRAWDOWN_WINDOW - 1:] = prices[DRAWDOWN_WINDOW - 1:] / windows.max(axis=-1) - 1.0
+
+    trend = (_rolling_sum(prices, TREND_FAST) / TREND_FAST) / (_rolling_sum(prices, TREND_SLOW) / TREND_SLOW) - 1.0
+
+    return {"momentum": momentum, "volatility": volatility, "drawdown": drawdown, "trend": trend}
+
+
+def _zscore(x: np.ndarray) -> np.ndarray:
+    spread = x.std()
+    return (x - x.mean()) / spread if spread > 0 else np.zeros_like(x)
+
+
+def _to_score(z: np.ndarray) -> np.ndarray:
+    """Map standardized values to a positive 0-100 score (logistic)"""
+    return 100.0 / (1.0 + np.exp(-z))
+
+
+class FactorEngine:
+    """
+    Incremental factor state for a fixed ticker set.
+
+    Parameters:
+    -----------
+    asset_classes, tickers : Sequence[str]
+        Asset classes and their tickers, in matching order
+    """
+
+    def __init__(self, asset_classes: Sequence[str], tickers: Sequence[str]):
+        self.asset_classes = tuple(asset_classes)
+        self.tickers = tuple(tickers)
+        self.version = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        n = len(self.tickers)
+        self.last_date: Optional[np.datetime64] = None
+        self.n_obs = 0
+        self._buffer = np.full((BUFFER, n), np.nan)
+        self._pos = -1
+        self._ret_sum = np.zeros(n)
+        self._ret_sq_sum = np.zeros(n)
+        self._fast_sum = np.zeros(n)
+        self._slow_sum = np.zeros(n)
+        # Per-asset monotonic (index, close) queues for the rolling high
+        self._max_queues: List[deque] = [deque() for _ in range(n)]
+
+    def _lag(self, k: int) -> np.ndarray:
+        """Close ``k`` bars before the latest one"""
+        return self._buffer[(self._pos - k) % BUFFER]
+
+    def fit(self, dates: np.ndarray, prices: np.ndarray) -> None:
+        """Rebuild the window state from aligned closes: ``dates`` (T,), ``prices`` (T, N)"""
+        self._reset()
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        prices = np.asarray(prices, dtype=np.float64)
+        valid = np.all(np.isfinite(prices) & (prices > 0), axis=1)
+        dates, prices = dates[valid], prices[valid]
+        if len(prices) == 0:
+            return
+
+        tail = prices[-BUFFER:]
+        k = len(tail)
+        self._buffer[:k] = tail
+        self._pos = k - 1
+        self.n_obs = len(prices)
+
+        returns = np.diff(np.log(prices[-(VOLATILITY_WINDOW + 1):]), axis=0)
+        self._ret_sum = returns.sum(axis=0)
+        self._ret_sq_sum = (returns ** 2).sum(axis=0)
+        self._fast_sum = prices[-TREND_FAST:].sum(axis=0)
+        self._slow_sum = prices[-TREND_SLOW:].sum(axis=0)
+
+        start = self.n_obs - min(self.n_obs, DRAWDOWN_WINDOW)
+        for i, row in enumerate(prices[start:], start=start):
+            self._push_max(i, row)
+        self.last_date = dates[-1]
+        self.version += 1
+
+    def _push_max(self, index: int, row: np.ndarray) -> None:
+        for queue, price in zip(self._max_queues, row.tolist()):
+            while queue and queue[-1][1] <= price:
+                queue.pop()
+            queue.append((index, price))
+            while queue[0][0] <= index - DRAWDOWN_WINDOW:
+                queue.popleft()
+
+    def update(self, date, prices_row: Sequence[float]) -> bool:
+        """Fold in one new daily bar in O(N); returns False if it is not newer or invalid"""
+        date = np.datetime64(date, "D")
+        row = np.asarray(prices_row, dtype=np.float64)
+        if not np.all(np.isfinite(row) & (row > 0)):
+            return False
+        if self.last_date is not None and date <= self.last_date:
+            return False
+
+        n = self.n_obs
+        if n >= 1:
+            r = np.log(row / self._lag(0))
+            self._ret_sum += r
+            self._ret_sq_sum += r ** 2
+            if n > VOLATILITY_WINDOW:
+                # Return leaving the window: lag VOLATILITY_WINDOW-1 vs VOLATILITY_WINDOW
+                old = np.log(self._lag(VOLATILITY_WINDOW - 1) / self._lag(VOLATILITY_WINDOW))
+                self._ret_sum -= old
+                self._ret_sq_sum -= old ** 2
+        self._fast_sum += row
+        if n >= TREND_FAST:
+            self._fast_sum -= self._lag(TREND_FAST - 1)
+        self._slow_sum += row
+        if n >= TREND_SLOW:
+            self._slow_sum -= self._lag(TREND_SLOW - 1)
+
+        self._pos = (self._pos + 1) % BUFFER
+        self._buffer[self._pos] = row
+        self._push_max(n, row)
+        self.n_obs = n + 1
+        self.last_date = date
+        self.version += 1
+        return True
+
+    def update_many(self, dates: np.ndarray, prices: np.ndarray) -> int:
+        """Fold in every bar newer than the last seen date; returns bars applied"""
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        start = 0 if self.last_date is None else int(np.searchsorted(dates, self.last_date, side="right"))
+        applied = 0
+        for date, row in zip(dates[start:], np.asarray(prices)[start:]):
+            applied += self.update(date, row)
+        return applied
+
+    @property
+    def ready(self) -> bool:
+        return self.n_obs >= BUFFER
+
+    def factors(self) -> Optional[Dict[str, np.ndarray]]:
+        """Latest factor values per asset class, or None until every window is full"""
+        if not self.ready:
+            return None
+        latest = self._lag(0)
+        n = VOLATILITY_WINDOW
+        variance = np.maximum(self._ret_sq_sum - self._ret_sum ** 2 / n, 0.0) / (n - 1)
+        rolling_high = np.array([queue[0][1] for queue in self._max_queues])
+        return {
+            "momentum": np.log(latest / self._lag(MOMENTUM_WINDOW)),
+            "volatility": np.sqrt(variance * 252),
+            "drawdown": latest / rolling_high - 1.0,
+            "trend": (self._fast_sum / TREND_FAST) / (self._slow_sum / TREND_SLOW) - 1.0,
+        }
+
+    def rankings(
+        self,
+        model_scores: Optional[np.ndarray] = None,
+        model_weight: float = 0.5,
+    ) -> Optional[RankingsIndex]:
+        """
+        Hybrid rankings: logistic 0-100 scores of the factor composite,
+        blended with ``model_scores`` (one per asset class) when given
+        """
+        factors = self.factors()
+        if factors is None:
+            return None
+        composite = sum(w * _zscore(factors[name]) for name, w in FACTOR_WEIGHTS.items())
+        score = _to_score(_zscore(composite))
+        if model_scores is not None:
+            model = _to_score(_zscore(np.asarray(model_scores, dtype=np.float64)))
+            score = model_weight * model + (1 - model_weight) * score
+        order = np.argsort(-score, kind="stable")
+        return RankingsIndex(
+            RankRecord(self.asset_classes[i], float(score[i]), rank)
+            for rank, i in enumerate(order, start=1)
+        )
+
+
+def model_view(scorer, asset_classes: Sequence[str], factors: Dict[str, np.ndarray]) -> Optional[np.ndarray]:
+    """
+    The model's score per asset class: XGBoost predictions when the model
+    was trained on these factor names, else the scorer's own hybrid scores
+    """
+    if scorer is None:
+        return None
+    model = getattr(scorer, "model", None)
+    names = getattr(model, "feature_names_in_", None)
+    if names is None and hasattr(model, "feature_names"):
+        names = model.feature_names
+    if names is not None and len(names) and all(n in factors for n in names):
+        features = np.column_stack([factors[n] for n in names])
+        try:
+            if type(model).__name__ == "Booster":
+                import xgboost as xgb
+                return np.asarray(model.predict(xgb.DMatrix(features, feature_names=list(names))), dtype=float)
+            return np.asarray(model.predict(features), dtype=float)
+        except Exception as e:
+            print(f"⚠ Model prediction failed, using scorer rankings: {e}")
+
+    index = getattr(scorer, "rankings_index", None)
+    if index is None and getattr(scorer, "ranked_df", None) is not None:
+        index = RankingsIndex.from_frame(scorer.ranked_df)
+    if index is None or any(index.score(a) is None for a in asset_classes):
+        return None
+    return np.array([index.score(a) for a in asset_classes])
+
+
+_engine: Optional[FactorEngine] = None
+# Price store basis of each ticker at the last fit; a change means re-based history
+_basis: Optional[Tuple] = None
+
+
+def get_factor_engine() -> Optional[FactorEngine]:
+    return _engine
+
+
+def publish_rankings() -> Optional[RankingsIndex]:
+    """Push freshly computed rankings to the scorer registry (and allocation table)"""
+    if _engine is None:
+        return None
+    factors = _engine.factors()
+    if factors is None:
+        return None
+    registry = get_scorer_registry()
+    scores = model_view(registry.allocator.scorer, _engine.asset_classes, factors)
+    rankings = _engine.rankings(scores, settings.factor_model_weight)
+    registry.publish_rankings(rankings, source=f"factors@{_engine.last_date}")
+    print(f"✓ Factor rankings updated (as of {_engine.last_date})")
+    return rankings
+
+
+def init_factor_engine(asset_mapping: Dict[str, str]) -> FactorEngine:
+    """Create the engine for ``asset_mapping``, fit it from local history and publish"""
+    global _engine, _basis
+    asset_classes = tuple(asset_mapping)
+    _engine = FactorEngine(asset_classes, tuple(asset_mapping[a] for a in asset_classes))
+    store = get_price_store()
+    _basis = tuple(store.basis(t) for t in _engine.tickers)
+    dates, prices = store.matrix(_engine.tickers)
+    _engine.fit(dates, prices)
+    if publish_rankings() is None:
+        print("⚠ Not enough local price history for factor rankings")
+        print("  → Using scorer rankings")
+    return _engine
+
+
+def refresh_factor_engine() -> Optional[RankingsIndex]:
+    """
+    Fold bars appended to the price store since the last update and
+    republish; refit from scratch when a ticker's history was rewritten
+    """
+    global _basis
+    if _engine is None:
+        return None
+    store = get_price_store()
+    basis = tuple(store.basis(t) for t in _engine.tickers)
+    if basis != _basis:
+        _basis = basis
+        _engine.fit(*store.matrix(_engine.tickers))
+        return publish_rankings()
+    dates, prices = store.matrix(_engine.tickers, start=_engine.last_date)
+    if _engine.update_many(dates, prices):
+        return publish_rankings()
+    return None
+
+
+def close_factor_engine() -> None:
+    global _engine, _basis
+    _engine = None
+    _basis = None
@@ -0,0 +1,110 @@
+"""
+Glide-Path Projection
+=====================
+Month-by-month schedule for a goal whose allocation de-risks as maturity
+approaches: each month uses the strategic bucket of the *remaining* horizon
+(``>7`` -> ``3to7`` -> ``lt3``) instead of one bucket for the whole goal.
+
+The corpus recursion ``V_m = V_{m-1} * g_m + c_m`` (end-of-month
+contributions, ``g_m = 1 + r_m / 12`` as in ``calculate_monthly_sip``) is
+evaluated in closed form with cumulative products and sums:
+
+    V_m = G_m * sum_{k <= m} c_k / G_k,   G_m = prod_{j <= m} g_j
+"""
+
+from typing import Dict
+
+import numpy as np
+
+from app.services.allocation import (
+    ASSET_CLASSES,
+    RISK_PROFILES,
+    TIME_BUCKETS,
+    PortfolioAllocationSystem,
+    RiskProfile,
+    horizon_bucket_index,
+)
+
+MAX_MONTHS = 360
+
+
+def glide_path_schedule(
+    allocator: PortfolioAllocationSystem,
+    horizon_years: int,
+    risk_profile: RiskProfile,
+    monthly_sip: float = 1.0,
+    annual_step_up: float = 0.0,
+) -> Dict[str, np.ndarray]:
+    """
+    Monthly glide-path schedule for one goal.
+
+    Parameters:
+    -----------
+    allocator : PortfolioAllocationSystem
+        Source of the per-bucket weights and expected returns
+    horizon_years : int
+        Goal horizon (at most 30 years / 360 months)
+    risk_profile : RiskProfile
+        Risk profile, fixed over the goal
+    monthly_sip : float
+        First-year monthly contribution
+    annual_step_up : float
+        Yearly SIP increase (0.1 = contributions grow 10% every 12 months)
+
+    Returns:
+    --------
+    Dict of (months,) columns: month, remaining_years, bucket, equity/debt/
+    alts, per-asset-class weights, expected_return, contribution,
+    total_invested and corpus (end of month, after the contribution)
+    """
+    months = int(horizon_years) * 12
+    if not 0 < months <= MAX_MONTHS:
+        raise ValueError(f"horizon_years must be between 1 and {MAX_MONTHS // 12}")
+    risk = RISK_PROFILES.index(risk_profile)
+
+    month = np.arange(months)
+    remaining_years = -(-(months - month) // 12)  # ceil of remaining months / 12
+    bucket = horizon_bucket_index(remaining_years)
+    weights, strategic, expected = allocator.allocation_arrays()
+    annual_return = expected[bucket, risk]
+
+    contribution = monthly_sip * (1.0 + annual_step_up) ** (month // 12)
+    growth = np.cumprod(1.0 + annual_return / 12.0)
+    corpus = growth * np.cumsum(contribution / growth)
+
+    columns = {
+        "month": month + 1,
+        "remaining_years": remaining_years,
+        "bucket": np.asarray(TIME_BUCKETS)[bucket],
+        "equity": strategic[bucket, risk, 0],
+        "debt": strategic[bucket, risk, 1],
+        "alts": strategic[bucket, risk, 2],
+    }
+    for i, asset_class in enumerate(ASSET_CLASSES):
+        columns[asset_class] = weights[bucket, risk, i]
+    columns.update({
+        "expected_return": annual_return,
+        "contribution": contribution,
+        "total_invested": np.cumsum(contribution),
+        "corpus": corpus,
+    })
+    return columns
+
+
+def glide_path_sip(
+    allocator: PortfolioAllocationSystem,
+    target_corpus: float,
+    horizon_years: int,
+    risk_profile: RiskProfile,
+    annual_step_up: float = 0.0,
+) -> int:
+    """
+    First-year monthly SIP that reaches ``target_corpus`` on the glide path,
+    rounded to the nearest 100 like ``calculate_monthly_sip``
+    """
+    # The corpus is linear in the SIP, so one unit schedule gives the answer
+    unit = glide_path_schedule(allocator, horizon_years, risk_profile, 1.0, annual_step_up)
+    final = unit["corpus"][-1]
+    if final <= 0:
+        return 0
+    return int(100 * round(target_corpus / final / 100.0))
@@ -0,0 +1,277 @@
+"""
+Market Quotes
+=============
+Yahoo chart quotes behind an in-process cache keyed by symbol:
+
+* Fresh for ``QUOTE_TTL_OPEN`` seconds while the market is trading
+  (``marketState`` REGULAR/PRE/POST) and ``QUOTE_TTL_CLOSED`` otherwise.
+* Single-flight: concurrent misses for a symbol share one upstream call.
+* Stale-while-revalidate: for ``QUOTE_STALE_GRACE`` seconds after expiry
+  the old quote is returned at once while one background refresh runs.
+* Unknown symbols (HTTP 404 / empty result) are cached as misses for
+  ``QUOTE_NEGATIVE_TTL`` seconds; transient errors are never cached.
+* When a fetch fails (including an open circuit breaker) the last good
+  quote is returned, however old, so an upstream outage degrades to
+  cached data instead of errors.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+import httpx
+
+from app.core.circuit_breaker import OPEN, CircuitOpenError, get_circuit_breaker
+from app.core.config import settings
+from app.core.fetch_scheduler import get_fetch_scheduler
+from app.services.price_store import yahoo_chart_url
+
+QUOTE_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "application/json",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+LIVE_MARKET_STATES = {"REGULAR", "PRE", "POST"}
+
+
+class QuoteNotFound(Exception):
+    """The upstream does not know the symbol"""
+
+
+async def fetch_quote(symbol: str, background: bool = False) -> Dict[str, Any]:
+    """
+    Current quote for ``symbol`` (without a display name). ``background``
+    fetches go through the scheduler's low-priority lane.
+
+    Raises ``QuoteNotFound`` for unknown symbols and any other exception
+    for transient failures.
+    """
+    params = {"interval": "1d", "range": "1d"}
+    # Rate limiting and 429 backoff are handled by the shared scheduler
+    response = await get_fetch_scheduler().get(
+        yahoo_chart_url(symbol), params=params, headers=QUOTE_HEADERS, background=background
+    )
+    if response.status_code == 404:
+        raise QuoteNotFound(symbol)
+    if response.status_code != 200:
+        raise RuntimeError(f"HTTP {response.status_code}")
+
+    data = response.json()
+    if "chart" not in data or "result" not in data["chart"]:
+        raise RuntimeError("Invalid response structure")
+    if not data["chart"]["result"]:
+        raise QuoteNotFound(symbol)
+
+    meta = data["chart"]["result"][0].get("meta", {})
+    current_price = meta.get("regularMarketPrice", 0)
+    previous_close = meta.get("previousClose", 0)
+    if current_price and previous_close:
+        change = current_price - previous_close
+        change_percent = (change / previous_close) * 100
+    else:
+        change = 0
+        change_percent = 0
+
+    return {
+        "symbol": symbol,
+        "price": round(current_price, 2) if current_price else 0,
+        "change": round(change, 2),
+        "changePercent": round(change_percent, 2),
+        "previousClose": round(previous_close, 2) if previous_close else 0,
+        "marketState": meta.get("marketState", "CLOSED"),
+        "volume": int(meta.get("regularMarketVolume") or 0),
+    }
+
+
+def upstream_available() -> bool:
+    """False while the quote provider's circuit breaker is open"""
+    return get_circuit_breaker(httpx.URL(settings.yahoo_base_url).host).state != OPEN
+
+
+@dataclass
+class CacheEntry:
+    quote: Optional[Dict[str, Any]]  # None = unknown symbol
+    fetched_at: float
+    expires_at: float
+
+    def stale_until(self, grace: float) -> float:
+        return self.expires_at + grace if self.quote is not None else self.expires_at
+
+
+class QuoteCache:
+    """TTL cache with single-flight fetches and stale-while-revalidate"""
+
+    def __init__(
+        self,
+        fetcher: Callable[..., Awaitable[Dict[str, Any]]] = fetch_quote,
+        ttl_open: float = 15.0,
+        ttl_closed: float = 300.0,
+        stale_grace: float = 600.0,
+        negative_ttl: float = 600.0,
+        max_entries: int = 5000,
+    ):
+        self.fetcher = fetcher
+        self.ttl_open = ttl_open
+        self.ttl_closed = ttl_closed
+        self.stale_grace = stale_grace
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+        self.stats = {
+            "hits": 0, "misses": 0, "stale_served": 0, "coalesced": 0,
+            "negative_hits": 0, "refreshes": 0, "errors": 0, "fallbacks": 0,
+        }
+
+    def ttl_for(self, quote: Optional[Dict[str, Any]]) -> float:
+        if quote is None:
+            return self.negative_ttl
+        return self.ttl_open if quote.get("marketState") in LIVE_MARKET_STATES else self.ttl_closed
+
+    def peek(self, symbol: str) -> Optional[CacheEntry]:
+        """Cached entry regardless of age (no fetch)"""
+        return self._entries.get(symbol)
+
+    def _store(self, symbol: str, quote: Optional[Dict[str, Any]]) -> None:
+        now = time.monotonic()
+        self._entries[symbol] = CacheEntry(quote, now, now + self.ttl_for(quote))
+        self._entries.move_to_end(symbol)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _fetch(self, symbol: str, background: bool = False) -> Optional[Dict[str, Any]]:
+        try:
+            quote = await (self.fetcher(symbol, background=True) if background else self.fetcher(symbol))
+        except QuoteNotFound:
+            quote = None
+        except CircuitOpenError:
+            self.stats["errors"] += 1
+            raise
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"Error fetching {symbol}: {e}")
+            raise
+        self._store(symbol, quote)
+        return quote
+
+    def _fetch_done(self, symbol: str, task: asyncio.Task) -> None:
+        self._inflight.pop(symbol, None)
+        self._background.discard(task)
+        # Failures are logged in _fetch; mark the exception as retrieved
+        # in case every waiter has gone away
+        if not task.cancelled():
+            task.exception()
+
+    def _start_fetch(self, symbol: str) -> asyncio.Task:
+        task = self._inflight.get(symbol)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(symbol))
+            self._inflight[symbol] = task
+            task.add_done_callback(lambda t: self._fetch_done(symbol, t))
+        return task
+
+    def _refresh_in_background(self, symbol: str) -> None:
+        if symbol in self._inflight:
+            return
+        self.stats["refreshes"] += 1
+        # On failure the stale entry keeps being served until its grace ends
+        self._background.add(self._start_fetch(symbol))
+
+    async def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Quote for ``symbol``, or None for an unknown symbol. Transient
+        upstream failures propagate when there is nothing stale to serve.
+        """
+        now = time.monotonic()
+        entry = self._entries.get(symbol)
+        if entry is not None:
+            if now < entry.expires_at:
+                self._entries.move_to_end(symbol)
+                if entry.quote is None:
+                    self.stats["negative_hits"] += 1
+                else:
+                    self.stats["hits"] += 1
+                return entry.quote
+            if now < entry.stale_until(self.stale_grace):
+                self.stats["stale_served"] += 1
+                self._refresh_in_background(symbol)
+                return entry.quote
+
+        if symbol in self._inflight:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["misses"] += 1
+        return await self._await_fetch(symbol, entry)
+
+    async def _await_fetch(self, symbol: str, entry: Optional[CacheEntry]) -> Optional[Dict[str, Any]]:
+        """Wait for the shared fetch; on failure fall back to the last good quote"""
+        try:
+            # Shielded so one cancelled caller does not cancel the shared fetch
+            return await asyncio.shield(self._start_fetch(symbol))
+        except Exception:
+            if entry is None or entry.quote is None:
+                raise
+            self.stats["fallbacks"] += 1
+            return entry.quote
+
+    async def get_fresh(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Like ``get``, but waits for the refresh instead of serving a stale quote"""
+        entry = self._entries.get(symbol)
+        if entry is not None and time.monotonic() < entry.expires_at:
+            self.stats["hits"] += 1
+            return entry.quote
+        self.stats["refreshes"] += 1
+        return await self._await_fetch(symbol, entry)
+
+    async def get_background(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Like ``get_fresh`` for bulk jobs: the fetch uses the low-priority
+        lane and is not shared, so user requests never wait behind it.
+        Joins a user-initiated fetch that is already in flight.
+        """
+        entry = self._entries.get(symbol)
+        if entry is not None and time.monotonic() < entry.expires_at:
+            self.stats["hits"] += 1
+            return entry.quote
+        if symbol in self._inflight:
+            self.stats["coalesced"] += 1
+            return await self._await_fetch(symbol, entry)
+        self.stats["refreshes"] += 1
+        try:
+            return await self._fetch(symbol, background=True)
+        except Exception:
+            if entry is None or entry.quote is None:
+                raise
+            self.stats["fallbacks"] += 1
+            return entry.quote
+
+    def info(self) -> dict:
+        return {"entries": len(self._entries), "inflight": len(self._inflight), **self.stats}
+
+
+_cache: Optional[QuoteCache] = None
+
+
+def get_quote_cache() -> QuoteCache:
+    global _cache
+    if _cache is None:
+        _cache = QuoteCache(
+            ttl_open=settings.quote_ttl_open,
+            ttl_closed=settings.quote_ttl_closed,
+            stale_grace=settings.quote_stale_grace,
+            negative_ttl=settings.quote_negative_ttl,
+            max_entries=settings.quote_cache_size,
+        )
+    return _cache
+
+
+def close_quote_cache() -> None:
+    """Cancel in-flight refreshes and drop the cache"""
+    global _cache
+    if _cache is not None:
+        for task in list(_cache._inflight.values()):
+            task.cancel()
+    _cache = None
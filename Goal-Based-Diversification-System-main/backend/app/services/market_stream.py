@@ -0,0 +1,136 @@
+"""
+Market Data Stream
+==================
+A background poller refreshes a fixed universe (indices and popular
+stocks) through the quote cache every ``MARKET_POLL_INTERVAL`` seconds and
+keeps the latest quotes in an in-memory snapshot; quotes still within their
+TTL (e.g. while the market is closed) are not refetched. Subscribers
+receive only the quotes that changed since they last read, so upstream load
+depends on the poll interval, not on the number of connected clients.
+
+Each subscriber keeps a dict of pending changes: a slow client finds newer
+quotes replacing older ones instead of an ever-growing queue.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from app.services.market_quotes import get_quote_cache
+
+# Fields that make a quote "changed" for subscribers
+QUOTE_FIELDS = ("price", "change", "changePercent", "previousClose", "marketState", "volume")
+
+
+class Subscription:
+    """Pending changes for one client, keyed by symbol"""
+
+    def __init__(self):
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._event = asyncio.Event()
+
+    def push(self, quotes: List[Dict[str, Any]]) -> None:
+        for quote in quotes:
+            self._pending[quote["symbol"]] = quote
+        self._event.set()
+
+    async def next(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Changes since the previous call ([] if ``timeout`` passes first)"""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._event.clear()
+        pending, self._pending = self._pending, {}
+        return list(pending.values())
+
+
+class MarketPoller:
+    """Polls ``universe`` ({symbol: name}) into a snapshot and fans out changes"""
+
+    def __init__(self, universe: Dict[str, str], interval: float):
+        self.universe = dict(universe)
+        self.interval = interval
+        self.quotes: Dict[str, Dict[str, Any]] = {}
+        self.version = 0
+        self.updated_at: Optional[float] = None
+        self._subscribers: Set[Subscription] = set()
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Latest quotes in universe order"""
+        return [self.quotes[s] for s in self.universe if s in self.quotes]
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription()
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    async def poll_once(self) -> List[Dict[str, Any]]:
+        """Refresh every symbol; returns (and publishes) the changed quotes"""
+        cache = get_quote_cache()
+        symbols = list(self.universe)
+        results = await asyncio.gather(*(cache.get_fresh(s) for s in symbols), return_exceptions=True)
+
+        changed = []
+        for symbol, quote in zip(symbols, results):
+            if quote is None or isinstance(quote, BaseException):
+                continue
+            previous = self.quotes.get(symbol)
+            if previous is not None and all(previous.get(f) == quote.get(f) for f in QUOTE_FIELDS):
+                continue
+            entry = {"name": self.universe[symbol], **quote}
+            self.quotes[symbol] = entry
+            changed.append(entry)
+
+        self.updated_at = time.time()
+        if changed:
+            self.version += 1
+            for subscription in self._subscribers:
+                subscription.push(changed)
+        return changed
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.poll_once()
+            except Exception as e:
+                print(f"⚠ Market poll failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def info(self) -> dict:
+        return {
+            "symbols": len(self.universe),
+            "quotes": len(self.quotes),
+            "version": self.version,
+            "updated_at": self.updated_at,
+            "subscribers": len(self._subscribers),
+            "interval": self.interval,
+        }
+
+
+_poller: Optional[MarketPoller] = None
+_task: Optional[asyncio.Task] = None
+
+
+def get_market_poller() -> Optional[MarketPoller]:
+    return _poller
+
+
+def start_market_poller(universe: Dict[str, str], interval: float) -> MarketPoller:
+    """Create the poller and start its background task"""
+    global _poller, _task
+    _poller = MarketPoller(universe, interval)
+    _task = asyncio.create_task(_poller.run())
+    print(f"✓ Market poller started ({len(universe)} symbols every {interval:g}s)")
+    return _poller
+
+
+def stop_market_poller() -> None:
+    global _poller, _task
+    if _task is not None:
+        _task.cancel()
+    _poller = None
+    _task = None
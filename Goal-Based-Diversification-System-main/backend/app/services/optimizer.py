@@ -0,0 +1,191 @@
+"""
+Mean-Variance Tactical Optimizer
+================================
+Optional replacement for the score-proportional tactical split inside each
+strategic sleeve (Large/Mid/Small Cap, Gold/Silver). Weights solve a
+long-only mean-variance problem with per-asset min/max bounds, using the
+estimator's covariance and expected returns tilted by the hybrid scores
+(the scores act as return views).
+
+The efficient frontier of each sleeve is solved once per rankings and
+covariance version over a grid of risk aversions and cached. Risk profiles
+map to points on that grid, so building the allocation table only looks
+weights up.
+"""
+
+import itertools
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+# Risk aversion (lambda in  w'mu - lambda/2 w'Sigma w) per risk profile
+PROFILE_RISK_AVERSION = {
+    "Conservative": 6.0,
+    "Moderate": 3.0,
+    "Aggressive": 1.5,
+}
+FRONTIER_RISK_AVERSION = np.unique(np.concatenate([
+    np.logspace(-0.5, 1.5, 41),
+    list(PROFILE_RISK_AVERSION.values()),
+]))
+MAX_CACHED_FRONTIERS = 32
+
+
+def solve_box_qp(
+    mu: np.ndarray,
+    cov: np.ndarray,
+    risk_aversion: float,
+    lower: float,
+    upper: float,
+) -> Optional[np.ndarray]:
+    """
+    Maximize ``w'mu - risk_aversion/2 * w'cov w`` subject to ``sum(w) = 1``
+    and ``lower <= w <= upper``.
+
+    Sleeves have two or three assets, so every active set (each weight free,
+    at its lower bound or at its upper bound) is enumerated and the best
+    feasible KKT point is exact. Returns None if the bounds are infeasible.
+    """
+    n = len(mu)
+    if n * lower > 1 + 1e-12 or n * upper < 1 - 1e-12:
+        return None
+    q = risk_aversion * cov
+    best, best_value = None, -np.inf
+    for states in itertools.product((0, 1, 2), repeat=n):
+        w = np.array([lower if s == 1 else upper if s == 2 else 0.0 for s in states])
+        free = np.array([s == 0 for s in states])
+        k = int(free.sum())
+        if k:
+            # Stationarity on the free weights plus the budget constraint
+            kkt = np.zeros((k + 1, k + 1))
+            kkt[:k, :k] = q[np.ix_(free, free)]
+            kkt[:k, k] = 1.0
+            kkt[k, :k] = 1.0
+            rhs = np.append(mu[free] - q[np.ix_(free, ~free)] @ w[~free], 1.0 - w[~free].sum())
+            solution = np.linalg.lstsq(kkt, rhs, rcond=None)[0]
+            w[free] = solution[:k]
+        if abs(w.sum() - 1.0) > 1e-9 or np.any(w < lower - 1e-9) or np.any(w > upper + 1e-9):
+            continue
+        value = w @ mu - 0.5 * w @ q @ w
+        if value > best_value + 1e-12:
+            best, best_value = np.clip(w, lower, upper), value
+    return best
+
+
+def score_views(prior: np.ndarray, volatility: np.ndarray, scores: np.ndarray, confidence: float) -> np.ndarray:
+    """Expected returns tilted by ``confidence`` volatilities per standardized hybrid score"""
+    spread = scores.std()
+    z = (scores - scores.mean()) / spread if spread > 0 else np.zeros_like(scores)
+    return prior + confidence * volatility * z
+
+
+@dataclass(frozen=True)
+class EfficientFrontier:
+    """Sleeve weights over ``FRONTIER_RISK_AVERSION`` (one row per grid point)"""
+    assets: Tuple[str, ...]
+    risk_aversion: np.ndarray
+    weights: np.ndarray
+    expected_return: np.ndarray
+    volatility: np.ndarray
+
+    def weights_for(self, risk_aversion: float) -> Dict[str, float]:
+        """Weights at the grid point closest to ``risk_aversion``"""
+        i = int(np.argmin(np.abs(np.log(self.risk_aversion) - np.log(risk_aversion))))
+        return dict(zip(self.assets, self.weights[i].tolist()))
+
+
+class TacticalOptimizer:
+    """
+    Caches per-sleeve efficient frontiers for the current risk model.
+
+    Parameters:
+    -----------
+    min_weight, max_weight : float
+        Bounds on each asset's share of its sleeve
+    view_confidence : float
+        Return tilt, in volatilities, per standard deviation of hybrid score
+    """
+
+    def __init__(self, min_weight: float = 0.1, max_weight: float = 0.7, view_confidence: float = 0.25):
+        self.min_weight = min_weight
+        self.max_weight = max_weight
+        self.view_confidence = view_confidence
+        self._risk_model = None
+        self._frontiers: "OrderedDict[tuple, EfficientFrontier]" = OrderedDict()
+
+    @property
+    def risk_model_version(self) -> Optional[int]:
+        return self._risk_model[0] if self._risk_model is not None else None
+
+    def set_risk_model(
+        self,
+        asset_classes: Sequence[str],
+        annual_returns: np.ndarray,
+        covariance: np.ndarray,
+        version: int,
+    ) -> None:
+        """Use a new covariance/return estimate; frontiers are re-solved lazily"""
+        index = {a: i for i, a in enumerate(asset_classes)}
+        self._risk_model = (version, index, np.asarray(annual_returns), np.asarray(covariance))
+
+    def frontier(self, assets: Sequence[str], rankings_index) -> Optional[EfficientFrontier]:
+        """Cached frontier for a sleeve, or None without a risk model or full rankings"""
+        if self._risk_model is None or rankings_index is None:
+            return None
+        scores = [rankings_index.score(a) for a in assets]
+        version, index, returns, covariance = self._risk_model
+        if any(s is None for s in scores) or any(a not in index for a in assets):
+            return None
+
+        key = (tuple(assets), tuple(scores), version)
+        cached = self._frontiers.get(key)
+        if cached is not None:
+            self._frontiers.move_to_end(key)
+            return cached
+
+        idx = [index[a] for a in assets]
+        cov = covariance[np.ix_(idx, idx)]
+        mu = score_views(returns[idx], np.sqrt(np.diag(cov)), np.asarray(scores, dtype=float), self.view_confidence)
+        rows = [solve_box_qp(mu, cov, gamma, self.min_weight, self.max_weight) for gamma in FRONTIER_RISK_AVERSION]
+        if any(w is None for w in rows):
+            return None
+        weights = np.vstack(rows)
+        frontier = EfficientFrontier(
+            assets=tuple(assets),
+            risk_aversion=FRONTIER_RISK_AVERSION,
+            weights=weights,
+            expected_return=weights @ mu,
+            volatility=np.sqrt(np.einsum("ki,ij,kj->k", weights, cov, weights)),
+        )
+        self._frontiers[key] = frontier
+        if len(self._frontiers) > MAX_CACHED_FRONTIERS:
+            self._frontiers.popitem(last=False)
+        return frontier
+
+    def sleeve_weights(self, assets: Sequence[str], rankings_index, risk_profile: str) -> Optional[Dict[str, float]]:
+        """Within-sleeve weights (summing to 1) for a risk profile, or None to fall back"""
+        frontier = self.frontier(assets, rankings_index)
+        if frontier is None:
+            return None
+        return frontier.weights_for(PROFILE_RISK_AVERSION[risk_profile])
+
+
+_optimizer: Optional[TacticalOptimizer] = None
+
+
+def get_tactical_optimizer() -> Optional[TacticalOptimizer]:
+    """Shared optimizer when ``TACTICAL_MODE=optimizer``, else None"""
+    global _optimizer
+    if settings.tactical_mode != "optimizer":
+        return None
+    if _optimizer is None:
+        _optimizer = TacticalOptimizer(
+            min_weight=settings.tactical_min_weight,
+            max_weight=settings.tactical_max_weight,
+            view_confidence=settings.tactical_view_confidence,
+        )
+    return _optimizer
@@ -0,0 +1,88 @@
+"""
+Portfolio Result Types
+======================
+Lightweight, pandas-free result of ``construct_portfolio``. Rows are plain
+tuples and category totals are computed once on construction; a DataFrame
+is only built when explicitly requested via ``to_frame``.
+"""
+
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+import pandas as pd
+
+CATEGORIES = ('Equity', 'Debt', 'Alternatives')
+
+
+class PortfolioRow(NamedTuple):
+    """One holding; ``allocation`` is a fraction (0.25 == 25%)"""
+    asset_class: str
+    category: str
+    ticker: str
+    allocation: float
+    monthly_amount: Optional[float]
+    rank: Optional[int]
+    score: Optional[float]
+
+    @property
+    def allocation_pct(self) -> float:
+        return self.allocation * 100
+
+
+class PortfolioResult:
+    """Sorted portfolio rows with precomputed category totals (fractions)"""
+    __slots__ = ('rows', 'category_totals', 'total_allocation')
+
+    def __init__(self, rows: Sequence[PortfolioRow]):
+        self.rows = tuple(rows)
+        totals = dict.fromkeys(CATEGORIES, 0.0)
+        for row in self.rows:
+            totals[row.category] = totals.get(row.category, 0.0) + row.allocation
+        self.category_totals = totals
+        self.total_allocation = sum(row.allocation for row in self.rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[PortfolioRow]:
+        return iter(self.rows)
+
+    def with_monthly_sip(self, monthly_sip: float = None) -> "PortfolioResult":
+        """Same holdings with monthly amounts for the given SIP"""
+        return PortfolioResult([
+            row._replace(monthly_amount=monthly_sip * row.allocation if monthly_sip else None)
+            for row in self.rows
+        ])
+
+    def to_records(self, monthly_sip: float = None) -> List[Dict]:
+        """
+        Serialize to the API ``portfolio_table`` shape. When ``monthly_sip`` is
+        given, amounts are scaled from it instead of the stored monthly amounts.
+        """
+        records = []
+        for row in self.rows:
+            if monthly_sip is not None:
+                amount = monthly_sip * row.allocation if monthly_sip else None
+            else:
+                amount = row.monthly_amount
+            records.append({
+                "asset_class": row.category,
+                "sub_category": row.asset_class,
+                "allocation": row.allocation_pct,
+                "monthly_sip": amount or 0,
+            })
+        return records
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame with the legacy ``construct_portfolio`` columns"""
+        return pd.DataFrame([
+            {
+                'Asset Class': row.asset_class,
+                'Category': row.category,
+                'Ticker': row.ticker,
+                'Allocation (%)': row.allocation_pct,
+                'Monthly Amount (₹)': row.monthly_amount,
+                'Rank': row.rank,
+                'Score': row.score
+            }
+            for row in self.rows
+        ])
@@ -0,0 +1,328 @@
+"""
+Columnar Price History Store
+============================
+Daily closes kept on local disk as one contiguous column file per ticker:
+
+    <root>/<ticker>/dates.i8   int64 days since 1970-01-01 (sorted, unique)
+    <root>/<ticker>/close.f8   float64 close
+
+Closes are Yahoo's adjusted closes. Updates append only bars newer than
+the last stored date, except when Yahoo has re-based the adjusted series
+(after a dividend or split every past close changes): the sync notices the
+last stored bar no longer matching and rewrites the whole column. A rewrite
+changes ``basis``, so consumers holding incremental state know to refit.
+Writes to one ticker are serialized, and an append interrupted between the
+two columns is truncated back to the rows both files hold.
+Reads memory-map the column files, so a date-range slice is a zero-copy
+view; ``matrix`` aligns several tickers on common dates.
+"""
+
+import asyncio
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import quote, unquote
+
+import httpx
+import numpy as np
+
+from app.core.config import settings
+from app.core.fetch_scheduler import get_fetch_scheduler
+
+DATE_FILE = "dates.i8"
+CLOSE_FILE = "close.f8"
+# Relative change in the last stored close that means the series was re-based
+REBASE_TOLERANCE = 1e-5
+
+YAHOO_CHART_PATH = "/v8/finance/chart"
+YAHOO_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "application/json",
+}
+
+
+def yahoo_chart_url(symbol: str) -> str:
+    """Chart endpoint for ``symbol`` under the configured ``YAHOO_BASE_URL``"""
+    return f"{settings.yahoo_base_url.rstrip('/')}{YAHOO_CHART_PATH}/{symbol}"
+
+
+def _to_days(dates) -> np.ndarray:
+    return np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+
+
+class PriceStore:
+    """Memory-mapped daily close store rooted at ``root`` (appends, or whole-series rewrites)"""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self._maps: Dict[str, Tuple[tuple, np.ndarray, np.ndarray]] = {}
+        # Keeps readers from pairing a rewritten close column with old dates
+        self._lock = threading.Lock()
+        # One writer per ticker: append and replace compare against the
+        # stored series and write it under this lock
+        self._writers: Dict[str, threading.Lock] = {}
+
+    def _dir(self, ticker: str) -> Path:
+        return self.root / quote(ticker, safe=".-_")
+
+    def _writer(self, ticker: str) -> threading.Lock:
+        with self._lock:
+            return self._writers.setdefault(ticker, threading.Lock())
+
+    def tickers(self) -> List[str]:
+        if not self.root.exists():
+            return []
+        return sorted(unquote(p.name) for p in self.root.iterdir() if (p / DATE_FILE).exists())
+
+    def _columns(self, ticker: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Memory-mapped (days, close) columns; remapped only when the files change"""
+        directory = self._dir(ticker)
+        with self._lock:
+            try:
+                dates_stat = os.stat(directory / DATE_FILE)
+                close_stat = os.stat(directory / CLOSE_FILE)
+            except FileNotFoundError:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+            # Close is written before dates, so a torn append never exposes a
+            # date without its close
+            n = min(dates_stat.st_size, close_stat.st_size) // 8
+            key = (n, dates_stat.st_ino, close_stat.st_ino)
+            cached = self._maps.get(ticker)
+            if cached is not None and cached[0] == key:
+                return cached[1], cached[2]
+            if n == 0:
+                days, close = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+            else:
+                days = np.memmap(directory / DATE_FILE, dtype=np.int64, mode="r", shape=(n,))
+                close = np.memmap(directory / CLOSE_FILE, dtype=np.float64, mode="r", shape=(n,))
+            self._maps[ticker] = (key, days, close)
+            return days, close
+
+    def __len__(self) -> int:
+        return len(self.tickers())
+
+    def count(self, ticker: str) -> int:
+        return len(self._columns(ticker)[0])
+
+    def last_date(self, ticker: str) -> Optional[np.datetime64]:
+        days, _ = self._columns(ticker)
+        return np.datetime64(int(days[-1]), "D") if len(days) else None
+
+    def basis(self, ticker: str) -> Optional[int]:
+        """
+        Identifies the stored series up to appends: unchanged by ``append``,
+        changed by every ``replace`` (None without history)
+        """
+        try:
+            return os.stat(self._dir(ticker) / CLOSE_FILE).st_ino
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _clean(dates, closes) -> Tuple[np.ndarray, np.ndarray]:
+        """Sorted bars with finite closes, keeping the last bar for each day"""
+        days = _to_days(dates)
+        values = np.asarray(closes, dtype=np.float64)
+        if len(days) != len(values):
+            raise ValueError("dates and closes must have the same length")
+        order = np.argsort(days, kind="stable")
+        days, values = days[order], values[order]
+        keep = np.isfinite(values)
+        if len(days):
+            keep &= np.append(days[1:] != days[:-1], True)
+        return days[keep], values[keep]
+
+    def append(self, ticker: str, dates, closes) -> int:
+        """Append bars newer than the last stored date; returns bars written"""
+        days, values = self._clean(dates, closes)
+        directory = self._dir(ticker)
+        with self._writer(ticker):
+            n = self._repair(directory)
+            if n:
+                with open(directory / DATE_FILE, "rb") as f:
+                    f.seek((n - 1) * 8)
+                    last = int(np.frombuffer(f.read(8), dtype="<i8")[0])
+                keep = days > last
+                days, values = days[keep], values[keep]
+            if len(days) == 0:
+                return 0
+            directory.mkdir(parents=True, exist_ok=True)
+            # Close first: readers and _repair only count rows present in both files
+            for name, data in ((CLOSE_FILE, values.astype("<f8")), (DATE_FILE, days.astype("<i8"))):
+                with open(directory / name, "ab") as f:
+                    f.write(data.tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+        return len(days)
+
+    @staticmethod
+    def _repair(directory: Path) -> int:
+        """Stored rows; truncates a torn tail left by an interrupted append"""
+        try:
+            sizes = [os.stat(directory / name).st_size for name in (DATE_FILE, CLOSE_FILE)]
+        except FileNotFoundError:
+            return 0
+        n = min(sizes) // 8
+        for name, size in zip((DATE_FILE, CLOSE_FILE), sizes):
+            if size != n * 8:
+                os.truncate(directory / name, n * 8)
+        return n
+
+    def replace(self, ticker: str, dates, closes) -> int:
+        """Rewrite the whole series (e.g. after a re-based adjusted history); returns bars written"""
+        days, values = self._clean(dates, closes)
+        if len(days) == 0:
+            return 0
+        directory = self._dir(ticker)
+        with self._writer(ticker):
+            directory.mkdir(parents=True, exist_ok=True)
+            for name, data in ((CLOSE_FILE, values.astype("<f8")), (DATE_FILE, days.astype("<i8"))):
+                with open(directory / f"{name}.tmp", "wb") as f:
+                    f.write(data.tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+            with self._lock:
+                os.replace(directory / f"{CLOSE_FILE}.tmp", directory / CLOSE_FILE)
+                os.replace(directory / f"{DATE_FILE}.tmp", directory / DATE_FILE)
+        return len(days)
+
+    def read(self, ticker: str, start=None, end=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Zero-copy (dates, closes) for ``start <= date <= end``. Dates are
+        returned as a ``datetime64[D]`` view of the memory-mapped column.
+        """
+        days, close = self._columns(ticker)
+        lo = 0 if start is None else int(np.searchsorted(days, _to_days(start), side="left"))
+        hi = len(days) if end is None else int(np.searchsorted(days, _to_days(end), side="right"))
+        return days[lo:hi].view("datetime64[D]"), close[lo:hi]
+
+    def matrix(
+        self,
+        tickers: Sequence[str],
+        start=None,
+        end=None,
+        how: str = "inner",
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Aligned (dates, closes) with closes of shape (T, len(tickers)).
+
+        ``how="inner"`` keeps dates present for every ticker; ``how="ffill"``
+        uses the union of dates and carries the last close forward (NaN before
+        a ticker's first bar).
+        """
+        columns = [self.read(t, start, end) for t in tickers]
+        if not columns:
+            return np.empty(0, dtype="datetime64[D]"), np.empty((0, 0))
+        day_columns = [c[0].view(np.int64) for c in columns]
+        if how == "inner":
+            dates = day_columns[0]
+            for d in day_columns[1:]:
+                dates = np.intersect1d(dates, d, assume_unique=True)
+        elif how == "ffill":
+            dates = np.unique(np.concatenate(day_columns))
+        else:
+            raise ValueError(f"Unknown alignment: {how}")
+
+        out = np.full((len(dates), len(tickers)), np.nan)
+        for j, (days, (_, close)) in enumerate(zip(day_columns, columns)):
+            if len(days) == 0:
+                continue
+            pos = np.searchsorted(days, dates, side="right") - 1
+            valid = pos >= 0
+            out[valid, j] = close[pos[valid]]
+        return dates.view("datetime64[D]"), out
+
+    def import_csv(self, ticker: str, path: str) -> int:
+        """Append bars from a CSV with Date and Close columns"""
+        import pandas as pd
+        df = pd.read_csv(path, usecols=["Date", "Close"], parse_dates=["Date"])
+        return self.append(ticker, df["Date"].values, df["Close"].to_numpy(dtype=np.float64))
+
+
+async def fetch_daily_history(
+    client,
+    symbol: str,
+    since: Optional[np.datetime64] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Daily adjusted (dates, closes) for ``symbol`` from Yahoo, starting at
+    ``since`` (inclusive, so the last stored bar can be checked for a
+    re-based series). ``client`` is an ``httpx.AsyncClient`` or the
+    ``FetchScheduler``.
+    """
+    params = {"interval": "1d", "events": "history"}
+    if since is None:
+        params["range"] = "max"
+    else:
+        params["period1"] = int(since.astype("datetime64[s]").astype(np.int64))
+        params["period2"] = int(np.datetime64("now", "s").astype(np.int64))
+
+    response = await client.get(yahoo_chart_url(symbol), params=params, headers=YAHOO_HEADERS)
+    if response.status_code != 200:
+        raise httpx.HTTPStatusError(
+            f"HTTP {response.status_code} for {symbol}", request=response.request, response=response
+        )
+    result = (response.json().get("chart", {}).get("result") or [None])[0]
+    if not result or not result.get("timestamp"):
+        return np.empty(0, dtype="datetime64[D]"), np.empty(0)
+
+    # Shift to exchange-local time so each bar lands on its trading date
+    offset = int(result.get("meta", {}).get("gmtoffset") or 0)
+    timestamps = np.asarray(result["timestamp"], dtype=np.int64) + offset
+    quote_block = result.get("indicators", {})
+    adj = (quote_block.get("adjclose") or [{}])[0].get("adjclose")
+    raw = adj if adj is not None else (quote_block.get("quote") or [{}])[0].get("close", [])
+    closes = np.array([np.nan if v is None else v for v in raw], dtype=np.float64)
+    dates = timestamps.astype("datetime64[s]").astype("datetime64[D]")
+    # Today's bar is still forming; only completed sessions are stored
+    complete = dates < np.datetime64("today", "D")
+    return dates[complete], closes[complete]
+
+
+def is_rebased(store: PriceStore, symbol: str, dates: np.ndarray, closes: np.ndarray) -> bool:
+    """Whether fresh bars disagree with the last stored close (Yahoo re-adjusted the history)"""
+    last = store.last_date(symbol)
+    if last is None:
+        return False
+    match = np.flatnonzero(dates == last)
+    if len(match) == 0:
+        return False
+    stored = float(store.read(symbol, start=last)[1][-1])
+    return abs(closes[match[-1]] / stored - 1.0) > REBASE_TOLERANCE
+
+
+async def sync_price_history(store: PriceStore, symbols: Iterable[str], client=None) -> Dict[str, int]:
+    """
+    Append new daily bars for each symbol, or refetch and rewrite a symbol's
+    whole history when its adjusted closes were re-based; returns bars
+    written per symbol. Symbols are fetched concurrently through the
+    rate-limited fetch scheduler unless ``client`` is given.
+    """
+    client = client or get_fetch_scheduler()
+
+    async def sync_one(symbol: str) -> int:
+        try:
+            dates, closes = await fetch_daily_history(client, symbol, store.last_date(symbol))
+            if is_rebased(store, symbol, dates, closes):
+                print(f"✓ Adjusted history for {symbol} was re-based; rewriting it")
+                dates, closes = await fetch_daily_history(client, symbol)
+                return await asyncio.to_thread(store.replace, symbol, dates, closes)
+            return await asyncio.to_thread(store.append, symbol, dates, closes)
+        except Exception as e:
+            print(f"⚠ Price history sync failed for {symbol}: {e}")
+            return 0
+
+    symbols = list(symbols)
+    counts = await asyncio.gather(*(sync_one(symbol) for symbol in symbols))
+    return dict(zip(symbols, counts))
+
+
+_store: Optional[PriceStore] = None
+
+
+def get_price_store() -> PriceStore:
+    global _store
+    if _store is None:
+        _store = PriceStore(settings.price_history_dir)
+    return _store
@@ -0,0 +1,127 @@
+"""
+Rankings Index
+==============
+Compact, dict-backed view of the hybrid scorer rankings (``ranked_df``).
+Built once per rankings version so allocation lookups are O(1) per asset
+class instead of boolean masks over the DataFrame. The DataFrame form is
+kept only as an export format (``to_frame``).
+"""
+
+import hashlib
+import json
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import pandas as pd
+
+
+class RankRecord:
+    """Rank and hybrid score for one asset class"""
+    __slots__ = ('asset_class', 'hybrid_score', 'rank')
+
+    def __init__(self, asset_class: str, hybrid_score: float, rank: int):
+        self.asset_class = asset_class
+        self.hybrid_score = hybrid_score
+        self.rank = rank
+
+    def __repr__(self) -> str:
+        return f"RankRecord({self.asset_class!r}, hybrid_score={self.hybrid_score}, rank={self.rank})"
+
+
+class RankingsIndex:
+    """
+    Rankings keyed by asset class, preserving the source row order.
+
+    When an asset class appears more than once in the source, the first row
+    wins (matching the previous ``row.iloc[0]`` lookups).
+    """
+    __slots__ = ('_records',)
+
+    def __init__(self, records: Iterable[RankRecord]):
+        by_asset: Dict[str, RankRecord] = {}
+        for record in records:
+            by_asset.setdefault(record.asset_class, record)
+        self._records = by_asset
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "RankingsIndex":
+        """Build from a ``ranked_df``-style DataFrame (asset_class, hybrid_score, rank)"""
+        return cls(
+            RankRecord(str(asset), float(score), int(rank))
+            for asset, score, rank in zip(
+                df['asset_class'].tolist(),
+                df['hybrid_score'].tolist(),
+                df['rank'].tolist(),
+            )
+        )
+
+    @classmethod
+    def from_array(cls, array) -> "RankingsIndex":
+        """Build from a structured array with asset_class, hybrid_score and rank fields"""
+        return cls(
+            RankRecord(str(asset), float(score), int(rank))
+            for asset, score, rank in zip(
+                array['asset_class'].tolist(),
+                array['hybrid_score'].tolist(),
+                array['rank'].tolist(),
+            )
+        )
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[RankRecord]:
+        return iter(self._records.values())
+
+    def __contains__(self, asset_class: str) -> bool:
+        return asset_class in self._records
+
+    def get(self, asset_class: str) -> Optional[RankRecord]:
+        return self._records.get(asset_class)
+
+    def rank(self, asset_class: str) -> Optional[int]:
+        record = self._records.get(asset_class)
+        return record.rank if record is not None else None
+
+    def score(self, asset_class: str) -> Optional[float]:
+        record = self._records.get(asset_class)
+        return record.hybrid_score if record is not None else None
+
+    def subset(self, asset_classes: Sequence[str]) -> List[RankRecord]:
+        """Records for the given asset classes that are ranked, in rankings order"""
+        wanted = set(asset_classes)
+        return [r for r in self._records.values() if r.asset_class in wanted]
+
+    def score_weights(self, asset_classes: Sequence[str]) -> Dict[str, float]:
+        """Hybrid-score-proportional weights over the ranked subset of ``asset_classes``"""
+        records = self.subset(asset_classes)
+        total = sum(r.hybrid_score for r in records)
+        if total == 0:
+            return {}
+        return {r.asset_class: r.hybrid_score / total for r in records}
+
+    def to_records(self) -> List[Dict]:
+        """Plain dicts in rankings order (for JSON / Mongo)"""
+        return [
+            {'asset_class': r.asset_class, 'hybrid_score': r.hybrid_score, 'rank': r.rank}
+            for r in self._records.values()
+        ]
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> "RankingsIndex":
+        return cls(
+            RankRecord(str(r['asset_class']), float(r['hybrid_score']), int(r['rank']))
+            for r in records
+        )
+
+    def content_hash(self) -> str:
+        """SHA-256 of the canonical JSON records; identical rankings share a version"""
+        payload = json.dumps(self.to_records(), sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def to_frame(self) -> pd.DataFrame:
+        """Export as a ``ranked_df``-style DataFrame"""
+        return pd.DataFrame({
+            'asset_class': [r.asset_class for r in self._records.values()],
+            'hybrid_score': [r.hybrid_score for r in self._records.values()],
+            'rank': [r.rank for r in self._records.values()],
+        })
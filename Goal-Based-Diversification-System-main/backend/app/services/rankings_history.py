@@ -0,0 +1,176 @@
+"""
+Rankings History
+================
+Every rankings version is persisted once to the ``rankings_snapshots``
+collection, keyed by its content hash:
+
+    {_id: <sha256>, source, activated_at, records: [{asset_class, hybrid_score, rank}]}
+
+and every time the scorer registry makes a version active (including a
+version becoming active again) an entry is appended to
+``rankings_activations``:
+
+    {version, source, activated_at}
+
+User input documents store the ``rankings_version`` they were computed
+with, so the exact rankings behind a goal can be looked up later by
+version; the activations answer which version was active at a point in
+time. Snapshots are immutable, so recently used ones are served from an
+in-memory LRU.
+"""
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Set
+
+from app.services.rankings import RankingsIndex
+
+COLLECTION = "rankings_snapshots"
+ACTIVATIONS_COLLECTION = "rankings_activations"
+DEFAULT_CACHE_SIZE = 128
+
+
+@dataclass(frozen=True)
+class RankingsSnapshot:
+    version: str
+    source: str
+    activated_at: datetime
+    rankings: RankingsIndex
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "source": self.source,
+            "activated_at": self.activated_at,
+            "rankings": self.rankings.to_records(),
+        }
+
+
+def _from_doc(doc: dict) -> RankingsSnapshot:
+    return RankingsSnapshot(
+        version=doc["_id"],
+        source=doc.get("source", "scorer"),
+        activated_at=doc["activated_at"],
+        rankings=RankingsIndex.from_records(doc["records"]),
+    )
+
+
+class RankingsHistory:
+    """Write-once snapshot store with an LRU of recently read versions"""
+
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, RankingsSnapshot]" = OrderedDict()
+        self._persisted: Set[str] = set()
+        self._indexed = False
+        self._record_lock = asyncio.Lock()
+
+    def _remember(self, snapshot: RankingsSnapshot) -> RankingsSnapshot:
+        self._cache[snapshot.version] = snapshot
+        self._cache.move_to_end(snapshot.version)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return snapshot
+
+    async def ensure_indexes(self, db) -> None:
+        if not self._indexed:
+            await db[COLLECTION].create_index("activated_at")
+            await db[ACTIVATIONS_COLLECTION].create_index("activated_at")
+            self._indexed = True
+
+    async def record(self, db, rankings: RankingsIndex, source: str, activated_at: datetime) -> str:
+        """
+        Persist ``rankings`` if this version has not been stored yet; returns
+        the version. Only the first write of a version sticks, so the
+        snapshot's ``activated_at`` is when it was first recorded.
+        """
+        version = rankings.content_hash()
+        if version in self._persisted:
+            return version
+        await self.ensure_indexes(db)
+        await db[COLLECTION].update_one(
+            {"_id": version},
+            {"$setOnInsert": {
+                "source": source,
+                "activated_at": activated_at,
+                "records": rankings.to_records(),
+            }},
+            upsert=True,
+        )
+        self._persisted.add(version)
+        return version
+
+    async def record_activations(self, db, registry) -> int:
+        """
+        Persist the activations queued by ``registry``; returns how many were
+        written. Serialized, so a caller returns only after earlier queued
+        activations are stored.
+        """
+        async with self._record_lock:
+            pending = registry.drain_activations()
+            for i, activation in enumerate(pending):
+                try:
+                    await self.record(db, activation.rankings, activation.source, activation.activated_at)
+                    await db[ACTIVATIONS_COLLECTION].insert_one({
+                        "version": activation.version,
+                        "source": activation.source,
+                        "activated_at": activation.activated_at,
+                    })
+                except Exception:
+                    registry.requeue_activations(pending[i:])
+                    raise
+            return len(pending)
+
+    async def record_active(self, db, snap) -> Optional[str]:
+        """Persist the rankings of a ``ScorerSnapshot`` (None without rankings)"""
+        rankings = snap.allocator.rankings_index
+        if rankings is None:
+            return None
+        return await self.record(db, rankings, snap.rankings_source, snap.rankings_since or snap.loaded_at)
+
+    async def get(self, db, version: str) -> Optional[RankingsSnapshot]:
+        """Snapshot by version (content hash)"""
+        cached = self._cache.get(version)
+        if cached is not None:
+            self._cache.move_to_end(version)
+            return cached
+        doc = await db[COLLECTION].find_one({"_id": version})
+        if doc is None:
+            return None
+        self._persisted.add(version)
+        return self._remember(_from_doc(doc))
+
+    async def as_of(self, db, timestamp: datetime) -> Optional[RankingsSnapshot]:
+        """
+        Snapshot that was active at ``timestamp`` (the latest activation at or
+        before it; snapshots recorded before activations were tracked fall
+        back to their first ``activated_at``)
+        """
+        cursor = (
+            db[ACTIVATIONS_COLLECTION]
+            .find({"activated_at": {"$lte": timestamp}}, {"version": 1})
+            .sort("activated_at", -1)
+            .limit(1)
+        )
+        docs = await cursor.to_list(length=1)
+        if docs:
+            return await self.get(db, docs[0]["version"])
+        cursor = (
+            db[COLLECTION]
+            .find({"activated_at": {"$lte": timestamp}}, {"_id": 1})
+            .sort("activated_at", -1)
+            .limit(1)
+        )
+        docs = await cursor.to_list(length=1)
+        if not docs:
+            return None
+        return await self.get(db, docs[0]["_id"])
+
+
+_history = RankingsHistory()
+
+
+def get_rankings_history() -> RankingsHistory:
+    return _history
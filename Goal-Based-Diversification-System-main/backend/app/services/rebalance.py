@@ -0,0 +1,227 @@
+"""
+Batch Rebalancing
+=================
+Drift detection and trade lists for many portfolios at once. Holdings,
+targets and new SIP cash are (portfolios x 6 asset classes) matrices, and
+every step is a NumPy operation over the whole matrix.
+
+Per portfolio:
+1. New SIP cash is spent first, split across underweight asset classes in
+   proportion to their shortfall (never overshooting a target).
+2. If some weight is still more than ``band`` away from target, the
+   portfolio is traded back to its target weights. Selling only the
+   overweight excess is the minimum turnover that reaches the targets.
+
+``run_rebalance`` streams holdings from Mongo in chunks and writes the
+resulting orders back with unordered bulk inserts.
+"""
+
+import asyncio
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from pymongo import InsertOne
+
+from app.services.allocation import (
+    ASSET_CLASSES,
+    PortfolioAllocationSystem,
+    horizon_bucket_index,
+    risk_profile_index,
+)
+
+HOLDINGS_COLLECTION = "portfolio_holdings"
+ORDERS_COLLECTION = "rebalance_orders"
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+@dataclass(frozen=True)
+class RebalancePlan:
+    """Per-portfolio results; ``trades`` is (P, 6), positive = buy"""
+    trades: np.ndarray
+    drift: np.ndarray
+    drift_after_cash: np.ndarray
+    rebalanced: np.ndarray
+    turnover: np.ndarray
+
+
+def _max_drift(holdings: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    total = holdings.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weights = np.where(total > 0, holdings / total, 0.0)
+    return np.abs(weights - targets).max(axis=1)
+
+
+def plan_rebalance(
+    holdings: np.ndarray,
+    targets: np.ndarray,
+    cash: Optional[np.ndarray] = None,
+    band: float = 0.05,
+) -> RebalancePlan:
+    """
+    Trades for every portfolio.
+
+    Parameters:
+    -----------
+    holdings : np.ndarray
+        Current value per asset class, shape (P, N)
+    targets : np.ndarray
+        Target weights per portfolio, shape (P, N), rows summing to 1
+    cash : np.ndarray, optional
+        New cash to invest per portfolio (e.g. this month's SIP), shape (P,)
+    band : float
+        Absolute weight tolerance (0.05 = 5 points) before selling to rebalance
+    """
+    holdings = np.asarray(holdings, dtype=np.float64)
+    targets = np.asarray(targets, dtype=np.float64)
+    cash = np.zeros(len(holdings)) if cash is None else np.asarray(cash, dtype=np.float64)
+
+    total = holdings.sum(axis=1) + cash
+    shortfall = targets * total[:, None] - holdings
+    underweight = np.maximum(shortfall, 0.0)
+    # sum(shortfall) == cash, so sum(underweight) >= cash and no buy overshoots
+    underweight_total = underweight.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cash_buys = np.where(underweight_total > 0, underweight * (cash[:, None] / underweight_total), 0.0)
+
+    drift_after_cash = _max_drift(holdings + cash_buys, targets)
+    rebalanced = drift_after_cash > band
+    trades = np.where(rebalanced[:, None], shortfall, cash_buys)
+
+    return RebalancePlan(
+        trades=trades,
+        drift=_max_drift(holdings, targets),
+        drift_after_cash=drift_after_cash,
+        rebalanced=rebalanced,
+        turnover=np.abs(trades).sum(axis=1),
+    )
+
+
+def apply_min_trade(trades: np.ndarray, cash: np.ndarray, min_trade: float) -> np.ndarray:
+    """
+    Drop trades smaller than ``min_trade`` while keeping every portfolio
+    funded: buys are scaled down to the new cash plus the sells that remain,
+    and buys that fall below ``min_trade`` after scaling are dropped in turn
+    (their cash stays uninvested).
+    """
+    if min_trade <= 0:
+        return trades
+    sells = np.where(trades <= -min_trade, trades, 0.0)
+    funds = np.asarray(cash, dtype=np.float64) - sells.sum(axis=1)
+    wanted = np.maximum(trades, 0.0)
+    keep = wanted >= min_trade
+    buys = np.where(keep, wanted, 0.0)
+    # Each pass drops at least one buy or changes nothing, so N passes suffice
+    for _ in range(trades.shape[1]):
+        total = np.where(keep, wanted, 0.0).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scale = np.where(total > funds, funds / total, 1.0)
+        buys = np.where(keep, wanted * scale[:, None], 0.0)
+        still = keep & (buys >= min_trade)
+        if np.array_equal(still, keep):
+            break
+        keep = still
+        buys = np.where(keep, buys, 0.0)
+    return sells + buys
+
+
+def plan_trades(
+    holdings: np.ndarray,
+    targets: np.ndarray,
+    cash: Optional[np.ndarray] = None,
+    band: float = 0.05,
+    min_trade: float = 0.0,
+) -> Tuple[RebalancePlan, np.ndarray]:
+    """``plan_rebalance`` and its trades after the ``min_trade`` filter"""
+    cash = np.zeros(len(holdings)) if cash is None else np.asarray(cash, dtype=np.float64)
+    plan = plan_rebalance(holdings, targets, cash, band)
+    return plan, apply_min_trade(plan.trades, cash, min_trade)
+
+
+def target_weights(allocator: PortfolioAllocationSystem, horizons, risk_profiles) -> np.ndarray:
+    """(P, 6) ``construct_portfolio`` weights for each portfolio's horizon and risk profile"""
+    weights, _, _ = allocator.allocation_arrays()
+    return weights[horizon_bucket_index(np.asarray(horizons)), risk_profile_index(risk_profiles)]
+
+
+def _order_docs(
+    ids: List,
+    plan: RebalancePlan,
+    trades: np.ndarray,
+    run_id: str,
+    run_at: datetime,
+) -> List[InsertOne]:
+    """Insert operations for portfolios that have at least one trade"""
+    active = np.flatnonzero(np.any(trades != 0, axis=1))
+    ops = []
+    for i in active.tolist():
+        row = trades[i]
+        ops.append(InsertOne({
+            "portfolio_id": ids[i],
+            "run_id": run_id,
+            "run_at": run_at,
+            "rebalanced": bool(plan.rebalanced[i]),
+            "drift": float(plan.drift[i]),
+            "turnover": float(np.abs(row).sum()),
+            "trades": {ASSET_CLASSES[j]: float(row[j]) for j in np.flatnonzero(row).tolist()},
+        }))
+    return ops
+
+
+def _plan_chunk(
+    allocator: PortfolioAllocationSystem,
+    docs: List[Dict],
+    band: float,
+    min_trade: float,
+) -> Tuple[RebalancePlan, np.ndarray]:
+    """Plan for ``docs`` and its trades after the ``min_trade`` filter"""
+    holdings = np.array([[d["holdings"].get(a, 0.0) for a in ASSET_CLASSES] for d in docs], dtype=np.float64)
+    cash = np.array([d.get("pending_sip", 0.0) for d in docs], dtype=np.float64)
+    targets = target_weights(allocator, [d["horizon"] for d in docs], [d["risk_profile"] for d in docs])
+    return plan_trades(holdings, targets, cash, band, min_trade)
+
+
+async def run_rebalance(
+    db,
+    allocator: PortfolioAllocationSystem,
+    band: float = 0.05,
+    min_trade: float = 0.0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict:
+    """
+    Plan every portfolio in ``portfolio_holdings`` and bulk-insert its orders.
+
+    Holdings documents look like ``{horizon, risk_profile, holdings:
+    {asset_class: value}, pending_sip}``. Orders are written per chunk while
+    the next chunk is read, so memory stays bounded by ``chunk_size``.
+    """
+    run_id = uuid.uuid4().hex
+    run_at = datetime.now(timezone.utc)
+    summary = {"run_id": run_id, "run_at": run_at, "portfolios": 0, "orders": 0, "rebalanced": 0, "turnover": 0.0}
+
+    cursor = db[HOLDINGS_COLLECTION].find(
+        {}, {"horizon": 1, "risk_profile": 1, "holdings": 1, "pending_sip": 1}
+    )
+    pending_write = None
+    while True:
+        docs = await cursor.to_list(length=chunk_size)
+        if not docs:
+            break
+        plan, trades = await asyncio.to_thread(_plan_chunk, allocator, docs, band, min_trade)
+        ops = _order_docs([d["_id"] for d in docs], plan, trades, run_id, run_at)
+        if pending_write is not None:
+            await pending_write
+            pending_write = None
+        if ops:
+            pending_write = asyncio.ensure_future(db[ORDERS_COLLECTION].bulk_write(ops, ordered=False))
+        summary["portfolios"] += len(docs)
+        summary["orders"] += len(ops)
+        summary["rebalanced"] += int(plan.rebalanced.sum())
+        summary["turnover"] += float(np.abs(trades).sum())
+        if len(docs) < chunk_size:
+            break
+    if pending_write is not None:
+        await pending_write
+    return summary
@@ -0,0 +1,258 @@
+"""
+Hybrid Scorer Artifact
+======================
+Versioned, pickle-free export of the trained hybrid scorer. Every export
+is a new version directory; the ``CURRENT`` pointer file names the active
+one:
+
+    <artifact>/CURRENT                  name of the active version
+    <artifact>/<version>/rankings.npy   structured array (asset_class,
+                                        hybrid_score, rank, any other
+                                        numeric ranking columns)
+    <artifact>/<version>/model_<attr>.ubj
+                                        XGBoost native format, one per
+                                        model attribute
+    <artifact>/<version>/metadata.json  format version, content hashes,
+                                        model classes and scalar settings
+
+A version is complete before ``CURRENT`` is atomically replaced to point
+at it, so the artifact directory never disappears or goes half-written
+during a re-export. The previous version is kept for readers still using
+it. Artifacts from before versioning (files directly in ``<artifact>``)
+are still read.
+
+Loading reads the JSON, checks the rankings against their recorded
+sha256 and memory-maps them; models are only deserialized (and xgboost
+imported, their hash checked) on first use.
+
+Export an existing pickle with:
+
+    python -m app.services.scorer_artifact hybrid_scorer.pkl hybrid_scorer
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.services.rankings import RankingsIndex
+
+ARTIFACT_FORMAT_VERSION = 1
+METADATA_FILE = "metadata.json"
+RANKINGS_FILE = "rankings.npy"
+CURRENT_FILE = "CURRENT"
+# Versions kept after an export (the new one plus its predecessor)
+KEEP_VERSIONS = 2
+
+# Attributes probed (in this order) for XGBoost models on the scorer
+MODEL_ATTRIBUTES = ("model", "xgb_model", "ml_model", "booster", "regressor", "classifier")
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _verify(path: Path, expected: Optional[str]) -> None:
+    if expected is not None and _sha256(path) != expected:
+        raise ValueError(f"Scorer artifact file {path.name} does not match its recorded sha256")
+
+
+def artifact_version_dir(path: str) -> Path:
+    """Directory holding the active version's files (``path`` itself for unversioned artifacts)"""
+    root = Path(path)
+    try:
+        name = (root / CURRENT_FILE).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return root
+    return root / name
+
+
+def is_scorer_artifact(path: str) -> bool:
+    return (artifact_version_dir(path) / METADATA_FILE).exists()
+
+
+def _versions(root: Path) -> List[Path]:
+    return sorted(p for p in root.iterdir() if p.is_dir() and p.name.startswith("v") and (p / METADATA_FILE).exists())
+
+
+def _is_xgboost_model(obj: Any) -> bool:
+    return hasattr(obj, "save_model") and type(obj).__module__.split(".")[0] == "xgboost"
+
+
+def _rankings_array(ranked_df) -> np.ndarray:
+    """Structured array from a ``ranked_df`` (asset class plus numeric columns)"""
+    asset_class = ranked_df["asset_class"].astype(str).to_numpy()
+    width = max(1, max((len(a) for a in asset_class), default=1))
+    fields = [("asset_class", f"<U{width}"), ("hybrid_score", "<f8"), ("rank", "<i8")]
+    extra = [
+        c for c in ranked_df.columns
+        if c not in ("asset_class", "hybrid_score", "rank") and ranked_df[c].dtype.kind in "biuf"
+    ]
+    fields += [(str(c), "<f8") for c in extra]
+
+    array = np.empty(len(ranked_df), dtype=fields)
+    array["asset_class"] = asset_class
+    array["hybrid_score"] = ranked_df["hybrid_score"].to_numpy(dtype=np.float64)
+    array["rank"] = ranked_df["rank"].to_numpy(dtype=np.int64)
+    for c in extra:
+        array[str(c)] = ranked_df[c].to_numpy(dtype=np.float64)
+    return array
+
+
+def _scalar_settings(scorer: Any) -> Dict[str, Any]:
+    """JSON-safe scalar attributes of the scorer (weights, lookbacks, ...)"""
+    out = {}
+    for name, value in vars(scorer).items():
+        if name.startswith("_"):
+            continue
+        if isinstance(value, (bool, int, float, str)) or value is None:
+            out[name] = value
+        elif isinstance(value, (list, tuple)) and all(isinstance(v, (bool, int, float, str)) for v in value):
+            out[name] = list(value)
+    return out
+
+
+def export_scorer_artifact(scorer: Any, out_dir: str, model_format: str = "ubj") -> Path:
+    """
+    Write ``scorer`` as a new version of the artifact at ``out_dir`` and
+    return the artifact path.
+
+    The version is assembled in a temp directory, renamed into place and
+    only then made current, so readers never see a half-written export.
+    """
+    if getattr(scorer, "ranked_df", None) is None:
+        raise ValueError("Scorer has no ranked_df to export")
+    if model_format not in ("ubj", "json"):
+        raise ValueError("model_format must be 'ubj' or 'json'")
+
+    target = Path(out_dir)
+    target.mkdir(parents=True, exist_ok=True)
+    version = "v" + datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    staging = target / f".{version}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir()
+
+    np.save(staging / RANKINGS_FILE, _rankings_array(scorer.ranked_df), allow_pickle=False)
+
+    models = {}
+    candidates = list(MODEL_ATTRIBUTES) + [n for n in vars(scorer) if n not in MODEL_ATTRIBUTES]
+    for name in candidates:
+        model = getattr(scorer, name, None)
+        if name in models or not _is_xgboost_model(model):
+            continue
+        filename = f"model_{name}.{model_format}"
+        model.save_model(str(staging / filename))
+        models[name] = {
+            "file": filename,
+            "class": type(model).__name__,
+            "sha256": _sha256(staging / filename),
+        }
+
+    metadata = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "scorer_class": type(scorer).__name__,
+        "rankings": {"file": RANKINGS_FILE, "sha256": _sha256(staging / RANKINGS_FILE)},
+        "models": models,
+        "settings": _scalar_settings(scorer),
+    }
+    with open(staging / METADATA_FILE, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+
+    os.replace(staging, target / version)
+    pointer = target / f".{CURRENT_FILE}.tmp"
+    pointer.write_text(version, encoding="utf-8")
+    os.replace(pointer, target / CURRENT_FILE)
+
+    # Unversioned files from an older export, and versions nobody will load again
+    for name in [METADATA_FILE, RANKINGS_FILE] + [p.name for p in target.glob("model_*")]:
+        (target / name).unlink(missing_ok=True)
+    for old in _versions(target)[:-KEEP_VERSIONS]:
+        shutil.rmtree(old, ignore_errors=True)
+    return target
+
+
+class ScorerArtifact:
+    """
+    Loaded artifact: memory-mapped rankings plus lazily loaded models.
+
+    Exposes ``rankings_index`` for the allocator and ``ranked_df`` for code
+    written against the pickled scorer.
+    """
+
+    def __init__(self, path: Path, metadata: Dict[str, Any], rankings: np.ndarray):
+        self.path = path
+        self.metadata = metadata
+        self.rankings = rankings
+        self.rankings_index = RankingsIndex.from_array(rankings)
+        self._models: Dict[str, Any] = {}
+
+    @property
+    def ranked_df(self):
+        return self.rankings_index.to_frame()
+
+    def load_model(self, name: Optional[str] = None):
+        """Deserialize a model (the first exported one by default), or None"""
+        models = self.metadata.get("models", {})
+        if name is None:
+            name = next(iter(models), None)
+        if name is None or name not in models:
+            return None
+        if name not in self._models:
+            import xgboost as xgb
+            info = models[name]
+            cls = getattr(xgb, info["class"], xgb.Booster)
+            model = cls()
+            _verify(self.path / info["file"], info.get("sha256"))
+            model.load_model(str(self.path / info["file"]))
+            self._models[name] = model
+        return self._models[name]
+
+    @property
+    def model(self):
+        return self.load_model()
+
+
+def load_scorer_artifact(path: str) -> ScorerArtifact:
+    """
+    Load the current version of an artifact written by
+    ``export_scorer_artifact``; raises ValueError if the rankings do not
+    match their recorded hash
+    """
+    root = artifact_version_dir(path)
+    with open(root / METADATA_FILE, encoding="utf-8") as f:
+        metadata = json.load(f)
+    version = metadata.get("format_version")
+    if version != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported scorer artifact format version: {version}")
+    rankings_file = root / metadata["rankings"]["file"]
+    _verify(rankings_file, metadata["rankings"].get("sha256"))
+    rankings = np.load(rankings_file, mmap_mode="r", allow_pickle=False)
+    return ScorerArtifact(root, metadata, rankings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export a pickled hybrid scorer as a scorer artifact")
+    parser.add_argument("pickle_path", help="Pickled scorer (relative paths resolve inside app/services)")
+    parser.add_argument("out_dir", help="Artifact directory to write (relative paths resolve inside app/services)")
+    parser.add_argument("--model-format", choices=("ubj", "json"), default="ubj")
+    args = parser.parse_args()
+
+    from app.services.allocation import load_pickled_scorer, resolve_scorer_path
+    scorer = load_pickled_scorer(str(resolve_scorer_path(args.pickle_path)))
+    out = export_scorer_artifact(scorer, str(resolve_scorer_path(args.out_dir)), args.model_format)
+    print(f"✓ Exported scorer artifact to {out}")
+
+
+if __name__ == "__main__":
+    main()
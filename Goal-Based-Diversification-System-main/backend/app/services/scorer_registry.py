@@ -0,0 +1,323 @@
+"""
+Process-wide Hybrid Scorer Registry
+===================================
+Loads the hybrid scorer once at startup and keeps a single shared
+``PortfolioAllocationSystem`` for all requests. A background task watches the
+scorer file (mtime/size first, content hash to confirm) and atomically swaps in
+a freshly loaded scorer + rankings (and the allocation table compiled from
+them) when it changes, so request handlers never touch the pickle. When an
+exported scorer artifact exists, its current version's ``metadata.json`` is
+the watched file.
+
+Rankings recomputed in-process (see ``factors``) are published with
+``publish_rankings`` and take precedence over the scorer file's rankings,
+including across scorer reloads. Every change of the active rankings is
+queued as a ``RankingsActivation`` for ``rankings_history`` to persist.
+"""
+
+import asyncio
+import hashlib
+import threading
+from collections import deque
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Deque, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.allocation import (
+    PortfolioAllocationSystem,
+    load_scorer,
+    resolve_scorer_path,
+    scorer_source,
+    scorer_watch_file,
+)
+from app.services.allocation_table import AllocationTable
+from app.services.optimizer import get_tactical_optimizer
+from app.services.rankings import RankingsIndex
+
+
+@dataclass(frozen=True)
+class ScorerSnapshot:
+    """Immutable view of the active scorer; replaced as a whole on reload"""
+    allocator: PortfolioAllocationSystem
+    table: AllocationTable
+    version: Optional[str]
+    loaded_at: datetime
+    source_path: str
+    file_stat: Optional[Tuple[float, int]] = None
+    rankings_source: str = "scorer"
+    rankings_version: Optional[str] = None
+    rankings_since: Optional[datetime] = None
+
+
+@dataclass(frozen=True)
+class RankingsActivation:
+    """A rankings version going live (recorded by ``rankings_history``)"""
+    version: str
+    source: str
+    activated_at: datetime
+    rankings: RankingsIndex
+
+
+def _file_stat(path: Path) -> Optional[Tuple[float, int]]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime, st.st_size)
+
+
+def _rankings_version(allocator: PortfolioAllocationSystem) -> Optional[str]:
+    index = allocator.rankings_index
+    return index.content_hash() if index is not None else None
+
+
+def _file_hash(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ScorerRegistry:
+    """
+    Holds the active scorer snapshot and hot-reloads it from disk.
+
+    Readers call ``allocator`` / ``snapshot`` and always see a complete
+    snapshot: the reference is swapped in one assignment after the new scorer
+    has been fully loaded.
+    """
+
+    def __init__(self, scorer_path: str, reload_interval: float = 30.0):
+        self.scorer_path = resolve_scorer_path(scorer_path)
+        self.reload_interval = reload_interval
+        self._snapshot: Optional[ScorerSnapshot] = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self._reload_lock = asyncio.Lock()
+        # Serializes snapshot swaps: rankings and expected returns are
+        # published from worker threads while a reload may be finishing
+        self._swap_lock = threading.Lock()
+        self._published: Optional[Tuple[RankingsIndex, str]] = None
+        self._activations: Deque[RankingsActivation] = deque(maxlen=1000)
+
+    @property
+    def snapshot(self) -> ScorerSnapshot:
+        if self._snapshot is None:
+            raise RuntimeError("Scorer registry not initialized")
+        return self._snapshot
+
+    def _set_snapshot(self, snapshot: ScorerSnapshot) -> None:
+        """Swap in ``snapshot``, queueing an activation when its rankings differ"""
+        previous = self._snapshot
+        self._snapshot = snapshot
+        rankings = snapshot.allocator.rankings_index
+        if rankings is not None and (previous is None or previous.rankings_version != snapshot.rankings_version):
+            self._activations.append(RankingsActivation(
+                version=snapshot.rankings_version,
+                source=snapshot.rankings_source,
+                activated_at=snapshot.rankings_since or snapshot.loaded_at,
+                rankings=rankings,
+            ))
+
+    def drain_activations(self) -> List[RankingsActivation]:
+        """Activations since the last drain, oldest first"""
+        drained = []
+        while self._activations:
+            drained.append(self._activations.popleft())
+        return drained
+
+    def requeue_activations(self, activations: List[RankingsActivation]) -> None:
+        """Put back activations that could not be recorded"""
+        self._activations.extendleft(reversed(activations))
+
+    @property
+    def allocator(self) -> PortfolioAllocationSystem:
+        return self.snapshot.allocator
+
+    @property
+    def table(self) -> AllocationTable:
+        return self.snapshot.table
+
+    def info(self) -> dict:
+        """Active version and load time, for health/diagnostics endpoints"""
+        snap = self.snapshot
+        rankings = snap.allocator.rankings_index
+        return {
+            "version": snap.version,
+            "loaded_at": snap.loaded_at.isoformat(),
+            "source_path": snap.source_path,
+            "has_rankings": rankings is not None,
+            "num_assets": len(rankings) if rankings is not None else 0,
+            "rankings_source": snap.rankings_source,
+            "rankings_version": snap.rankings_version,
+            "tactical_mode": settings.tactical_mode,
+            "risk_model_version": (
+                snap.allocator.tactical_optimizer.risk_model_version
+                if snap.allocator.tactical_optimizer is not None else None
+            ),
+        }
+
+    def _build_snapshot(
+        self,
+        stat: Optional[Tuple[float, int]],
+        published: Optional[Tuple[RankingsIndex, str]] = None,
+    ) -> ScorerSnapshot:
+        """Blocking load of the scorer file into a new snapshot (with ``published`` rankings applied)"""
+        path = self.scorer_path
+        source = scorer_source(str(path))
+        if stat is None:
+            print(f"⚠ Scorer file not found at {path}")
+            print("  → Will use rule-based allocation only")
+            allocator = PortfolioAllocationSystem(
+                scorer_path=str(path),
+                autoload=False,
+                tactical_optimizer=get_tactical_optimizer(),
+            )
+            version = None
+        else:
+            version = _file_hash(scorer_watch_file(str(path)))
+            try:
+                scorer = load_scorer(str(path))
+            except Exception as e:
+                print(f"⚠ Error loading scorer: {e}")
+                raise
+            allocator = PortfolioAllocationSystem(
+                scorer_path=str(path),
+                scorer=scorer,
+                tactical_optimizer=get_tactical_optimizer(),
+            )
+            print(f"✓ Loaded hybrid scorer from {source} (version {version[:12]})")
+        rankings_source = "scorer"
+        if published is not None:
+            rankings, rankings_source = published
+            allocator.set_rankings_index(rankings)
+        now = datetime.now(timezone.utc)
+        return ScorerSnapshot(
+            allocator=allocator,
+            table=AllocationTable.build(allocator),
+            version=version,
+            loaded_at=now,
+            source_path=str(source),
+            file_stat=stat,
+            rankings_source=rankings_source,
+            rankings_version=_rankings_version(allocator),
+            rankings_since=now,
+        )
+
+    def load(self) -> None:
+        """Initial synchronous load; falls back to rule-based only on failure"""
+        stat = _file_stat(scorer_watch_file(str(self.scorer_path)))
+        try:
+            self._set_snapshot(self._build_snapshot(stat, self._published))
+        except Exception:
+            print("  → Will use rule-based allocation only")
+            self._set_snapshot(self._build_snapshot(None, self._published))
+
+    async def reload_if_changed(self) -> bool:
+        """Reload the scorer if the file changed; returns True if swapped"""
+        async with self._reload_lock:
+            current = self.snapshot
+            watch_file = scorer_watch_file(str(self.scorer_path))
+            stat = _file_stat(watch_file)
+            if stat == current.file_stat:
+                return False
+            if stat is not None and current.version is not None:
+                # mtime/size changed, but the content may not have (e.g. touch)
+                digest = await asyncio.to_thread(_file_hash, watch_file)
+                if digest == current.version:
+                    with self._swap_lock:
+                        self._set_snapshot(replace(self.snapshot, file_stat=stat))
+                    return False
+            published = self._published
+            try:
+                new_snapshot = await asyncio.to_thread(self._build_snapshot, stat, published)
+            except Exception:
+                # Keep serving the previous scorer; retry on the next tick
+                print("  → Keeping previously loaded scorer")
+                return False
+            with self._swap_lock:
+                # Rankings published while the scorer was loading win over
+                # the ones the new snapshot was built with
+                if self._published is not published:
+                    new_snapshot = self._with_rankings(new_snapshot, *self._published)
+                self._set_snapshot(new_snapshot)
+            return True
+
+    def refresh_table(self) -> None:
+        """Recompile the allocation table (e.g. after expected returns change)"""
+        with self._swap_lock:
+            current = self.snapshot
+            current.allocator.refresh_expected_returns()
+            self._set_snapshot(replace(current, table=AllocationTable.build(current.allocator)))
+
+    def publish_rankings(self, rankings: RankingsIndex, source: str) -> None:
+        """Serve ``rankings`` instead of the scorer file's, with a rebuilt table"""
+        with self._swap_lock:
+            self._published = (rankings, source)
+            self._set_snapshot(self._with_rankings(self.snapshot, rankings, source))
+
+    @staticmethod
+    def _with_rankings(current: ScorerSnapshot, rankings: RankingsIndex, source: str) -> ScorerSnapshot:
+        allocator = PortfolioAllocationSystem(
+            scorer_path=current.allocator.scorer_path,
+            autoload=False,
+            tactical_optimizer=current.allocator.tactical_optimizer,
+        )
+        allocator.scorer = current.allocator.scorer
+        allocator.set_rankings_index(rankings)
+        return replace(
+            current,
+            allocator=allocator,
+            table=AllocationTable.build(allocator),
+            rankings_source=source,
+            rankings_version=rankings.content_hash(),
+            rankings_since=datetime.now(timezone.utc),
+        )
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await self.reload_if_changed()
+            except Exception as e:
+                print(f"⚠ Scorer reload check failed: {e}")
+
+    def start(self) -> None:
+        if self._watch_task is None and self.reload_interval > 0:
+            self._watch_task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+
+
+_registry: Optional[ScorerRegistry] = None
+
+
+def get_scorer_registry() -> ScorerRegistry:
+    if _registry is None:
+        raise RuntimeError("Scorer registry not initialized")
+    return _registry
+
+
+async def init_scorer_registry() -> ScorerRegistry:
+    global _registry
+    registry = ScorerRegistry(settings.scorer_path, settings.scorer_reload_interval)
+    await asyncio.to_thread(registry.load)
+    registry.start()
+    _registry = registry
+    return registry
+
+
+async def close_scorer_registry() -> None:
+    global _registry
+    if _registry is not None:
+        await _registry.stop()
+    _registry = None
@@ -0,0 +1,230 @@
+"""
+Market Screener
+===============
+Columnar in-memory snapshot of the NSE universe from the symbol master:
+one NumPy array per field (price, change, change %, volume, sector code).
+
+A refresh fetches every symbol through the quote cache on the fetch
+scheduler's low-priority lane, so user-facing quote requests are not queued
+behind it, and swaps in a complete new snapshot, so queries never see
+a half-updated universe and never call upstream. Filters are boolean
+masks; top-k uses ``argpartition`` and sorts only the k selected rows.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.services.market_quotes import get_quote_cache
+from app.services.symbol_master import SymbolMaster, get_symbol_master
+
+SORT_FIELDS = ("changePercent", "change", "price", "volume")
+
+
+@dataclass(frozen=True)
+class ScreenerSnapshot:
+    symbols: np.ndarray        # Yahoo symbols, e.g. "TCS.NS"
+    names: np.ndarray
+    sector_codes: np.ndarray   # index into ``sectors``
+    sectors: List[str]
+    price: np.ndarray          # NaN = no quote yet
+    change: np.ndarray
+    change_pct: np.ndarray
+    volume: np.ndarray
+    as_of: Optional[float]
+
+    def column(self, field: str) -> np.ndarray:
+        return {
+            "changePercent": self.change_pct,
+            "change": self.change,
+            "price": self.price,
+            "volume": self.volume,
+        }[field]
+
+    def rows(self, idx: np.ndarray) -> List[Dict]:
+        return [
+            {
+                "symbol": str(self.symbols[i]),
+                "name": str(self.names[i]),
+                "sector": self.sectors[self.sector_codes[i]],
+                "price": float(self.price[i]),
+                "change": float(self.change[i]),
+                "changePercent": float(self.change_pct[i]),
+                "volume": int(self.volume[i]),
+            }
+            for i in idx.tolist()
+        ]
+
+
+def top_k(values: np.ndarray, k: int, descending: bool = True) -> np.ndarray:
+    """Positions of the k largest (or smallest) values, in sorted order"""
+    if k <= 0 or len(values) == 0:
+        return np.empty(0, dtype=np.int64)
+    keys = -values if descending else values
+    if k < len(keys):
+        part = np.argpartition(keys, k - 1)[:k]
+    else:
+        part = np.arange(len(keys))
+    return part[np.argsort(keys[part], kind="stable")]
+
+
+class Screener:
+    """Holds the current snapshot and answers vectorized queries over it"""
+
+    def __init__(self, master: SymbolMaster):
+        listings = [l for l in master.listings if l.nse]
+        self.sectors = sorted({l.sector or "Other" for l in listings})
+        codes = {s: i for i, s in enumerate(self.sectors)}
+        n = len(listings)
+        self.snapshot = ScreenerSnapshot(
+            symbols=np.array([f"{l.symbol}.NS" for l in listings], dtype=object),
+            names=np.array([l.name for l in listings], dtype=object),
+            sector_codes=np.array([codes[l.sector or "Other"] for l in listings], dtype=np.int32),
+            sectors=self.sectors,
+            price=np.full(n, np.nan),
+            change=np.full(n, np.nan),
+            change_pct=np.full(n, np.nan),
+            volume=np.zeros(n, dtype=np.int64),
+            as_of=None,
+        )
+
+    async def refresh(self) -> int:
+        """Fetch the whole universe and swap in the new snapshot; returns symbols quoted"""
+        snap = self.snapshot
+        cache = get_quote_cache()
+        quotes = await asyncio.gather(*(cache.get_background(s) for s in snap.symbols), return_exceptions=True)
+
+        n = len(quotes)
+        price, change, change_pct = np.full(n, np.nan), np.full(n, np.nan), np.full(n, np.nan)
+        volume = np.zeros(n, dtype=np.int64)
+        for i, q in enumerate(quotes):
+            if isinstance(q, dict) and q.get("price"):
+                price[i], change[i], change_pct[i] = q["price"], q["change"], q["changePercent"]
+                volume[i] = q.get("volume", 0)
+            elif not np.isnan(snap.price[i]):
+                # Keep the last good value when a symbol fails this round
+                price[i], change[i], change_pct[i] = snap.price[i], snap.change[i], snap.change_pct[i]
+                volume[i] = snap.volume[i]
+
+        self.snapshot = ScreenerSnapshot(
+            snap.symbols, snap.names, snap.sector_codes, snap.sectors,
+            price, change, change_pct, volume, time.time(),
+        )
+        return int(np.count_nonzero(~np.isnan(price)))
+
+    def query(
+        self,
+        sectors: Optional[Sequence[str]] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_change: Optional[float] = None,
+        max_change: Optional[float] = None,
+        min_volume: Optional[int] = None,
+        sort: str = "changePercent",
+        descending: bool = True,
+        limit: int = 20,
+    ) -> Dict:
+        """
+        Filter, then top-k by ``sort``.
+
+        Parameters:
+        -----------
+        sectors : list of str, optional
+            Keep only these sectors (unknown names match nothing)
+        min_price, max_price, min_change, max_change, min_volume : optional
+            Inclusive bounds on price, change % and volume
+        sort : str
+            One of ``SORT_FIELDS``
+        descending : bool
+            Largest first (e.g. gainers) or smallest first (losers)
+        limit : int
+            Number of rows returned
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_FIELDS)}")
+        snap = self.snapshot
+        mask = ~np.isnan(snap.price)
+        if sectors:
+            codes = [snap.sectors.index(s) for s in sectors if s in snap.sectors]
+            mask &= np.isin(snap.sector_codes, codes)
+        if min_price is not None:
+            mask &= snap.price >= min_price
+        if max_price is not None:
+            mask &= snap.price <= max_price
+        if min_change is not None:
+            mask &= snap.change_pct >= min_change
+        if max_change is not None:
+            mask &= snap.change_pct <= max_change
+        if min_volume is not None:
+            mask &= snap.volume >= min_volume
+
+        idx = np.flatnonzero(mask)
+        keys = snap.column(sort)[idx].astype(np.float64)
+        chosen = idx[top_k(keys, limit, descending)]
+        return {"matched": int(idx.size), "as_of": snap.as_of, "results": snap.rows(chosen)}
+
+    def movers(self, limit: int = 5) -> Dict:
+        """Top gainers and losers by change %, and per-sector breadth"""
+        snap = self.snapshot
+        idx = np.flatnonzero(~np.isnan(snap.change_pct))
+        pct = snap.change_pct[idx]
+        codes = snap.sector_codes[idx]
+        k = len(snap.sectors)
+
+        count = np.bincount(codes, minlength=k)
+        total = np.bincount(codes, weights=pct, minlength=k)
+        advancers = np.bincount(codes, weights=pct > 0, minlength=k)
+        decliners = np.bincount(codes, weights=pct < 0, minlength=k)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            average = np.where(count > 0, total / count, np.nan)
+        order = [int(i) for i in top_k(np.nan_to_num(average, nan=-np.inf), k) if count[i] > 0]
+
+        return {
+            "as_of": snap.as_of,
+            "gainers": snap.rows(idx[top_k(pct, limit, True)]),
+            "losers": snap.rows(idx[top_k(pct, limit, False)]),
+            "sectors": [
+                {
+                    "sector": snap.sectors[i],
+                    "avgChangePercent": round(float(average[i]), 2),
+                    "advancers": int(advancers[i]),
+                    "decliners": int(decliners[i]),
+                    "count": int(count[i]),
+                }
+                for i in order
+            ],
+        }
+
+
+_screener: Optional[Screener] = None
+
+
+def get_screener() -> Screener:
+    global _screener
+    if _screener is None:
+        _screener = Screener(get_symbol_master())
+    return _screener
+
+
+def reload_screener() -> Screener:
+    """Rebuild the universe from the current symbol master, keeping known quotes"""
+    global _screener
+    old = _screener
+    screener = Screener(get_symbol_master())
+    if old is not None and old.snapshot.as_of is not None:
+        prev, snap = old.snapshot, screener.snapshot
+        index = {s: i for i, s in enumerate(prev.symbols.tolist())}
+        for i, symbol in enumerate(snap.symbols.tolist()):
+            j = index.get(symbol)
+            if j is not None:
+                snap.price[i], snap.change[i], snap.change_pct[i] = prev.price[j], prev.change[j], prev.change_pct[j]
+                snap.volume[i] = prev.volume[j]
+        screener.snapshot = ScreenerSnapshot(
+            snap.symbols, snap.names, snap.sector_codes, snap.sectors,
+            snap.price, snap.change, snap.change_pct, snap.volume, prev.as_of,
+        )
+    _screener = screener
+    return screener
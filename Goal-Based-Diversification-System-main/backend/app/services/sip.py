@@ -1,5 +1,7 @@
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
 import math
+import numpy as np
 
 
 DEFAULT_RETURN_EQUITY = 0.12
@@ -8,17 +10,39 @@ DEFAULT_RETURN_DEBT = 0.07
 DEFAULT_RETURN_ALTS = (0.08 + 0.05) / 2
 
 
+# Data-driven sleeve returns (equity/debt/alts) published by the return
+# estimator; None while the defaults above are in use.
+_sleeve_returns: Optional[Dict[str, float]] = None
+_sleeve_returns_as_of: Optional[str] = None
+
+
+def set_sleeve_returns(returns: Optional[Dict[str, float]], as_of: Optional[str] = None) -> None:
+    """Install (or clear, with None) the cached data-driven sleeve returns"""
+    global _sleeve_returns, _sleeve_returns_as_of
+    _sleeve_returns = dict(returns) if returns is not None else None
+    _sleeve_returns_as_of = as_of if returns is not None else None
+
+
+def return_basis() -> str:
+    """Human-readable description of the returns behind ``estimate_portfolio_return``"""
+    if _sleeve_returns is None:
+        return "Fallback default annual returns used until data-driven estimates are enabled."
+    return f"Data-driven annual returns estimated from local price history (as of {_sleeve_returns_as_of})."
+
+
 def estimate_portfolio_return(allocation: Dict[str, float]) -> float:
     """
-    Estimate annual expected portfolio return using default fallbacks.
+    Estimate annual expected portfolio return from the cached data-driven
+    estimates, using default fallbacks until they are available.
     """
+    returns = _sleeve_returns or {}
     equity = allocation.get("equity", 0.0)
     debt = allocation.get("debt", 0.0)
     alts = allocation.get("alts", 0.0)
     expected = (
-        equity * DEFAULT_RETURN_EQUITY +
-        debt * DEFAULT_RETURN_DEBT +
-        alts * DEFAULT_RETURN_ALTS
+        equity * returns.get("equity", DEFAULT_RETURN_EQUITY) +
+        debt * returns.get("debt", DEFAULT_RETURN_DEBT) +
+        alts * returns.get("alts", DEFAULT_RETURN_ALTS)
     )
     return expected
 
@@ -45,3 +69,73 @@ def calculate_monthly_sip(target_corpus: int, horizon_years: int, annual_return:
     return rounded
 
 
+def calculate_monthly_sip_batch(target_corpus, horizon_years, annual_return) -> np.ndarray:
+    """
+    Vectorized ``calculate_monthly_sip`` over arrays of goals.
+    Returns an int64 array of SIPs rounded to nearest 100 (0 where undefined).
+    """
+    target = np.asarray(target_corpus, dtype=np.float64)
+    months = np.asarray(horizon_years, dtype=np.float64) * 12
+    monthly_rate = np.asarray(annual_return, dtype=np.float64) / 12.0
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        denominator = (1.0 + monthly_rate) ** months - 1.0
+        valid = (monthly_rate > 0) & (months > 0) & (denominator > 0)
+        p = np.where(valid, target * monthly_rate / denominator, 0.0)
+    return (100 * np.round(p / 100.0)).astype(np.int64)
+
+
+@lru_cache(maxsize=64)
+def _annuity_denominators(annual_returns: Tuple[float, ...], max_years: int) -> np.ndarray:
+    """
+    (1 + r)^n - 1 with r = annual / 12 and n = 12..12*max_years months, per
+    annual rate. Shape (len(rates), max_years); NaN where the SIP is
+    undefined (rate <= 0). Read-only (shared by callers).
+    """
+    monthly_rate = np.asarray(annual_returns, dtype=np.float64)[:, None] / 12.0
+    months = np.arange(1, max_years + 1, dtype=np.float64)[None, :] * 12
+    with np.errstate(over="ignore"):
+        denominators = (1.0 + monthly_rate) ** months - 1.0
+    denominators = np.where((monthly_rate > 0) & (denominators > 0), denominators, np.nan)
+    denominators.setflags(write=False)
+    return denominators
+
+
+def sip_surface(
+    target_corpus: float,
+    base_returns: np.ndarray,
+    return_shifts: Sequence[float],
+) -> Dict[str, np.ndarray]:
+    """
+    Monthly SIP, total invested and wealth multiple over a full
+    (horizon x risk profile x return assumption) grid in one NumPy pass.
+
+    ``base_returns`` has shape (horizons, profiles) for horizons 1..H years;
+    each return assumption adds a shift to it. SIPs use the same arithmetic
+    as ``calculate_monthly_sip`` and are rounded to the nearest 100.
+    """
+    base = np.asarray(base_returns, dtype=np.float64)
+    shifts = np.asarray(return_shifts, dtype=np.float64)
+    max_years = base.shape[0]
+    annual = base[:, :, None] + shifts[None, None, :]
+
+    # Denominators are cached per distinct rate set; the grid has few
+    # distinct rates (one per strategic bucket x profile x shift).
+    rates, inverse = np.unique(annual, return_inverse=True)
+    denominators = _annuity_denominators(tuple(rates.tolist()), max_years)
+    horizon_idx = np.broadcast_to(np.arange(max_years)[:, None, None], annual.shape)
+    denominator = denominators[inverse.reshape(annual.shape), horizon_idx]
+
+    with np.errstate(invalid="ignore"):
+        raw = np.where(np.isnan(denominator), 0.0, target_corpus * (annual / 12.0) / denominator)
+    monthly_sip = (100 * np.round(raw / 100.0)).astype(np.int64)
+    years = np.arange(1, max_years + 1)[:, None, None]
+    total_invested = monthly_sip * 12 * years
+    with np.errstate(divide="ignore", invalid="ignore"):
+        wealth_multiple = np.where(total_invested > 0, target_corpus / total_invested, 0.0)
+    return {
+        "expected_return": annual,
+        "monthly_sip": monthly_sip,
+        "total_invested": total_invested,
+        "wealth_multiple": wealth_multiple,
+    }
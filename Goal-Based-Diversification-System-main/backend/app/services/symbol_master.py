@@ -0,0 +1,254 @@
+"""
+Symbol Master
+=============
+Local list of listed Indian equities and ETFs (``symbol_master.csv``:
+symbol, name, sector, nse, bse) used to resolve exchange suffixes and to
+autocomplete symbols without any network call.
+
+Autocomplete uses a sorted key array searched with ``bisect``: every
+symbol and every word of the company name is a key, so a prefix query is
+one binary search plus a scan over the matching run.
+
+The bundled file covers only the large and mid caps (about 200 rows) and
+is a read-only seed. To load the full NSE list (about 2000 equities), merge
+NSE's ``EQUITY_L.csv`` into it; sectors of known symbols are kept:
+
+    python -m app.services.symbol_master --download    # fetch it from NSE
+    python -m app.services.symbol_master EQUITY_L.csv  # or a local copy
+
+The merged master is written to ``SYMBOL_MASTER_DATA_DIR`` and loaded
+instead of the bundled file once it exists. With
+``SYMBOL_MASTER_AUTO_UPDATE=true`` the app downloads and merges the list at
+startup.
+"""
+
+import argparse
+import asyncio
+import csv
+import os
+import re
+import tempfile
+from bisect import bisect_left
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+
+SERVICES_DIR = Path(__file__).resolve().parent
+DEFAULT_SYMBOL_MASTER = "symbol_master.csv"
+FIELDS = ("symbol", "name", "sector", "nse", "bse")
+EXCHANGE_SUFFIXES = {".NS": "NSE", ".BO": "BSE"}
+NSE_EQUITY_LIST_URL = "https://archives.nseindia.com/content/equities/EQUITY_L.csv"
+NSE_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "text/csv",
+}
+
+
+@dataclass(frozen=True)
+class Listing:
+    symbol: str
+    name: str
+    sector: str
+    nse: bool
+    bse: bool
+
+    @property
+    def exchanges(self) -> List[str]:
+        return [e for e, listed in (("NSE", self.nse), ("BSE", self.bse)) if listed]
+
+    def to_dict(self) -> dict:
+        return {"symbol": self.symbol, "name": self.name, "sector": self.sector, "exchanges": self.exchanges}
+
+
+def _words(name: str) -> List[str]:
+    return [w for w in re.split(r"[^A-Z0-9&]+", name.upper()) if w]
+
+
+class SymbolMaster:
+    """Symbol lookup and prefix index over a list of listings"""
+
+    def __init__(self, listings: List[Listing]):
+        self.listings = listings
+        self._by_symbol: Dict[str, int] = {l.symbol: i for i, l in enumerate(listings)}
+        # (key, is_name_word, row): symbol keys sort before name words with the same text
+        entries: List[Tuple[str, int, int]] = []
+        for i, listing in enumerate(listings):
+            entries.append((listing.symbol, 0, i))
+            entries.extend((word, 1, i) for word in set(_words(listing.name)) if word != listing.symbol)
+        entries.sort()
+        self._keys = [e[0] for e in entries]
+        self._entries = entries
+
+    @classmethod
+    def from_csv(cls, path: str) -> "SymbolMaster":
+        with open(path, newline="", encoding="utf-8") as f:
+            listings = [
+                Listing(
+                    symbol=row["symbol"].strip().upper(),
+                    name=row["name"].strip(),
+                    sector=(row.get("sector") or "").strip(),
+                    nse=row.get("nse", "1").strip() == "1",
+                    bse=row.get("bse", "0").strip() == "1",
+                )
+                for row in csv.DictReader(f)
+                if row.get("symbol")
+            ]
+        return cls(listings)
+
+    def __len__(self) -> int:
+        return len(self.listings)
+
+    def lookup(self, symbol: str) -> Optional[Listing]:
+        i = self._by_symbol.get(symbol.strip().upper())
+        return None if i is None else self.listings[i]
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Listing]:
+        """
+        Listings whose symbol or a name word starts with ``prefix``: exact
+        symbol first, then symbol matches, then name matches (shortest key
+        first within each group)
+        """
+        prefix = prefix.strip().upper()
+        if not prefix:
+            return []
+        start = bisect_left(self._keys, prefix)
+        matches = []
+        for key, is_name, row in self._entries[start:]:
+            if not key.startswith(prefix):
+                break
+            matches.append((key != prefix or is_name, is_name, len(key), row))
+        matches.sort()
+
+        seen, out = set(), []
+        for *_, row in matches:
+            if row not in seen:
+                seen.add(row)
+                out.append(self.listings[row])
+                if len(out) >= limit:
+                    break
+        return out
+
+    def resolve(self, symbol: str) -> Tuple[str, List[str]]:
+        """
+        (base symbol, candidate Yahoo symbols). A known listing maps to its
+        primary exchange (NSE before BSE); an explicit ``.NS``/``.BO`` suffix
+        is kept; an unknown symbol is ambiguous and gets both.
+        """
+        symbol = symbol.strip().upper()
+        for suffix in EXCHANGE_SUFFIXES:
+            if symbol.endswith(suffix):
+                return symbol[: -len(suffix)], [symbol]
+        listing = self.lookup(symbol)
+        if listing is not None and (listing.nse or listing.bse):
+            return symbol, [f"{symbol}.NS" if listing.nse else f"{symbol}.BO"]
+        return symbol, [f"{symbol}.NS", f"{symbol}.BO"]
+
+
+def symbol_master_path() -> Path:
+    """Bundled seed master (never written at runtime)"""
+    path = Path(settings.symbol_master_path or DEFAULT_SYMBOL_MASTER)
+    return path if path.is_absolute() else SERVICES_DIR / path
+
+
+def merged_symbol_master_path() -> Path:
+    """Seed master merged with NSE's equity list, under ``SYMBOL_MASTER_DATA_DIR``"""
+    return Path(settings.symbol_master_data_dir) / DEFAULT_SYMBOL_MASTER
+
+
+def active_symbol_master_path() -> Path:
+    merged = merged_symbol_master_path()
+    return merged if merged.exists() else symbol_master_path()
+
+
+_master: Optional[SymbolMaster] = None
+
+
+def get_symbol_master() -> SymbolMaster:
+    global _master
+    if _master is None:
+        path = active_symbol_master_path()
+        try:
+            _master = SymbolMaster.from_csv(str(path))
+        except FileNotFoundError:
+            print(f"⚠ Symbol master not found at {path}; autocomplete disabled")
+            _master = SymbolMaster([])
+    return _master
+
+
+def reload_symbol_master() -> SymbolMaster:
+    global _master
+    _master = None
+    return get_symbol_master()
+
+
+def merge_nse_equity_list(seed_path: Path, equity_list: str, output_path: Path) -> int:
+    """
+    Write ``seed_path`` plus the NSE ``EQUITY_L.csv`` symbols to
+    ``output_path``; returns rows added. The seed is only read, so a fresh
+    list replaces (rather than accumulates on) an earlier merge.
+    """
+    master = SymbolMaster.from_csv(str(seed_path)) if seed_path.exists() else SymbolMaster([])
+    listings = {l.symbol: l for l in master.listings}
+    added = 0
+    with open(equity_list, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            row = {k.strip().upper(): (v or "").strip() for k, v in row.items() if k}
+            symbol = row.get("SYMBOL", "").upper()
+            if not symbol or row.get("SERIES", "EQ") not in ("EQ", "BE"):
+                continue
+            known = listings.get(symbol)
+            if known is None:
+                added += 1
+                listings[symbol] = Listing(symbol, row.get("NAME OF COMPANY", symbol), "", True, False)
+            elif not known.nse:
+                listings[symbol] = Listing(known.symbol, known.name, known.sector, True, known.bse)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output_path.with_name(output_path.name + ".tmp")
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        for l in sorted(listings.values(), key=lambda l: l.symbol):
+            writer.writerow([l.symbol, l.name, l.sector, int(l.nse), int(l.bse)])
+    os.replace(tmp, output_path)
+    return added
+
+
+async def update_symbol_master(client: Optional[httpx.AsyncClient] = None) -> int:
+    """Download NSE's equity list and merge it into the runtime master; returns rows added"""
+    if client is None:
+        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as own:
+            return await update_symbol_master(own)
+    response = await client.get(NSE_EQUITY_LIST_URL, headers=NSE_HEADERS)
+    response.raise_for_status()
+    output = merged_symbol_master_path()
+    output.parent.mkdir(parents=True, exist_ok=True)
+    fd, download = tempfile.mkstemp(prefix="EQUITY_L.", suffix=".download", dir=output.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(response.content)
+        return await asyncio.to_thread(merge_nse_equity_list, symbol_master_path(), download, output)
+    finally:
+        os.unlink(download)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Merge NSE's EQUITY_L.csv into the symbol master")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("equity_list", nargs="?", help="NSE equity list CSV (SYMBOL, NAME OF COMPANY, SERIES, ...)")
+    source.add_argument("--download", action="store_true", help=f"Fetch the list from {NSE_EQUITY_LIST_URL}")
+    args = parser.parse_args()
+    path = merged_symbol_master_path()
+    if args.download:
+        added = asyncio.run(update_symbol_master())
+    else:
+        added = merge_nse_equity_list(symbol_master_path(), args.equity_list, path)
+    print(f"✓ Added {added} symbols to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+HTTP Client Benchmark
+=====================
+Quote latency with a new ``httpx.AsyncClient`` per request (the old
+``fetch_stock_data`` behaviour) versus the shared pooled client from
+``app.core.http_client``, against the local stand-in quote server.
+
+    python -m benchmarks.http_client_bench [--requests 200] [--concurrency 1 10] [--no-tls]
+
+Run from the backend directory. Over TLS every per-request client pays a
+TCP connect plus a TLS handshake; the shared client pays them once per
+pooled connection.
+"""
+
+import argparse
+import asyncio
+import ssl
+import time
+from typing import Callable, Dict, List
+
+import httpx
+import numpy as np
+
+from app.core.http_client import HttpClientMetrics, InstrumentedTransport, create_http_client
+from benchmarks.quote_server import QuoteServer
+
+SYMBOLS = [
+    "^NSEI", "^BSESN", "^NSEBANK", "^CNXIT", "RELIANCE.NS", "TCS.NS", "HDFCBANK.NS",
+    "INFY.NS", "ICICIBANK.NS", "BHARTIARTL.NS", "ITC.NS", "KOTAKBANK.NS", "AXISBANK.NS", "HINDUNILVR.NS",
+]
+QUOTE_PARAMS = {"interval": "1d", "range": "1d"}
+
+
+async def _run(fetch: Callable, urls: List[str], concurrency: int) -> np.ndarray:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = np.empty(len(urls))
+
+    async def one(i: int, url: str) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            response = await fetch(url)
+            response.raise_for_status()
+            latencies[i] = (time.perf_counter() - start) * 1000.0
+
+    await asyncio.gather(*(one(i, url) for i, url in enumerate(urls)))
+    return latencies
+
+
+async def per_request_clients(urls: List[str], concurrency: int, verify) -> Dict:
+    metrics = HttpClientMetrics()
+
+    async def fetch(url: str) -> httpx.Response:
+        transport = InstrumentedTransport(httpx.AsyncHTTPTransport(verify=verify), metrics)
+        async with httpx.AsyncClient(transport=transport, timeout=30.0, follow_redirects=True) as client:
+            return await client.get(url, params=QUOTE_PARAMS)
+
+    start = time.perf_counter()
+    latencies = await _run(fetch, urls, concurrency)
+    return _summary(latencies, time.perf_counter() - start, metrics)
+
+
+async def shared_client(urls: List[str], concurrency: int, verify) -> Dict:
+    metrics = HttpClientMetrics()
+    async with create_http_client(metrics, verify=verify) as client:
+        async def fetch(url: str) -> httpx.Response:
+            return await client.get(url, params=QUOTE_PARAMS)
+
+        start = time.perf_counter()
+        latencies = await _run(fetch, urls, concurrency)
+        return _summary(latencies, time.perf_counter() - start, metrics)
+
+
+def _summary(latencies: np.ndarray, elapsed: float, metrics: HttpClientMetrics) -> Dict:
+    return {
+        "total_s": elapsed,
+        "mean_ms": float(latencies.mean()),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "connections": metrics.connections_opened,
+        "tls_handshakes": metrics.tls_handshakes,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-request vs shared HTTP client quote latency")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="Server-side latency per response")
+    parser.add_argument("--no-tls", action="store_true", help="Plain HTTP (no TLS handshakes)")
+    args = parser.parse_args()
+
+    with QuoteServer(args.port, args.delay_ms, tls=not args.no_tls) as server:
+        verify = ssl.create_default_context(cafile=server.certfile) if server.certfile else True
+        urls = [
+            f"{server.base_url}/v8/finance/chart/{SYMBOLS[i % len(SYMBOLS)]}"
+            for i in range(args.requests)
+        ]
+        print(f"{args.requests} quotes from {server.base_url}")
+        header = f"{'client':<12} {'conc':>4} {'total s':>8} {'mean ms':>8} {'p50 ms':>8} {'p99 ms':>8} {'conns':>6} {'tls':>6}"
+        print(header)
+        print("-" * len(header))
+        for concurrency in args.concurrency:
+            for label, run in (("per-request", per_request_clients), ("shared", shared_client)):
+                r = asyncio.run(run(urls, concurrency, verify))
+                print(
+                    f"{label:<12} {concurrency:>4} {r['total_s']:>8.2f} {r['mean_ms']:>8.2f} "
+                    f"{r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['connections']:>6} {r['tls_handshakes']:>6}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Market Data Benchmark
+=====================
+Latency (p50/p99) and throughput of ``/api/market/indices``, ``/stocks``,
+``/all`` and ``/search/{symbol}`` under concurrent load, fully offline: the
+market router is served by uvicorn with ``YAHOO_BASE_URL`` pointed at the
+stand-in quote server, which can replay a recorded fixture and inject
+latency, 500s and 429s.
+
+    python -m benchmarks.market_bench [--requests 200] [--concurrency 1 16 64]
+        [--endpoints indices stocks all search] [--cold]
+        [--delay-ms 50 --jitter-ms 100 --error-rate 0.05 --throttle-rate 0.02]
+        [--replay fixture.jsonl] [--json results.json]
+
+Run from the backend directory. The stand-in and the app each run in
+their own process, so the load generator does not share a GIL with the
+code being measured. By default quotes are cached as in
+production, so after the first request most runs measure the cache;
+``--cold`` sets every quote TTL to zero so each request goes through the
+fetch scheduler to the stand-in. Other settings (``MARKET_RATE_LIMIT``,
+``MARKET_FETCH_CONCURRENCY``, ``BREAKER_*``, ...) are read from the
+environment as usual. "upstream" is the number of chart requests the
+stand-in received during the run.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+
+from benchmarks.quote_server import add_server_arguments
+
+ENDPOINTS = ("indices", "stocks", "all", "search")
+SEARCH_SYMBOLS = ["TCS", "INFY", "RELIANCE", "HDFCBANK", "ITC", "SBIN", "LT", "WIPRO", "MARUTI", "TITAN"]
+
+
+def app_environment(upstream: str, cold: bool) -> Dict[str, str]:
+    """Environment for the app under test"""
+    env = dict(os.environ, YAHOO_BASE_URL=upstream, MARKET_POLL_INTERVAL="0", SCREENER_REFRESH_MINUTES="0")
+    if cold:
+        for name in ("QUOTE_TTL_OPEN", "QUOTE_TTL_CLOSED", "QUOTE_STALE_GRACE", "QUOTE_NEGATIVE_TTL"):
+            env[name] = "0"
+    return env
+
+
+def create_bench_app() -> FastAPI:
+    """The market router with only the HTTP client lifecycle (no Mongo, no models)"""
+    from app.core.fetch_scheduler import close_fetch_scheduler
+    from app.core.http_client import close_http_client, init_http_client
+    from app.routers import market_data as market_router
+    from app.services.market_quotes import close_quote_cache
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await init_http_client()
+        try:
+            yield
+        finally:
+            close_quote_cache()
+            close_fetch_scheduler()
+            await close_http_client()
+
+    app = FastAPI(title="Market data benchmark", lifespan=lifespan)
+    app.include_router(market_router.router)
+    return app
+
+
+def start_process(args: List[str], port: int, env: Optional[Dict[str, str]] = None, timeout: float = 60.0) -> subprocess.Popen:
+    """Start ``python args...`` and wait until it accepts connections on ``port``"""
+    process = subprocess.Popen([sys.executable, *args], env=env)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{' '.join(args)} exited with code {process.returncode}")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1.0)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"{' '.join(args)} did not start listening on port {port}")
+
+
+def stop_process(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def stub_arguments(args: argparse.Namespace) -> List[str]:
+    """Forward the latency, fault and fixture options to the stand-in"""
+    forwarded = ["-m", "benchmarks.quote_server", "--port", str(args.port)]
+    for name in ("delay_ms", "jitter_ms", "error_rate", "throttle_rate", "retry_after", "replay", "seed"):
+        value = getattr(args, name)
+        if value is not None:
+            forwarded += ["--" + name.replace("_", "-"), str(value)]
+    return forwarded
+
+
+def endpoint_paths(endpoint: str, requests: int) -> List[str]:
+    if endpoint == "search":
+        return [f"/api/market/search/{SEARCH_SYMBOLS[i % len(SEARCH_SYMBOLS)]}" for i in range(requests)]
+    return [f"/api/market/{endpoint}"] * requests
+
+
+async def run_load(client: httpx.AsyncClient, paths: List[str], concurrency: int) -> Dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = np.empty(len(paths))
+    statuses: Dict[int, int] = {}
+
+    async def one(i: int, path: str) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                status = (await client.get(path)).status_code
+            except httpx.HTTPError:
+                status = 0
+            latencies[i] = (time.perf_counter() - start) * 1000.0
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i, path) for i, path in enumerate(paths)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(paths),
+        "total_s": elapsed,
+        "throughput_rps": len(paths) / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "errors": sum(n for status, n in statuses.items() if status != 200),
+        "statuses": {str(status): n for status, n in sorted(statuses.items())},
+    }
+
+
+async def benchmark(app_url: str, stub_url: str, endpoints: List[str], requests: int, concurrency: List[int]) -> List[Dict]:
+    results = []
+    limits = httpx.Limits(max_connections=max(concurrency), max_keepalive_connections=max(concurrency))
+    async with httpx.AsyncClient(base_url=app_url, timeout=60.0, limits=limits) as client, \
+            httpx.AsyncClient(base_url=stub_url) as stub:
+        for endpoint in endpoints:
+            for level in concurrency:
+                before = (await stub.get("/stats")).json()["requests"]
+                result = await run_load(client, endpoint_paths(endpoint, requests), level)
+                result["upstream"] = (await stub.get("/stats")).json()["requests"] - before
+                results.append({"endpoint": endpoint, "concurrency": level, **result})
+                print(
+                    f"{endpoint:<8} {level:>4} {result['total_s']:>8.2f} {result['throughput_rps']:>9.1f} "
+                    f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['errors']:>6} {result['upstream']:>8}"
+                )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline latency and throughput of the market data endpoints")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint and concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument("--cold", action="store_true", help="Disable quote caching so every request goes upstream")
+    parser.add_argument("--port", type=int, default=8765, help="Stand-in quote server port")
+    parser.add_argument("--app-port", type=int, default=8766, help="Port for the app under test")
+    parser.add_argument("--json", help="Also write the results to this file")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    stub_url = f"http://127.0.0.1:{args.port}"
+    app_url = f"http://127.0.0.1:{args.app_port}"
+    stub = start_process(stub_arguments(args), args.port)
+    app = None
+    try:
+        app = start_process(
+            ["-m", "uvicorn", "benchmarks.market_bench:create_bench_app", "--factory",
+             "--host", "127.0.0.1", "--port", str(args.app_port), "--log-level", "warning"],
+            args.app_port,
+            env=app_environment(stub_url, args.cold),
+        )
+        print(f"{args.requests} requests per run, {'cold' if args.cold else 'cached'} quotes, upstream {stub_url}")
+        header = (
+            f"{'endpoint':<8} {'conc':>4} {'total s':>8} {'req/s':>9} "
+            f"{'p50 ms':>8} {'p99 ms':>8} {'errors':>6} {'upstream':>8}"
+        )
+        print(header)
+        print("-" * len(header))
+        results = asyncio.run(benchmark(app_url, stub_url, args.endpoints, args.requests, args.concurrency))
+    finally:
+        if app is not None:
+            stop_process(app)
+        stop_process(stub)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+        print(f"✓ Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+Stand-in Quote Server
+=====================
+Local imitation of Yahoo's ``/v8/finance/chart/{symbol}`` endpoint for
+benchmarks and offline development. ``range=1d`` returns a quote, anything
+else daily history. Responses come from one of:
+
+* synthetic prices (default), deterministic per symbol;
+* a recorded fixture (``--replay fixture.jsonl``);
+* the real upstream, recorded as it passes through
+  (``--upstream https://query1.finance.yahoo.com --record fixture.jsonl``).
+
+Fixtures are JSON Lines, one recorded response per line:
+
+    {"symbol": "^NSEI", "kind": "quote", "status": 200, "body": {"chart": ...}}
+
+``kind`` is "quote" (``range=1d``) or "history". Replay serves the last
+recording for each (symbol, kind) and Yahoo's 404 body for anything not
+recorded. Latency (``--delay-ms``, ``--jitter-ms``), HTTP 500s
+(``--error-rate``) and HTTP 429s with ``Retry-After`` (``--throttle-rate``)
+can be layered on any mode.
+
+    python -m benchmarks.quote_server --port 8765 [--tls] [--delay-ms 20]
+
+Point the backend at it with ``YAHOO_BASE_URL=http://127.0.0.1:8765``
+(``--tls`` uses a throwaway self-signed certificate, so only the
+benchmarks, which trust it explicitly, can talk to it over HTTPS).
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import json
+import random
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import httpx
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import JSONResponse
+
+IST_OFFSET = 19800
+HISTORY_START = np.datetime64("2015-01-01", "D")
+NOT_FOUND = {"chart": {"result": None, "error": {
+    "code": "Not Found", "description": "No data found, symbol may be delisted",
+}}}
+UPSTREAM_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    "Accept": "application/json",
+}
+
+
+@lru_cache(maxsize=1024)
+def _series(symbol: str, days: int) -> np.ndarray:
+    """Deterministic geometric random walk for ``symbol``"""
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+    start = 100.0 + (zlib.crc32(symbol.encode()) % 2900)
+    return start * np.exp(np.cumsum(rng.normal(0.0004, 0.012, days)))
+
+
+def synthetic_chart(symbol: str, range_: Optional[str], period1: Optional[int], period2: Optional[int]) -> Dict:
+    """Chart body with a synthetic quote (``range=1d``) or weekday history"""
+    today = np.datetime64("today", "D")
+    days = int((today - HISTORY_START).astype(np.int64)) + 1
+    closes = _series(symbol, days)
+    meta = {
+        "symbol": symbol,
+        "currency": "INR",
+        "regularMarketPrice": round(float(closes[-1]), 2),
+        "previousClose": round(float(closes[-2]), 2),
+        "marketState": "REGULAR",
+        "regularMarketVolume": int(zlib.crc32(f"{symbol}{days}".encode()) % 5_000_000),
+        "gmtoffset": IST_OFFSET,
+    }
+    if range_ == "1d":
+        return {"chart": {"result": [{"meta": meta}], "error": None}}
+
+    dates = HISTORY_START + np.arange(days)
+    weekday = (dates.astype(np.int64) + 3) % 7  # 0 = Monday
+    seconds = dates.astype("datetime64[s]").astype(np.int64) + 9 * 3600 + 15 * 60 - IST_OFFSET
+    keep = weekday < 5
+    if period1 is not None:
+        keep &= seconds >= period1
+    if period2 is not None:
+        keep &= seconds <= period2
+    values = np.round(closes[keep], 2).tolist()
+    return {"chart": {"result": [{
+        "meta": meta,
+        "timestamp": seconds[keep].tolist(),
+        "indicators": {"quote": [{"close": values}], "adjclose": [{"adjclose": values}]},
+    }], "error": None}}
+
+
+def load_fixture(path: str) -> Dict[Tuple[str, str], Tuple[int, Dict]]:
+    """{(symbol, kind): (status, body)} from a JSON Lines fixture; later lines win"""
+    responses = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                responses[(record["symbol"], record["kind"])] = (record["status"], record["body"])
+    return responses
+
+
+def create_app(
+    delay_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+    error_rate: float = 0.0,
+    throttle_rate: float = 0.0,
+    retry_after: float = 1.0,
+    replay: Optional[str] = None,
+    record: Optional[str] = None,
+    upstream: Optional[str] = None,
+    seed: Optional[int] = None,
+) -> FastAPI:
+    """
+    Build the stand-in chart server.
+
+    Parameters:
+    -----------
+    delay_ms, jitter_ms : float
+        Latency added to every response: ``delay_ms`` plus uniform [0, jitter_ms)
+    error_rate, throttle_rate : float
+        Fraction of requests answered with HTTP 500 / HTTP 429
+    retry_after : float
+        ``Retry-After`` seconds sent with each 429
+    replay : str, optional
+        Fixture to serve recorded responses from
+    record : str, optional
+        Fixture to append ``upstream`` responses to
+    upstream : str, optional
+        Base URL to forward requests to instead of synthesizing them
+    seed : int, optional
+        Seed for jitter and fault injection, for repeatable runs
+    """
+    if record and not upstream:
+        raise ValueError("record needs an upstream to forward to")
+    fixture = load_fixture(replay) if replay else None
+    rng = random.Random(seed)
+    state: Dict = {"client": None}
+    stats = {"requests": 0, "errors": 0, "throttled": 0, "recorded": 0}
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if upstream:
+            state["client"] = httpx.AsyncClient(timeout=30.0, follow_redirects=True, headers=UPSTREAM_HEADERS)
+        yield
+        if state["client"] is not None:
+            await state["client"].aclose()
+
+    app = FastAPI(title="Stand-in quote server", lifespan=lifespan)
+
+    async def forward(symbol: str, request: Request, kind: str) -> Tuple[int, Dict]:
+        response = await state["client"].get(
+            f"{upstream.rstrip('/')}/v8/finance/chart/{symbol}", params=dict(request.query_params)
+        )
+        try:
+            body = response.json()
+        except ValueError:
+            body = {"chart": {"result": None, "error": {"code": "Bad Response", "description": response.text[:200]}}}
+        if record and response.status_code != 429:
+            with open(record, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"symbol": symbol, "kind": kind, "status": response.status_code, "body": body}) + "\n")
+            stats["recorded"] += 1
+        return response.status_code, body
+
+    @app.get("/v8/finance/chart/{symbol}")
+    async def chart(
+        symbol: str,
+        request: Request,
+        range: Optional[str] = Query(default=None),
+        period1: Optional[int] = Query(default=None),
+        period2: Optional[int] = Query(default=None),
+    ):
+        stats["requests"] += 1
+        latency = delay_ms + (rng.uniform(0.0, jitter_ms) if jitter_ms else 0.0)
+        if latency:
+            await asyncio.sleep(latency / 1000.0)
+        roll = rng.random()
+        if roll < throttle_rate:
+            stats["throttled"] += 1
+            return JSONResponse(
+                {"error": "Too Many Requests"}, status_code=429, headers={"Retry-After": f"{retry_after:g}"}
+            )
+        if roll < throttle_rate + error_rate:
+            stats["errors"] += 1
+            return JSONResponse({"error": "Internal Server Error"}, status_code=500)
+
+        kind = "quote" if range == "1d" else "history"
+        if fixture is not None:
+            status, body = fixture.get((symbol, kind), (404, NOT_FOUND))
+        elif upstream:
+            status, body = await forward(symbol, request, kind)
+        else:
+            status, body = 200, synthetic_chart(symbol, range, period1, period2)
+        return JSONResponse(body, status_code=status)
+
+    @app.get("/stats")
+    async def server_stats():
+        return stats
+
+    return app
+
+
+def self_signed_cert(directory: str) -> Tuple[str, str]:
+    """Write a localhost certificate and key; returns (certfile, keyfile)"""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+    import ipaddress
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = dt.datetime.now(dt.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - dt.timedelta(days=1))
+        .not_valid_after(now + dt.timedelta(days=7))
+        .add_extension(
+            x509.SubjectAlternativeName([
+                x509.DNSName("localhost"),
+                x509.IPAddress(ipaddress.ip_address("127.0.0.1")),
+            ]),
+            critical=False,
+        )
+        .sign(key, hashes.SHA256())
+    )
+    certfile = Path(directory) / "cert.pem"
+    keyfile = Path(directory) / "key.pem"
+    certfile.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    keyfile.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.TraditionalOpenSSL,
+        serialization.NoEncryption(),
+    ))
+    return str(certfile), str(keyfile)
+
+
+class QuoteServer:
+    """Runs the stand-in server on a background thread"""
+
+    def __init__(self, port: int = 8765, delay_ms: float = 0.0, tls: bool = False, app: Optional[FastAPI] = None):
+        self.port = port
+        self._tmp = tempfile.TemporaryDirectory() if tls else None
+        self.certfile, keyfile = self_signed_cert(self._tmp.name) if tls else (None, None)
+        config = uvicorn.Config(
+            app or create_app(delay_ms),
+            host="127.0.0.1",
+            port=port,
+            log_level="warning",
+            ssl_certfile=self.certfile,
+            ssl_keyfile=keyfile,
+        )
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        scheme = "https" if self.certfile else "http"
+        return f"{scheme}://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "QuoteServer":
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.should_exit = True
+        self._thread.join()
+        if self._tmp is not None:
+            self._tmp.cleanup()
+
+
+def add_server_arguments(parser: argparse.ArgumentParser) -> None:
+    """Latency, fault and fixture options shared with the benchmarks"""
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="Added latency per response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Extra uniform random latency per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--replay", help="Serve responses recorded in this JSON Lines fixture")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for jitter and fault injection")
+
+
+def app_from_args(args: argparse.Namespace) -> FastAPI:
+    return create_app(
+        delay_ms=args.delay_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        replay=args.replay,
+        record=getattr(args, "record", None),
+        upstream=getattr(args, "upstream", None),
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stand-in Yahoo chart server")
+    parser.add_argument("--port", type=int, default=8765)
+    add_server_arguments(parser)
+    parser.add_argument("--upstream", help="Forward to this base URL, e.g. https://query1.finance.yahoo.com")
+    parser.add_argument("--record", help="Append forwarded responses to this JSON Lines fixture")
+    parser.add_argument("--tls", action="store_true", help="Serve HTTPS with a self-signed certificate")
+    args = parser.parse_args()
+    if args.record and not args.upstream:
+        parser.error("--record needs --upstream")
+
+    with QuoteServer(args.port, tls=args.tls, app=app_from_args(args)) as server:
+        print(f"✓ Stand-in quote server on {server.base_url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
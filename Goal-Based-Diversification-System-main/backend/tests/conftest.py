@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.allocation import PortfolioAllocationSystem  # noqa: E402
+from app.services.rankings import RankingsIndex, RankRecord  # noqa: E402
+
+SCORES = {
+    "Mid Cap": 71.0,
+    "Large Cap": 64.0,
+    "Gold": 58.5,
+    "Small Cap": 42.0,
+    "Silver": 37.5,
+    "Debt": 30.0,
+}
+
+
+def make_rankings(scores=None) -> RankingsIndex:
+    """Rankings in score order, ranked from 1"""
+    scores = scores or SCORES
+    ordered = sorted(scores.items(), key=lambda item: -item[1])
+    return RankingsIndex(RankRecord(a, s, rank) for rank, (a, s) in enumerate(ordered, start=1))
+
+
+@pytest.fixture
+def rankings() -> RankingsIndex:
+    return make_rankings()
+
+
+@pytest.fixture
+def allocator(rankings, tmp_path) -> PortfolioAllocationSystem:
+    system = PortfolioAllocationSystem(scorer_path=str(tmp_path / "missing.pkl"), autoload=False)
+    system.set_rankings_index(rankings)
+    return system
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from app.services.allocation import ASSET_CLASSES, RISK_PROFILES, PortfolioAllocationSystem
+from app.services.allocation_table import HORIZONS, AllocationTable
+
+
+def _rows(portfolio):
+    return [(r.asset_class, r.category, r.ticker, r.allocation, r.rank, r.score) for r in portfolio]
+
+
+@pytest.mark.parametrize("ranked", [True, False])
+def test_table_matches_construct_portfolio(allocator, tmp_path, ranked):
+    if not ranked:
+        allocator = PortfolioAllocationSystem(scorer_path=str(tmp_path / "missing.pkl"), autoload=False)
+    table = AllocationTable.build(allocator)
+    assert len(table) == len(HORIZONS) * len(RISK_PROFILES)
+    for horizon in HORIZONS:
+        for risk_profile in RISK_PROFILES:
+            expected = allocator.construct_portfolio(horizon, risk_profile, 1_000_000, 10_000)
+            entry = table.get(horizon, risk_profile)
+            assert _rows(entry.portfolio) == pytest.approx(_rows(expected))
+            assert entry.portfolio_table(10_000) == expected.to_records(10_000)
+
+
+def test_batch_weights_match_construct_portfolio(allocator):
+    horizons = np.array([1, 2, 3, 5, 7, 8, 15, 30, 4])
+    profiles = [RISK_PROFILES[i % 3] for i in range(len(horizons))]
+    batch = allocator.construct_portfolio_batch(horizons, profiles, np.full(len(horizons), 1e6))
+    for i, (horizon, risk_profile) in enumerate(zip(horizons.tolist(), profiles)):
+        rows = {r.asset_class: r.allocation for r in allocator.construct_portfolio(horizon, risk_profile, 1e6)}
+        assert [batch[a][i] for a in ASSET_CLASSES] == pytest.approx([rows[a] for a in ASSET_CLASSES])
+        assert sum(batch[a][i] for a in ASSET_CLASSES) == pytest.approx(1.0)
+
+
+def test_unknown_combination_raises(allocator):
+    with pytest.raises(KeyError):
+        AllocationTable.build(allocator).get(31, "Moderate")
+
+
+def test_missing_rankings_warn_once(tmp_path, capsys):
+    allocator = PortfolioAllocationSystem(scorer_path=str(tmp_path / "missing.pkl"), autoload=False)
+    AllocationTable.build(allocator)
+    assert capsys.readouterr().out.count("No rankings available") == 1
+    allocator.allocation_arrays()
+    assert capsys.readouterr().out.count("No rankings available") == 1
@@ -0,0 +1,38 @@
+import json
+
+import numpy as np
+
+from app.services.backtest import backtest_sip, json_columns
+
+
+def test_full_history_statistics_are_finite():
+    rng = np.random.default_rng(3)
+    returns = rng.normal(0.01, 0.04, size=(120, 3))
+    weights = np.array([[0.5, 0.3, 0.2], [0.2, 0.3, 0.5]])
+    outcome = backtest_sip(returns, weights, np.array([1000.0, 2000.0]), np.array([120, 60]))
+    assert outcome.months.tolist() == [120, 60]
+    assert outcome.total_invested.tolist() == [120_000.0, 120_000.0]
+    assert np.all(np.isfinite(outcome.cagr)) and np.all(np.isfinite(outcome.volatility))
+    assert np.all(outcome.max_drawdown <= 0)
+
+
+def test_short_windows_serialize_as_null():
+    returns = np.array([[0.01, 0.02], [0.03, -0.01]])
+    weights = np.array([[0.5, 0.5], [0.5, 0.5]])
+    # One month: no return yet; two months: one return, no volatility
+    outcome = backtest_sip(returns, weights, np.array([100.0, 100.0]), np.array([1, 2]))
+    assert np.isnan(outcome.cagr[0]) and np.isnan(outcome.volatility).all()
+
+    columns = json_columns({
+        "months": outcome.months,
+        "cagr": outcome.cagr,
+        "volatility": outcome.volatility,
+        "risk_profile": np.array(["Moderate", "Aggressive"]),
+        "complete": np.array([True, False]),
+        "ratio": np.array([np.inf, 1.5]),
+    })
+    assert columns["cagr"][0] is None and columns["cagr"][1] is not None
+    assert columns["volatility"] == [None, None]
+    assert columns["ratio"] == [None, 1.5]
+    assert columns["months"] == [1, 2] and columns["complete"] == [True, False]
+    json.dumps(columns, allow_nan=False)
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from app.services.chart_history import lttb, resample_last
+
+
+def reference_lttb(x, y, threshold):
+    """Straightforward LTTB (Steinarsson, 2013)"""
+    n = len(x)
+    every = (n - 2) / (threshold - 2)
+    a, out = 0, [0]
+    for i in range(threshold - 2):
+        start = int(np.floor((i + 1) * every)) + 1
+        end = min(int(np.floor((i + 2) * every)) + 1, n)
+        avg_x = x[start:end].mean() if start < end else x[-1]
+        avg_y = y[start:end].mean() if start < end else y[-1]
+        lo, hi = int(np.floor(i * every)) + 1, int(np.floor((i + 1) * every)) + 1
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        out.append(a)
+    out.append(n - 1)
+    return np.array(out)
+
+
+@pytest.mark.parametrize("n,threshold", [(1000, 50), (5000, 300), (101, 100), (10, 4), (7305, 500)])
+def test_lttb_matches_reference(n, threshold):
+    rng = np.random.default_rng(n)
+    x = np.arange(n, dtype=float)
+    y = np.cumsum(rng.normal(size=n))
+    np.testing.assert_array_equal(lttb(x, y, threshold), reference_lttb(x, y, threshold))
+
+
+@pytest.mark.parametrize("threshold", [3, 17, 250])
+def test_lttb_keeps_endpoints_and_order(threshold):
+    rng = np.random.default_rng(threshold)
+    x = np.arange(1000, dtype=float)
+    y = rng.normal(size=1000)
+    idx = lttb(x, y, threshold)
+    assert len(idx) == threshold
+    assert idx[0] == 0 and idx[-1] == 999
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_lttb_keeps_everything_when_small():
+    x = np.arange(5, dtype=float)
+    np.testing.assert_array_equal(lttb(x, x, 5), np.arange(5))
+    np.testing.assert_array_equal(lttb(x, x, 50), np.arange(5))
+    np.testing.assert_array_equal(lttb(x, x, 2), np.arange(5))
+
+
+def test_lttb_keeps_spike():
+    y = np.zeros(1000)
+    y[537] = 10.0
+    assert 537 in lttb(np.arange(1000, dtype=float), y, 20)
+
+
+def test_resample_last_takes_period_close():
+    dates = np.arange(np.datetime64("2024-01-01"), np.datetime64("2024-03-01"))
+    closes = np.arange(len(dates), dtype=float)
+    months, monthly = resample_last(dates, closes, "1mo")
+    assert monthly.tolist() == [30.0, 59.0]
+    assert months[-1] == np.datetime64("2024-02-29")
+    same_dates, same = resample_last(dates, closes, "1d")
+    assert len(same) == len(closes)
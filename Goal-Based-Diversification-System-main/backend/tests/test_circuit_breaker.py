@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture
+def breaker():
+    b = CircuitBreaker("upstream", window_seconds=60, min_calls=4, failure_rate=0.5,
+                       slow_call_seconds=1.0, open_seconds=0.05)
+    for _ in range(4):
+        assert b.check() is None
+        b.record(False, 0.01, "boom")
+    assert b.state == OPEN
+    return b
+
+
+def _half_open(b):
+    time.sleep(0.06)
+    probe = b.check()
+    assert b.state == HALF_OPEN and probe is not None
+    return probe
+
+
+def test_closed_breaker_opens_on_failure_rate():
+    b = CircuitBreaker("upstream", min_calls=4, failure_rate=0.5, open_seconds=30)
+    for ok in (True, True, False):
+        b.check()
+        b.record(ok, 0.01)
+    assert b.state == CLOSED
+    b.check()
+    b.record(True, 6.0)  # slow calls count as failures
+    assert b.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        b.check()
+    assert b.counters["rejected"] == 1
+
+
+def test_half_open_admits_single_probe(breaker):
+    _half_open(breaker)
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+
+def test_stale_completions_do_not_change_state(breaker):
+    probe = _half_open(breaker)
+    # Calls admitted before the breaker opened finish now
+    breaker.record(True, 0.01)
+    assert breaker.state == HALF_OPEN
+    breaker.record(False, 0.01)
+    assert breaker.state == HALF_OPEN
+    breaker.record(True, 0.01, probe=probe)
+    assert breaker.state == CLOSED
+    assert breaker.info()["window_calls"] == 0
+
+
+def test_failed_probe_reopens(breaker):
+    probe = _half_open(breaker)
+    breaker.record(False, 0.01, "still down", probe=probe)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+
+def test_abandoned_probe_frees_the_slot(breaker):
+    probe = _half_open(breaker)
+    breaker.abandon(probe)
+    second = breaker.check()
+    assert second is not None and second != probe
+    # A stale token cannot free or resolve the current probe
+    breaker.abandon(probe)
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    breaker.record(True, 0.01, probe=probe)
+    assert breaker.state == HALF_OPEN
+    breaker.record(True, 0.01, probe=second)
+    assert breaker.state == CLOSED
@@ -0,0 +1,15 @@
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import Settings
+
+
+@pytest.mark.parametrize("env", [{"TACTICAL_MODE": "optimiser"}, {"RANKINGS_SOURCE": "factor"}])
+def test_unknown_modes_fail_at_startup(env):
+    with pytest.raises(ValidationError):
+        Settings(**env)
+
+
+def test_known_modes():
+    settings = Settings(TACTICAL_MODE="optimizer", RANKINGS_SOURCE="factors")
+    assert (settings.tactical_mode, settings.rankings_source) == ("optimizer", "factors")
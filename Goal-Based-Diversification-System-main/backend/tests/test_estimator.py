@@ -0,0 +1,36 @@
+import numpy as np
+
+from app.services.estimator import ReturnEstimate, bounded_sleeve_returns, bounded_sleeve_statistics
+from app.services.simulation import DEFAULT_ANNUAL_RETURNS, SIM_ASSETS
+
+ASSETS = ("Large Cap", "Mid Cap", "Small Cap", "Debt", "Gold", "Silver")
+
+
+def make_estimate(returns, n_obs=1000):
+    vol = np.array([0.2, 0.25, 0.3, 0.02, 0.15, 0.25])
+    return ReturnEstimate(
+        version=1,
+        as_of="2026-10-15",
+        asset_classes=ASSETS,
+        tickers=ASSETS,
+        n_obs=n_obs,
+        annual_returns=np.asarray(returns, dtype=np.float64),
+        annual_volatility=vol,
+        covariance=np.diag(vol ** 2),
+    )
+
+
+def test_simulation_returns_are_clamped():
+    # equity 0.6 -> cap, debt 0.01 -> floor, gold negative -> default, silver kept
+    estimate = make_estimate([0.6, 0.6, 0.6, 0.01, -0.1, 0.12])
+    returns, volatility, correlation = bounded_sleeve_statistics(estimate, SIM_ASSETS, DEFAULT_ANNUAL_RETURNS)
+    np.testing.assert_allclose(returns, [0.25, 0.02, DEFAULT_ANNUAL_RETURNS[2], 0.12])
+    np.testing.assert_allclose(volatility, estimate.sleeve_statistics(SIM_ASSETS)[1])
+    np.testing.assert_allclose(np.diag(correlation), 1.0)
+
+
+def test_short_history_uses_default_returns():
+    estimate = make_estimate([0.6, 0.6, 0.6, 0.07, 0.1, 0.12], n_obs=300)
+    returns, _, _ = bounded_sleeve_statistics(estimate, SIM_ASSETS, DEFAULT_ANNUAL_RETURNS)
+    np.testing.assert_allclose(returns, DEFAULT_ANNUAL_RETURNS)
+    assert bounded_sleeve_returns(estimate) is None
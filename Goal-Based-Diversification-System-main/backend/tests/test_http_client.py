@@ -0,0 +1,45 @@
+import asyncio
+
+import httpx
+
+from app.core import http_client
+from app.core.http_client import HttpClientMetrics, create_http_transport, parse_host_timeouts
+
+
+def test_parse_host_timeouts():
+    assert parse_host_timeouts("a.com=5, B.com=2.5,bad,=1") == {"a.com": 5.0, "b.com": 2.5}
+
+
+def test_metrics_come_from_the_shared_transport():
+    async def run():
+        await http_client.init_http_client()
+        try:
+            return http_client.get_http_metrics(), http_client._transport
+        finally:
+            await http_client.close_http_client()
+
+    metrics, transport = asyncio.run(run())
+    assert metrics["initialized"] and metrics["requests"] == 0
+    assert metrics["http2"] == transport.http2
+    assert http_client.get_http_metrics() == {"initialized": False}
+
+
+def test_http2_falls_back_without_h2(monkeypatch):
+    monkeypatch.setattr(http_client, "http2_available", lambda: False)
+    assert create_http_transport(http2=True).http2 is False
+    monkeypatch.setattr(http_client, "http2_available", lambda: True)
+    assert create_http_transport(http2=False).http2 is False
+
+
+def test_transport_counts_requests():
+    async def run():
+        metrics = HttpClientMetrics()
+        transport = http_client.InstrumentedTransport(
+            httpx.MockTransport(lambda request: httpx.Response(200)), metrics
+        )
+        async with httpx.AsyncClient(transport=transport) as client:
+            await client.get("http://example.test/")
+        return metrics
+
+    metrics = asyncio.run(run())
+    assert metrics.requests == 1 and metrics.status_counts == {200: 1}
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from app.services.estimator import ReturnEstimator
+from app.services.factors import BUFFER, FactorEngine, compute_factors
+
+ASSETS = ("Large Cap", "Mid Cap", "Small Cap", "Debt", "Gold", "Silver")
+TICKERS = ("^NSEI", "MID150BEES.NS", "BSE-SMLCAP.BO", "LIQUIDBEES.NS", "GOLDBEES.NS", "SILVERBEES.NS")
+
+
+@pytest.fixture(scope="module")
+def history():
+    rng = np.random.default_rng(7)
+    t = 700
+    returns = rng.normal(0.0004, 0.012, size=(t, len(ASSETS)))
+    prices = 100.0 * np.exp(np.cumsum(returns, axis=0))
+    dates = np.arange(np.datetime64("2022-01-03"), np.datetime64("2022-01-03") + t)
+    return dates, prices
+
+
+@pytest.mark.parametrize("split", [BUFFER, BUFFER + 1, 450])
+def test_factor_updates_match_batch_fit(history, split):
+    dates, prices = history
+    batch = FactorEngine(ASSETS, TICKERS)
+    batch.fit(dates, prices)
+    incremental = FactorEngine(ASSETS, TICKERS)
+    incremental.fit(dates[:split], prices[:split])
+    assert incremental.update_many(dates, prices) == len(dates) - split
+
+    expected, got = batch.factors(), incremental.factors()
+    for name in expected:
+        np.testing.assert_allclose(got[name], expected[name], rtol=1e-9, atol=1e-12)
+    assert [r.asset_class for r in incremental.rankings()] == [r.asset_class for r in batch.rankings()]
+
+
+def test_factor_engine_matches_compute_factors(history):
+    dates, prices = history
+    engine = FactorEngine(ASSETS, TICKERS)
+    engine.fit(dates, prices)
+    columns = compute_factors(prices)
+    for name, values in engine.factors().items():
+        np.testing.assert_allclose(values, columns[name][-1], rtol=1e-9, atol=1e-12)
+
+
+def test_factor_engine_from_empty(history):
+    dates, prices = history
+    engine = FactorEngine(ASSETS, TICKERS)
+    engine.update_many(dates[:BUFFER - 1], prices[:BUFFER - 1])
+    assert engine.factors() is None and engine.rankings() is None
+    engine.update_many(dates, prices)
+    batch = FactorEngine(ASSETS, TICKERS)
+    batch.fit(dates, prices)
+    for name, values in batch.factors().items():
+        np.testing.assert_allclose(engine.factors()[name], values, rtol=1e-9, atol=1e-12)
+
+
+def test_factor_update_rejects_old_or_invalid_bars(history):
+    dates, prices = history
+    engine = FactorEngine(ASSETS, TICKERS)
+    engine.fit(dates, prices)
+    assert not engine.update(dates[-1], prices[-1])
+    assert not engine.update(dates[-1] + 1, np.full(len(ASSETS), np.nan))
+
+
+@pytest.mark.parametrize("split", [2, 300, 699])
+def test_estimator_updates_match_batch_fit(history, split):
+    dates, prices = history
+    batch = ReturnEstimator(ASSETS, TICKERS, min_obs=100)
+    batch.fit(dates, prices)
+    incremental = ReturnEstimator(ASSETS, TICKERS, min_obs=100)
+    incremental.fit(dates[:split], prices[:split])
+    incremental.update_many(dates, prices)
+
+    expected, got = batch.estimate(), incremental.estimate()
+    assert got.n_obs == expected.n_obs == len(dates) - 1
+    np.testing.assert_allclose(got.annual_returns, expected.annual_returns, rtol=1e-9)
+    np.testing.assert_allclose(got.covariance, expected.covariance, rtol=1e-9)
+
+
+def test_estimator_needs_min_obs(history):
+    dates, prices = history
+    estimator = ReturnEstimator(ASSETS, TICKERS, min_obs=252)
+    estimator.fit(dates[:200], prices[:200])
+    assert estimator.estimate() is None
+    estimator.update_many(dates, prices)
+    estimate = estimator.estimate()
+    assert estimate is not None
+    np.testing.assert_allclose(np.diag(estimate.correlation), 1.0)
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from app.services.market_quotes import QuoteCache, QuoteNotFound
+
+
+class Upstream:
+    def __init__(self, delay=0.01):
+        self.calls = []
+        self.delay = delay
+        self.fail = False
+        self.price = 100.0
+
+    async def __call__(self, symbol, background=False):
+        self.calls.append((symbol, background))
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        if symbol == "NOPE.NS":
+            raise QuoteNotFound(symbol)
+        return {"symbol": symbol, "price": self.price, "marketState": "CLOSED"}
+
+
+def _cache(upstream, **kwargs):
+    options = dict(ttl_open=0.05, ttl_closed=0.05, stale_grace=10.0, negative_ttl=10.0)
+    options.update(kwargs)
+    return QuoteCache(fetcher=upstream, **options)
+
+
+def test_concurrent_misses_share_one_fetch():
+    async def run():
+        upstream = Upstream()
+        cache = _cache(upstream)
+        quotes = await asyncio.gather(*(cache.get("TCS.NS") for _ in range(20)))
+        return upstream, cache, quotes
+
+    upstream, cache, quotes = asyncio.run(run())
+    assert len(upstream.calls) == 1
+    assert all(q is quotes[0] for q in quotes)
+    assert cache.stats["misses"] == 1 and cache.stats["coalesced"] == 19
+
+
+def test_fresh_hit_does_not_fetch():
+    async def run():
+        upstream = Upstream()
+        cache = _cache(upstream, ttl_closed=60.0)
+        await cache.get("TCS.NS")
+        await cache.get("TCS.NS")
+        return upstream
+
+    assert len(asyncio.run(run()).calls) == 1
+
+
+def test_stale_quote_served_while_one_refresh_runs():
+    async def run():
+        upstream = Upstream(delay=0.05)
+        cache = _cache(upstream)
+        first = await cache.get("TCS.NS")
+        await asyncio.sleep(0.06)
+        upstream.price = 101.0
+        stale = await asyncio.gather(*(cache.get("TCS.NS") for _ in range(5)))
+        calls_during_refresh = len(upstream.calls)
+        await asyncio.sleep(0.1)
+        refreshed = cache.peek("TCS.NS").quote
+        return first, stale, calls_during_refresh, refreshed, cache
+
+    first, stale, calls, refreshed, cache = asyncio.run(run())
+    assert all(q["price"] == first["price"] == 100.0 for q in stale)
+    assert calls == 2  # the initial fetch plus a single background refresh
+    assert refreshed["price"] == 101.0
+    assert cache.stats["stale_served"] == 5
+
+
+def test_unknown_symbols_are_negatively_cached():
+    async def run():
+        upstream = Upstream()
+        cache = _cache(upstream)
+        assert await cache.get("NOPE.NS") is None
+        assert await cache.get("NOPE.NS") is None
+        return upstream
+
+    assert len(asyncio.run(run()).calls) == 1
+
+
+def test_failure_falls_back_to_last_good_quote():
+    async def run():
+        upstream = Upstream()
+        cache = _cache(upstream, stale_grace=0.0)
+        await cache.get("TCS.NS")
+        await asyncio.sleep(0.06)
+        upstream.fail = True
+        quote = await cache.get("TCS.NS")
+        with pytest.raises(RuntimeError):
+            await cache.get("INFY.NS")
+        return quote, cache
+
+    quote, cache = asyncio.run(run())
+    assert quote["price"] == 100.0 and cache.stats["fallbacks"] == 1
+
+
+def test_background_fetches_are_not_shared_with_user_requests():
+    async def run():
+        upstream = Upstream(delay=0.05)
+        cache = _cache(upstream)
+        background = asyncio.ensure_future(cache.get_background("TCS.NS"))
+        await asyncio.sleep(0)
+        await cache.get("TCS.NS")
+        await background
+        return upstream
+
+    calls = asyncio.run(run()).calls
+    assert sorted(calls) == [("TCS.NS", False), ("TCS.NS", True)]
@@ -0,0 +1,69 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from app.services.optimizer import TacticalOptimizer, solve_box_qp
+from tests.conftest import make_rankings
+
+
+def _problem(n, seed):
+    rng = np.random.default_rng(seed)
+    a = rng.normal(size=(n, n)) * 0.2
+    cov = a @ a.T + np.eye(n) * 0.01
+    mu = rng.normal(0.1, 0.05, size=n)
+    return mu, cov
+
+
+@pytest.mark.parametrize("n", [2, 3])
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("risk_aversion", [0.5, 3.0, 20.0])
+def test_solution_satisfies_kkt_and_bounds(n, seed, risk_aversion):
+    lower, upper = 0.1, 0.7
+    mu, cov = _problem(n, seed)
+    w = solve_box_qp(mu, cov, risk_aversion, lower, upper)
+    assert w is not None
+    assert w.sum() == pytest.approx(1.0, abs=1e-9)
+    assert np.all(w >= lower - 1e-9) and np.all(w <= upper + 1e-9)
+
+    # Gradient of the objective; free weights share the budget multiplier,
+    # weights at a bound may only want to move out of the box
+    gradient = mu - risk_aversion * cov @ w
+    free = (w > lower + 1e-7) & (w < upper - 1e-7)
+    nu = gradient[free].mean() if free.any() else None
+    if nu is not None:
+        np.testing.assert_allclose(gradient[free], nu, atol=1e-7)
+        assert np.all(gradient[w <= lower + 1e-7] <= nu + 1e-7)
+        assert np.all(gradient[w >= upper - 1e-7] >= nu - 1e-7)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_solution_beats_grid_search(seed):
+    mu, cov = _problem(3, seed)
+    lam, lower, upper = 3.0, 0.1, 0.7
+    w = solve_box_qp(mu, cov, lam, lower, upper)
+    best = w @ mu - 0.5 * lam * w @ cov @ w
+    grid = np.linspace(lower, upper, 61)
+    for a, b in itertools.product(grid, grid):
+        c = 1.0 - a - b
+        if lower - 1e-12 <= c <= upper + 1e-12:
+            v = np.array([a, b, c])
+            assert v @ mu - 0.5 * lam * v @ cov @ v <= best + 1e-12
+
+
+def test_infeasible_bounds():
+    mu, cov = _problem(3, 0)
+    assert solve_box_qp(mu, cov, 3.0, 0.4, 0.9) is None
+    assert solve_box_qp(mu, cov, 3.0, 0.0, 0.3) is None
+
+
+def test_sleeve_weights_follow_risk_profiles():
+    assets = ("Large Cap", "Mid Cap", "Small Cap", "Debt", "Gold", "Silver")
+    mu, cov = _problem(6, 3)
+    optimizer = TacticalOptimizer(min_weight=0.1, max_weight=0.7)
+    assert optimizer.sleeve_weights(["Large Cap", "Mid Cap"], make_rankings(), "Moderate") is None
+    optimizer.set_risk_model(assets, mu, cov, version=1)
+    for profile in ("Conservative", "Moderate", "Aggressive"):
+        weights = optimizer.sleeve_weights(["Large Cap", "Mid Cap", "Small Cap"], make_rankings(), profile)
+        assert sum(weights.values()) == pytest.approx(1.0)
+        assert all(0.1 - 1e-9 <= w <= 0.7 + 1e-9 for w in weights.values())
@@ -0,0 +1,97 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from app.services.price_store import CLOSE_FILE, DATE_FILE, PriceStore, is_rebased
+
+
+def _days(start, n):
+    return np.arange(np.datetime64(start, "D"), np.datetime64(start, "D") + n)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(str(tmp_path / "prices"))
+
+
+def test_append_only_writes_newer_bars(store):
+    dates = _days("2024-01-01", 10)
+    assert store.append("TCS.NS", dates, np.arange(10.0)) == 10
+    assert store.append("TCS.NS", dates, np.arange(10.0)) == 0
+    assert store.append("TCS.NS", _days("2024-01-08", 6), np.arange(100.0, 106.0)) == 3
+    days, closes = store.read("TCS.NS")
+    assert len(days) == 13
+    assert np.all(np.diff(days.view(np.int64)) > 0)
+    assert closes[-3:].tolist() == [103.0, 104.0, 105.0]
+
+
+def test_append_cleans_input(store):
+    dates = np.array(["2024-01-03", "2024-01-01", "2024-01-03", "2024-01-02"], dtype="datetime64[D]")
+    assert store.append("X", dates, [3.0, 1.0, 3.5, np.nan]) == 2
+    days, closes = store.read("X")
+    assert days.tolist() == list(np.array(["2024-01-01", "2024-01-03"], dtype="datetime64[D]").tolist())
+    assert closes.tolist() == [1.0, 3.5]
+
+
+def test_read_and_matrix_ranges(store):
+    store.append("A", _days("2024-01-01", 5), [1.0, 2, 3, 4, 5])
+    store.append("B", _days("2024-01-03", 5), [10.0, 20, 30, 40, 50])
+    days, closes = store.read("A", "2024-01-02", "2024-01-04")
+    assert closes.tolist() == [2.0, 3.0, 4.0]
+    dates, inner = store.matrix(["A", "B"])
+    assert len(dates) == 3 and inner[:, 0].tolist() == [3.0, 4.0, 5.0]
+    dates, ffill = store.matrix(["A", "B"], how="ffill")
+    assert len(dates) == 7
+    assert np.isnan(ffill[0, 1]) and ffill[-1].tolist() == [5.0, 50.0]
+
+
+def test_replace_rewrites_series_and_changes_basis(store):
+    store.append("A", _days("2024-01-01", 5), np.arange(1.0, 6.0))
+    basis = store.basis("A")
+    store.append("A", _days("2024-01-06", 1), [6.0])
+    assert store.basis("A") == basis
+    # Re-based: every past close scaled, one more bar
+    assert store.replace("A", _days("2024-01-01", 7), np.arange(1.0, 8.0) * 0.9) == 7
+    assert store.basis("A") != basis
+    days, closes = store.read("A")
+    assert len(days) == 7
+    assert closes.tolist() == pytest.approx((np.arange(1.0, 8.0) * 0.9).tolist())
+
+
+def test_is_rebased(store):
+    dates = _days("2024-01-01", 5)
+    store.append("A", dates, np.arange(1.0, 6.0))
+    fresh = _days("2024-01-05", 2)
+    assert not is_rebased(store, "A", fresh, np.array([5.0, 6.0]))
+    assert is_rebased(store, "A", fresh, np.array([4.9, 6.0]))
+    # No overlap with the stored tail: nothing to compare
+    assert not is_rebased(store, "A", _days("2024-01-06", 1), np.array([1.0]))
+    assert not is_rebased(store, "B", fresh, np.array([5.0, 6.0]))
+
+
+def test_concurrent_appends_keep_dates_unique(store):
+    dates = _days("2020-01-01", 400)
+    closes = np.arange(400.0)
+    threads = [threading.Thread(target=store.append, args=("A", dates, closes)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    days, stored = store.read("A")
+    assert len(days) == 400
+    assert np.all(np.diff(days.view(np.int64)) > 0)
+    assert stored.tolist() == closes.tolist()
+
+
+def test_torn_append_is_repaired(store, tmp_path):
+    store.append("A", _days("2024-01-01", 3), [1.0, 2.0, 3.0])
+    directory = tmp_path / "prices" / "A"
+    # An append that died after writing part of the close column
+    with open(directory / CLOSE_FILE, "ab") as f:
+        f.write(b"\0" * 12)
+    assert store.count("A") == 3
+    assert store.append("A", _days("2024-01-04", 1), [4.0]) == 1
+    assert os.path.getsize(directory / CLOSE_FILE) == os.path.getsize(directory / DATE_FILE) == 32
+    assert store.read("A")[1].tolist() == [1.0, 2.0, 3.0, 4.0]
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.rebalance import RebalancePlanRequest
+from app.services.rebalance import apply_min_trade, plan_rebalance, plan_trades
+
+
+@pytest.fixture(scope="module")
+def book():
+    rng = np.random.default_rng(11)
+    p = 2000
+    holdings = rng.lognormal(10, 1, size=(p, 6)) * (rng.random((p, 6)) > 0.2)
+    targets = rng.dirichlet(np.ones(6), size=p)
+    cash = rng.choice([0.0, 500.0, 5000.0, 50000.0], size=p)
+    return holdings, targets, cash
+
+
+def test_cash_only_buys_never_overshoot(book):
+    holdings, targets, cash = book
+    plan = plan_rebalance(holdings, targets, cash, band=1.0)
+    assert not plan.rebalanced.any()
+    assert np.all(plan.trades >= -1e-9)
+    np.testing.assert_allclose(plan.trades.sum(axis=1), cash, atol=1e-6)
+    target_values = targets * (holdings.sum(axis=1) + cash)[:, None]
+    assert np.all(holdings + plan.trades <= np.maximum(holdings, target_values) + 1e-6)
+
+
+def test_rebalanced_portfolios_reach_targets(book):
+    holdings, targets, cash = book
+    plan = plan_rebalance(holdings, targets, cash, band=0.05)
+    after = holdings + plan.trades
+    weights = after / after.sum(axis=1, keepdims=True)
+    np.testing.assert_allclose(weights[plan.rebalanced], targets[plan.rebalanced], atol=1e-9)
+    np.testing.assert_allclose(plan.trades.sum(axis=1), cash, atol=1e-6)
+
+
+@pytest.mark.parametrize("min_trade", [0.0, 100.0, 1000.0, 5000.0])
+def test_min_trade_keeps_buys_funded(book, min_trade):
+    holdings, targets, cash = book
+    plan = plan_rebalance(holdings, targets, cash, band=0.05)
+    trades = apply_min_trade(plan.trades, cash, min_trade)
+
+    buys = np.maximum(trades, 0.0).sum(axis=1)
+    sells = -np.minimum(trades, 0.0).sum(axis=1)
+    # Never spend more than the new cash plus what is actually sold
+    assert np.all(buys <= cash + sells + 1e-6)
+    nonzero = trades[trades != 0]
+    assert np.all(np.abs(nonzero) >= min_trade - 1e-9)
+    # Trades only shrink, never flip or grow
+    assert np.all(trades * plan.trades >= 0)
+    assert np.all(np.abs(trades) <= np.abs(plan.trades) + 1e-9)
+
+
+def test_dropped_small_sell_scales_buys():
+    trades = np.array([[-50.0, -2000.0, 1025.0, 1025.0, 0.0, 0.0]])
+    out = apply_min_trade(trades, np.zeros(1), 100.0)
+    assert out[0, 0] == 0.0 and out[0, 1] == -2000.0
+    assert out[0, 2:4].tolist() == pytest.approx([1000.0, 1000.0])
+
+
+def test_plan_trades_applies_min_trade(book):
+    holdings, targets, cash = book
+    plan, trades = plan_trades(holdings, targets, cash, band=0.05, min_trade=1000.0)
+    np.testing.assert_array_equal(trades, apply_min_trade(plan.trades, cash, 1000.0))
+    _, unfiltered = plan_trades(holdings, targets, None)
+    np.testing.assert_array_equal(unfiltered, plan_rebalance(holdings, targets).trades)
+
+
+@pytest.mark.parametrize("field, value", [
+    ("horizon", [0]),
+    ("horizon", [31]),
+    ("holdings", {"Debt": [-1.0]}),
+    ("holdings", {"Debt": [float("inf")]}),
+    ("pending_sip", [float("nan")]),
+    ("min_trade", -1.0),
+])
+def test_plan_request_rejects_out_of_range(field, value):
+    payload = {"horizon": [10], "risk_profile": ["Moderate"], "holdings": {"Debt": [1000.0]}, field: value}
+    with pytest.raises(ValidationError):
+        RebalancePlanRequest(**payload)
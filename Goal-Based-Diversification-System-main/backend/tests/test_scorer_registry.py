@@ -0,0 +1,110 @@
+import asyncio
+import os
+
+import pytest
+
+from app.services.scorer_artifact import export_scorer_artifact
+from app.services.scorer_registry import ScorerRegistry
+from tests.conftest import make_rankings
+
+
+class FakeScorer:
+    def __init__(self, rankings):
+        self.ranked_df = rankings.to_frame()
+
+
+def _export(path, scores=None):
+    export_scorer_artifact(FakeScorer(make_rankings(scores)), str(path))
+
+
+def _bump(path):
+    # Make the new export visible to the mtime/size check even on coarse clocks
+    for p in path.glob("v*/metadata.json"):
+        st = p.stat()
+        os.utime(p, (st.st_atime + 5, st.st_mtime + 5))
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    path = tmp_path / "hybrid_scorer"
+    _export(path)
+    return path
+
+
+def test_missing_scorer_is_rule_based(tmp_path):
+    registry = ScorerRegistry(str(tmp_path / "missing.pkl"), reload_interval=0)
+    registry.load()
+    assert registry.allocator.rankings_index is None
+    assert registry.snapshot.rankings_version is None
+    assert registry.drain_activations() == []
+
+
+def test_load_reads_artifact_rankings(artifact, rankings):
+    registry = ScorerRegistry(str(artifact), reload_interval=0)
+    registry.load()
+    assert registry.snapshot.rankings_version == rankings.content_hash()
+    [activation] = registry.drain_activations()
+    assert activation.version == rankings.content_hash()
+    assert activation.source == "scorer"
+
+
+def test_publish_swaps_rankings_and_table(artifact):
+    registry = ScorerRegistry(str(artifact), reload_interval=0)
+    registry.load()
+    registry.drain_activations()
+    before = registry.snapshot
+
+    published = make_rankings({"Large Cap": 10.0, "Mid Cap": 20.0, "Small Cap": 70.0,
+                                "Debt": 5.0, "Gold": 40.0, "Silver": 60.0})
+    registry.publish_rankings(published, "factors")
+
+    snap = registry.snapshot
+    assert snap is not before
+    assert snap.allocator is not before.allocator
+    assert snap.allocator.rankings_index is published
+    assert snap.rankings_source == "factors"
+    assert snap.rankings_version == published.content_hash()
+    # The table was rebuilt from the published rankings
+    equity = snap.table.get(10, "Moderate").equity_breakdown
+    assert equity["Small Cap"] > equity["Mid Cap"] > equity["Large Cap"]
+    # The previous snapshot is untouched for readers still holding it
+    assert before.allocator.rankings_index.content_hash() != published.content_hash()
+    [activation] = registry.drain_activations()
+    assert (activation.version, activation.source) == (published.content_hash(), "factors")
+
+
+def test_reload_keeps_published_rankings(artifact):
+    registry = ScorerRegistry(str(artifact), reload_interval=0)
+    registry.load()
+    published = make_rankings({"Large Cap": 1.0, "Mid Cap": 2.0, "Small Cap": 3.0,
+                                "Debt": 4.0, "Gold": 5.0, "Silver": 6.0})
+    registry.publish_rankings(published, "factors")
+
+    _export(artifact, {"Large Cap": 90.0, "Mid Cap": 1.0, "Small Cap": 1.0,
+                       "Debt": 1.0, "Gold": 1.0, "Silver": 1.0})
+    _bump(artifact)
+    assert asyncio.run(registry.reload_if_changed()) is True
+    assert registry.snapshot.rankings_version == published.content_hash()
+    assert registry.snapshot.rankings_source == "factors"
+    assert asyncio.run(registry.reload_if_changed()) is False
+
+
+def test_publish_during_reload_wins(artifact):
+    registry = ScorerRegistry(str(artifact), reload_interval=0)
+    registry.load()
+    late = make_rankings({"Large Cap": 3.0, "Mid Cap": 2.0, "Small Cap": 1.0,
+                          "Debt": 1.0, "Gold": 2.0, "Silver": 3.0})
+    build = registry._build_snapshot
+
+    def build_then_publish(stat, published=None):
+        snapshot = build(stat, published)
+        registry.publish_rankings(late, "factors")
+        return snapshot
+
+    registry._build_snapshot = build_then_publish
+    _export(artifact, {"Large Cap": 9.0, "Mid Cap": 8.0, "Small Cap": 7.0,
+                       "Debt": 6.0, "Gold": 5.0, "Silver": 4.0})
+    _bump(artifact)
+    assert asyncio.run(registry.reload_if_changed()) is True
+    assert registry.snapshot.rankings_version == late.content_hash()
+    assert registry.allocator.rankings_index is late
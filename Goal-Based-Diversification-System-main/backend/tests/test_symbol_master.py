@@ -0,0 +1,53 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services import symbol_master
+from app.services.symbol_master import SymbolMaster, merge_nse_equity_list
+
+SEED = "symbol,name,sector,nse,bse\nTCS,Tata Consultancy Services,IT,1,1\nABB,ABB India,Capital Goods,0,1\n"
+EQUITY_L = "SYMBOL,NAME OF COMPANY, SERIES\nABB,ABB India Limited,EQ\nZOMATO,Zomato Limited,EQ\nGSEC,Some Bond,GB\n"
+
+
+@pytest.fixture
+def seed(tmp_path, monkeypatch):
+    path = tmp_path / "seed.csv"
+    path.write_text(SEED)
+    monkeypatch.setattr(settings, "symbol_master_path", str(path))
+    monkeypatch.setattr(settings, "symbol_master_data_dir", str(tmp_path / "data"))
+    symbol_master.reload_symbol_master()
+    yield path
+    monkeypatch.undo()
+    symbol_master.reload_symbol_master()
+
+
+def test_merge_leaves_the_seed_untouched(tmp_path, seed):
+    equity_list = tmp_path / "EQUITY_L.csv"
+    equity_list.write_text(EQUITY_L)
+    output = tmp_path / "out" / "symbol_master.csv"
+
+    assert merge_nse_equity_list(seed, str(equity_list), output) == 1
+    assert seed.read_text() == SEED
+    merged = SymbolMaster.from_csv(str(output))
+    assert [l.symbol for l in merged.listings] == ["ABB", "TCS", "ZOMATO"]
+    abb = merged.lookup("ABB")
+    assert abb.nse and abb.bse and abb.sector == "Capital Goods"
+
+
+def test_update_writes_to_the_data_dir(tmp_path, seed):
+    def handler(request):
+        return httpx.Response(200, content=EQUITY_L.encode())
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await symbol_master.update_symbol_master(client)
+
+    assert len(symbol_master.get_symbol_master()) == 2
+    assert asyncio.run(run()) == 1
+    assert seed.read_text() == SEED
+    data_dir = tmp_path / "data"
+    assert sorted(p.name for p in data_dir.iterdir()) == ["symbol_master.csv"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["data", "seed.csv"]
+    assert len(symbol_master.reload_symbol_master()) == 3